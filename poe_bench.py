@@ -0,0 +1,1023 @@
+"""가상 보관함으로 롤링 루프 속도를 측정하는 벤치마크 (Windows API/디스플레이 불필요)
+
+사용법: python poe_bench.py [--presets slow normal fast max] [--cells 144]
+                            [--latency 2] [--jitter 1] [--drop 0.01] [--min-interval 40]
+                            [--json 결과.json] [--compare 기준.json]
+       python poe_bench.py --stop-trials 20 [--stop-budget 50]
+       python poe_bench.py --startup 5 [--startup-budget 300]
+       python poe_bench.py --resume-trials 10
+       python poe_bench.py --release-trials 20
+       python poe_bench.py --capture 500
+       python poe_bench.py --cache-runs 3 --match 0.3
+       python poe_bench.py --pipeline scour_alch_chaos
+       python poe_bench.py --pipeline scour_alch_chaos --verify [--drop 0.05]
+       python poe_bench.py --timing 200 [--timing-budget 0.5]
+       python poe_bench.py --virtual --layout quad --presets slow --cells 576
+       python poe_bench.py --history 30 [--match 0.3]
+"""
+import os
+import sys
+import json
+import time
+import random
+import zlib
+import argparse
+import threading
+import subprocess
+
+from poe_input import InputBackend, InputFailSafe
+from poe_engine import RollEngine, AdaptivePacer, SPEED_PRESETS, CLICK_PRESS_DELAY, CELL_SATISFIED, CELL_FAILED
+from poe_pipeline import Analyzer
+from poe_verify import ClickVerifier
+from poe_cellcache import CellCache
+from poe_timing import DeadlineTimer, TimerResolution, VirtualClock, SYSTEM_CLOCK
+import poe_trace
+import poe_path
+import poe_layout
+import poe_craft
+import poe_history
+import poe_job
+
+# --- 벤치마크 기본값 ---
+BENCH_GRID_BOUNDS = {'left': 15, 'right': 651, 'top': 125, 'bottom': 761}
+BENCH_CURRENCY_POS = (1403, 614)
+BENCH_TOLERANCE = 0.1  # --compare 시 허용하는 처리량 감소 비율
+STOP_BUDGET = 0.05  # 중지 요청부터 마지막 마우스 입력까지 허용 시간
+STARTUP_BUDGET = 0.3  # 새 프로세스에서 poe_roller import부터 창 표시까지 허용 시간
+TIMING_BUDGET = 0.0005  # 정밀 대기의 간격 오차 허용치 (중앙값, p99는 OS/가상 머신 스케줄링에 좌우되어 표시만)
+TIMING_INTERVALS = (0.001, 0.005, 0.01, CLICK_PRESS_DELAY, SPEED_PRESETS['fast'][1])
+TIMING_OVERHEAD = 0.0003  # 대기 사이에 흉내 내는 입력 호출 시간
+VIRTUAL_WALL_BUDGET = 0.5  # --virtual 실행 한 번에 허용하는 실제 소요 시간
+CAPTURE_TOLERANCE = 0.1  # 링 버퍼 캡처가 매번 할당하는 캡처보다 느려도 되는 비율 (중앙값 기준, 평균은 가상 머신 지연에 좌우됨)
+HISTORY_RECORD_BUDGET = 0.001  # 작업 기록 요청(record) 한 번에 허용하는 시간 (디스크를 기다리면 안 됨)
+HISTORY_ORBS_TOLERANCE = 0.2  # 지도 한 장당 커런시 수가 기대값(1/일치 확률)에서 벗어나도 되는 비율
+STARTUP_HEAVY_MODULES = ('pyautogui', 'keyboard', 'numpy', 'PIL', 'psutil', 'win32gui', 'win32api')
+# -------------
+
+# 새 파이썬 프로세스에서 실행하는 시작 시간 측정 스크립트 (디스플레이가 없으면 import만 측정)
+STARTUP_SCRIPT = r'''
+import sys, json, time
+start = time.perf_counter()
+import poe_roller
+imported = time.perf_counter() - start
+shown = None
+try:
+    import tkinter as tk
+    root = tk.Tk()
+except tk.TclError:
+    root = None
+if root is not None:
+    poe_roller.MapRollerApp.hide_console = lambda self: None
+    app = poe_roller.MapRollerApp(root)
+    root.update_idletasks()
+    shown = time.perf_counter() - start
+    root.destroy()
+heavy = [name for name in %r if name in sys.modules]
+print(json.dumps({'import': imported, 'shown': shown, 'heavy': heavy}))
+'''
+
+
+class SimulatedStash:
+    """아이템이 든 칸과 칸마다 적용된 커런시 횟수를 기억하는 가상 보관함"""
+
+    def __init__(self, rows=12, cols=12, bounds=None, fill=1.0, seed=0,
+                 currency_pos=BENCH_CURRENCY_POS):
+        self.rows = rows
+        self.cols = cols
+        self.bounds = bounds or dict(BENCH_GRID_BOUNDS)
+        self.currency_pos = currency_pos
+        self.cell_width = (self.bounds['right'] - self.bounds['left']) / cols
+        self.cell_height = (self.bounds['bottom'] - self.bounds['top']) / rows
+        rng = random.Random(seed)
+        self.items = {(row, col): 0 for col in range(cols) for row in range(rows)
+                      if rng.random() < fill}
+        self.currencies = {tuple(currency_pos): 'chaos'}  # 커런시 칸 좌표 -> 이름
+        self.generation = 0  # refill()로 지도를 바꾼 횟수 (아이템 텍스트에 포함)
+        self.rarities = {}  # 칸 -> 희귀도 (설정한 칸은 맞지 않는 커런시를 거부하고 텍스트에 희귀도 표시)
+        self.repeated = 0  # 이미 적용된 커런시를 같은 칸에 다시 쓴 횟수 (거부된 클릭 포함)
+        self.applied = {cell: [] for cell in self.items}  # 칸마다 적용된 커런시 순서
+
+    def cell_center(self, cell):
+        row, col = cell
+        return (round(self.bounds['left'] + (col + 0.5) * self.cell_width),
+                round(self.bounds['top'] + (row + 0.5) * self.cell_height))
+
+    def cell_at(self, pos):
+        col = int((pos[0] - self.bounds['left']) // self.cell_width)
+        row = int((pos[1] - self.bounds['top']) // self.cell_height)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return (row, col)
+        return None
+
+    def apply(self, pos, currency='chaos'):
+        """pos 칸에 커런시 적용 (아이템이 있으면 True)"""
+        cell = self.cell_at(pos)
+        if cell in self.items:
+            rarity = self.rarities.get(cell)
+            if currency in self.applied[cell]:
+                self.repeated += 1
+            if rarity is not None:
+                currency = poe_craft.CURRENCIES[currency]
+                if rarity not in currency.accepts:
+                    return False  # 게임이 거부 (아이템 그대로)
+                self.rarities[cell] = currency.result
+                currency = currency.name
+            self.items[cell] += 1
+            self.applied[cell].append(currency)
+            return True
+        return False
+
+    def refill(self):
+        """아이템이 있는 칸을 모두 같은 종류의 새 지도로 교체 (아이콘/지각 해시는 그대로)"""
+        self.generation += 1
+        self.items = {cell: 0 for cell in self.items}
+        self.applied = {cell: [] for cell in self.items}
+
+    def item_text(self, cell):
+        """칸 아이템의 가상 텍스트 (아이템이 없으면 None)"""
+        if cell not in self.items:
+            return None
+        name = f"Map {cell} #{self.generation}" if self.generation else f"Map {cell}"
+        if cell in self.rarities:
+            name = f"Rarity: {self.rarities[cell].capitalize()}\n{name}"
+        return f"{name} roll {self.items[cell]}"
+
+    @property
+    def rolls(self):
+        return sum(self.items.values())
+
+    def fingerprint(self, cell):
+        """칸 화면의 가상 지각 해시 (맵 아이콘은 롤링하거나 새 지도로 바꿔도 그대로라 아이템 유무로만 정해짐)"""
+        return zlib.crc32(f"map {cell}".encode()) if cell in self.items else 0
+
+
+class SimulatedInputDevice(InputBackend):
+    """가상 보관함에 입력을 전달하는 장치 (입력 지연과 클릭 누락 확률 설정 가능, 시각/지연은 clock 기준)"""
+    name = 'simulated'
+
+    def __init__(self, stash, latency=0.0, jitter=0.0, drop_rate=0.0, seed=0, min_interval=0.0,
+                 clock=SYSTEM_CLOCK):
+        self.stash = stash
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.min_interval = min_interval  # 이보다 짧은 간격의 클릭은 게임이 놓침
+        self.last_click = None
+        self.rng = random.Random(seed)
+        self.position = (0, 0)
+        self.held = set()
+        self.holding_currency = False  # 집은 커런시 이름 (없으면 False)
+        self.pickups = 0
+        self.travel = 0.0  # 커서 이동 거리 합계 (픽셀)
+        self.clicks = 0
+        self.dropped = 0
+        self.last_mouse_event = None  # 마지막 마우스 입력 시각 (중지 지연 측정용)
+        self.failsafe_after = None  # 이 수만큼 입력한 뒤 커서가 화면 모서리에 있는 것처럼 비상 정지
+        self.events = 0
+        self.key_events = 0
+        self.redundant = 0  # 이미 눌린 키를 누르거나 떼어진 키/버튼을 뗀 횟수
+
+    def _check(self):
+        self.events += 1
+        if self.failsafe_after is not None and self.events > self.failsafe_after:
+            raise InputFailSafe("simulated failsafe")
+
+    def _delay(self):
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            self.clock.sleep(delay)
+
+    def move(self, pos, duration=0.0):
+        if duration > 0 and self.wait(duration, 'move'):
+            return
+        self._check()
+        self._delay()
+        self.travel += ((pos[0] - self.position[0]) ** 2 + (pos[1] - self.position[1]) ** 2) ** 0.5
+        self.position = (int(pos[0]), int(pos[1]))
+        self.last_mouse_event = self.clock.now()
+
+    def mouse_down(self, button='left'):
+        self._check()
+        self._delay()
+        self.held.add(button)
+        self.last_mouse_event = self.clock.now()
+
+    def mouse_up(self, button='left'):
+        self._check()
+        self._delay()
+        if button not in self.held:
+            self.redundant += 1
+        self.held.discard(button)
+        self.last_mouse_event = self.clock.now()
+        if button == 'right':
+            currency = self.stash.currencies.get(self.position)
+            if currency:
+                self.holding_currency = currency if 'shift' in self.held else False
+                self.pickups += 1
+            return
+        if not self.holding_currency:
+            return
+        self.clicks += 1
+        now = self.clock.now()
+        too_fast = self.last_click is not None and now - self.last_click < self.min_interval
+        self.last_click = now
+        if too_fast or (self.drop_rate and self.rng.random() < self.drop_rate):
+            self.dropped += 1
+            return
+        self.stash.apply(self.position, self.holding_currency)
+
+    def key_down(self, key):
+        self._check()
+        self._delay()
+        self.key_events += 1
+        if key in self.held:
+            self.redundant += 1
+        self.held.add(key)
+
+    def key_up(self, key):
+        self._check()
+        self._delay()
+        self.key_events += 1
+        if key not in self.held:
+            self.redundant += 1
+        self.held.discard(key)
+        if key == 'shift':
+            self.holding_currency = False
+
+    def release(self, item):
+        # 비상 정지 상태에서도 받음 (게임 입장에서는 버튼/키를 뗀 것뿐)
+        kind, name = item
+        if kind == 'key':
+            self.key_events += 1
+        if name not in self.held:
+            self.redundant += 1
+        self.held.discard(name)
+        if name == 'shift':
+            self.holding_currency = False
+
+
+class SimulatedItemReader:
+    """커서 아래 칸의 롤링 횟수를 아이템 텍스트로 돌려주는 가상 리더"""
+
+    def __init__(self, device):
+        self.device = device
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        self.device._delay()
+        return self.device.stash.item_text(self.device.stash.cell_at(self.device.position))
+
+
+class SimulatedMatcher:
+    """롤링 결과 텍스트마다 rate 확률로 일치하는 가상 정규식 (같은 텍스트는 항상 같은 결과)"""
+
+    def __init__(self, rate, seed=0):
+        self.rate = rate
+        self.seed = seed
+        self.patterns = (f"simulated {rate} {seed}",)
+
+    def __bool__(self):
+        return True
+
+    def matches(self, text):
+        if not text:
+            return False
+        return zlib.crc32(f"{self.seed}:{text}".encode()) % 10000 < self.rate * 10000
+
+
+class SimulatedAnalyzer(Analyzer):
+    """클릭 직후 칸의 롤링 횟수를 캡처하고, 작업자에서 cost초 걸려 반영 여부를 판정하는 가상 검사기"""
+
+    def __init__(self, stash, cost=0.0, workers=1):
+        self.stash = stash
+        self.cost = cost
+        self.workers = workers
+        self.seen = {}
+
+    def capture(self, pos):
+        cell = self.stash.cell_at(pos)
+        count = self.stash.items.get(cell, 0)
+        before = self.seen.get(cell, 0)
+        self.seen[cell] = count
+        return count, before
+
+    def analyze(self, payload):
+        count, before = payload
+        if self.cost > 0:
+            time.sleep(self.cost)
+        return CELL_SATISFIED if count > before else CELL_FAILED
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_preset(speed, cells=None, latency=0.0, jitter=0.0, drop_rate=0.0, fill=1.0, seed=0,
+               min_interval=0.0, tracer=None, layout=poe_layout.DEFAULT_LAYOUT, match_rate=0.0,
+               analysis=None, analysis_workers=1, verify=False, clock=None):
+    """가상 보관함에서 한 프리셋으로 롤링하고 처리량 통계 반환
+
+    cells를 주면 열 순서로 앞의 cells칸만 롤링한다 (None이면 레이아웃의 모든 칸).
+    match_rate가 있으면 정규식 모드처럼 롤링마다 그 확률로 만족하는 가상 매처로 여러 패스를 돈다.
+    analysis(초)를 주면 클릭마다 그만큼 걸리는 검사를 analysis_workers개 작업자로
+    (0이면 입력 스레드에서 바로) 실행하고, 반영되지 않은 클릭은 다음 패스에서 다시 롤링한다.
+    verify면 앱의 클릭 확인 모드처럼 아이템 텍스트를 전후 비교한다.
+    clock(VirtualClock)을 주면 실제로 기다리지 않고 가상 시각으로 측정한다 ('wall'은 실제 소요 시간).
+    """
+    wall = time.perf_counter()
+    clock = clock or SYSTEM_CLOCK
+    grid = poe_layout.LAYOUTS[layout]
+    stash = SimulatedStash(grid.rows, grid.cols, fill=fill, seed=seed)
+    device = SimulatedInputDevice(stash, latency, jitter, drop_rate, seed, min_interval, clock)
+    matcher = SimulatedMatcher(match_rate, seed) if match_rate else None
+    reader = SimulatedItemReader(device) if speed == 'adaptive' or matcher or verify else None
+    targets = sorted(stash.items, key=lambda cell: (cell[1], cell[0]))[:cells]
+    points = [stash.cell_center(cell) for cell in targets]
+    order = poe_path.plan_order(points, targets, start=stash.currency_pos)
+    coords = [points[i] for i in order]
+
+    analyzer = SimulatedAnalyzer(stash, analysis, analysis_workers) if analysis is not None else None
+    if verify:
+        analyzer = ClickVerifier(device, reader)
+
+    engine = RollEngine(device, tracer=tracer, clock=clock)
+    result = engine.roll(coords, stash.currency_pos, speed, matcher, reader, analyzer=analyzer)
+    missed = device.dropped / device.clicks if device.clicks else 0.0
+    return {
+        'preset': speed,
+        'cells': result.rolled,
+        'elapsed': result.elapsed,
+        'cells_per_sec': result.cells_per_sec,
+        'p50_ms': percentile(result.cell_times, 0.50) * 1000,
+        'p99_ms': percentile(result.cell_times, 0.99) * 1000,
+        'missed_rate': missed,
+        'unrolled': sum(1 for cell in targets if stash.items[cell] == 0),
+        'satisfied': result.satisfied,
+        'retries': result.retries,
+        'failed': result.failed,
+        'pass_reports': result.pass_reports,
+        'wall': time.perf_counter() - wall,
+    }
+
+
+def measure_stop_latency(speed, trials=10, latency=0.0, seed=0):
+    """작업 중 임의 시점에 중지를 요청하고 마지막 마우스 입력까지의 지연 측정
+
+    (최대 지연, 평균 지연, 최대 종료 대기) 초 단위 반환
+    """
+    rng = random.Random(seed)
+    delays = []
+    joins = []
+    for trial in range(trials):
+        stash = SimulatedStash(seed=seed + trial)
+        device = SimulatedInputDevice(stash, latency, seed=seed + trial)
+        coords = [stash.cell_center(cell) for cell in sorted(stash.items, key=lambda c: (c[1], c[0]))]
+        engine = RollEngine(device)
+        worker = threading.Thread(target=engine.roll, args=(coords, stash.currency_pos, speed))
+        worker.start()
+        time.sleep(rng.uniform(0.2, 0.8))
+        requested = time.perf_counter()
+        engine.stop()
+        worker.join()
+        joins.append(time.perf_counter() - requested)
+        last = device.last_mouse_event or requested
+        delays.append(max(0.0, last - requested))
+    return max(delays), sum(delays) / len(delays), max(joins)
+
+
+def measure_resume(speed, trials=10, latency=0.0, seed=0):
+    """작업을 임의 시점에 중지한 뒤 끝난 칸(done)으로 이어서 롤링
+
+    (한 번도 롤링되지 않은 칸 수, 두 번 이상 롤링된 칸 수) 합계 반환
+    """
+    rng = random.Random(seed)
+    unrolled = doubled = 0
+    for trial in range(trials):
+        stash = SimulatedStash(seed=seed + trial)
+        device = SimulatedInputDevice(stash, latency, seed=seed + trial)
+        coords = [stash.cell_center(cell) for cell in sorted(stash.items, key=lambda c: (c[1], c[0]))]
+        engine = RollEngine(device)
+        done = set()
+        worker = threading.Thread(target=engine.roll, args=(coords, stash.currency_pos, speed),
+                                  kwargs={'done': done})
+        worker.start()
+        time.sleep(rng.uniform(0.2, 0.8))
+        engine.stop()
+        worker.join()
+
+        engine.reset_stop()
+        engine.roll(coords, stash.currency_pos, speed, done=done)
+        unrolled += sum(1 for count in stash.items.values() if count == 0)
+        doubled += sum(1 for count in stash.items.values() if count > 1)
+    return unrolled, doubled
+
+
+def measure_release(speed, trials=10, latency=0.0, seed=0):
+    """작업을 임의 시점에 중지하거나 비상 정지시킨 뒤 눌린 채 남은 키/버튼 확인
+
+    짝수 번째는 다른 스레드에서 앱처럼 중지+해제를 요청하고, 홀수 번째는 임의 입력 수 뒤 비상 정지.
+    [{'mode', 'leaked', 'redundant', 'key_events', 'join'}] 반환
+    """
+    rng = random.Random(seed)
+    rows = []
+    for trial in range(trials):
+        stash = SimulatedStash(seed=seed + trial)
+        device = SimulatedInputDevice(stash, latency, seed=seed + trial)
+        coords = [stash.cell_center(cell) for cell in sorted(stash.items, key=lambda c: (c[1], c[0]))]
+        engine = RollEngine(device)
+        failsafe = trial % 2 == 1
+        if failsafe:
+            device.failsafe_after = rng.randint(1, 3 * len(coords))
+
+        def run():
+            try:
+                engine.roll(coords, stash.currency_pos, speed)
+            except InputFailSafe:
+                pass
+        worker = threading.Thread(target=run)
+        worker.start()
+        if failsafe:
+            worker.join()
+            requested = time.perf_counter()
+        else:
+            time.sleep(rng.uniform(0.05, 0.5))
+            requested = time.perf_counter()
+            engine.stop()
+            engine.release_inputs()
+            worker.join()
+        rows.append({'mode': 'failsafe' if failsafe else 'stop', 'leaked': sorted(device.held),
+                     'redundant': device.redundant, 'key_events': device.key_events,
+                     'join': time.perf_counter() - requested})
+    return rows
+
+
+def measure_history(presets, runs=20, match_rate=0.3, seed=0, aborts=0):
+    """가상 시계로 정규식 모드 작업을 runs번 실행해 임시 기록 파일에 기록하고 집계 확인
+
+    aborts번은 poe_job.run_job으로 실행하다 비상 정지로 끊어 중단된 작업도 기록되는지 확인한다.
+    (record() 호출 시간 목록, 기록한 롤링 수 합계, 기록된 작업 수, 비상 정지로 기록된 작업 수,
+    집계 {'throughput', 'success', 'orbs'}) 반환
+    """
+    import tempfile
+    latencies = []
+    rolled = 0
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'history.sqlite3')
+        writer = poe_history.HistoryWriter(path)
+        for run in range(runs):
+            speed = presets[run % len(presets)]
+            clock = VirtualClock()
+            stash = SimulatedStash(seed=seed + run)
+            device = SimulatedInputDevice(stash, seed=seed + run, clock=clock)
+            matcher = SimulatedMatcher(match_rate, seed + run)
+            coords = [stash.cell_center(cell) for cell in sorted(stash.items, key=lambda c: (c[1], c[0]))]
+            engine = RollEngine(device, clock=clock)
+            result = engine.roll(coords, stash.currency_pos, speed, matcher, SimulatedItemReader(device))
+            report = {'targets': result.total, 'rolled': result.rolled, 'satisfied': result.satisfied,
+                      'rolled_satisfied': result.rolled_satisfied, 'empty': result.empty, 'cached': result.cached, 'retries': result.retries,
+                      'failed': result.failed, 'missed': result.missed, 'passes': result.passes,
+                      'elapsed': result.elapsed, 'stop_reason': result.stop_reason,
+                      'completed': not result.stopped}
+            record = poe_history.run_record(report, time.time(), 'normal', speed, 'chaos', matcher, device.name)
+            started = time.perf_counter()
+            writer.record(record, [('chaos', result.rolled)], result.cell_times)
+            latencies.append(time.perf_counter() - started)
+            rolled += result.rolled
+        layout = poe_layout.LAYOUTS[poe_layout.DEFAULT_LAYOUT]
+        fixed = [speed for speed in presets if speed in SPEED_PRESETS] or ['fast']  # 자동 속도는 클립보드 필요
+        for run in range(aborts):
+            clock = VirtualClock()
+            stash = SimulatedStash(seed=seed + run)
+            device = SimulatedInputDevice(stash, seed=seed + run, clock=clock)
+            device.failsafe_after = 50 + run * 20
+            table = poe_layout.coordinate_table(layout, stash.bounds)
+            context = poe_job.RollContext(layout, table, table.cells, stash.bounds, stash.currency_pos,
+                                          round(stash.cell_width))
+            engine = RollEngine(device, clock=clock)
+            try:
+                poe_job.run_job(engine, context, poe_job.RollJob(fixed[run % len(fixed)], skip_empty=False),
+                                history=writer)
+            except InputFailSafe:
+                pass
+            engine.release_inputs()
+            rolled += engine.last_result.rolled if engine.last_result else 0
+        writer.close()
+        conn = poe_history.connect(path)
+        written = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        failsafe = conn.execute("SELECT COUNT(*) FROM runs WHERE outcome = 'failsafe'").fetchone()[0]
+        summary = {'throughput': poe_history.throughput(conn, 'day', 'preset'),
+                   'success': poe_history.success_by_preset(conn),
+                   'orbs': poe_history.orbs_per_map(conn)}
+        conn.close()
+    return latencies, rolled, written, failsafe, summary
+
+
+def measure_cell_cache(speed, runs=3, match_rate=0.3, latency=0.0, seed=0, fill=0.8):
+    """빈 칸이 섞인 보관함에서 정규식 모드를 runs번 연속 실행하며 칸 판정 캐시 효과 측정
+
+    두 번째 실행부터는 실행 전에 모든 지도를 같은 종류의 새 지도로 교체한다 (화면은 그대로).
+    실행마다 {'elapsed', 'rolled', 'reads', 'cached', 'satisfied'}와 함께 일치한 것으로 끝났지만
+    실제로는 일치하지 않는 칸 수 합계, 읽지도 롤링하지도 않은 아이템 칸 수 합계를 반환한다.
+    """
+    stash = SimulatedStash(fill=fill, seed=seed)
+    device = SimulatedInputDevice(stash, latency, seed=seed)
+    reader = SimulatedItemReader(device)
+    matcher = SimulatedMatcher(match_rate, seed)
+    targets = [(row, col) for col in range(stash.cols) for row in range(stash.rows)]
+    coords = [stash.cell_center(cell) for cell in targets]
+    engine = RollEngine(device)
+    cache = CellCache()
+    rows = []
+    wrong = 0
+    skipped = 0
+    for run in range(runs):
+        if run:
+            stash.refill()
+        cache.snapshot({pos: stash.fingerprint(cell) for pos, cell in zip(coords, targets)})
+        reads = reader.reads
+        done = set()
+        result = engine.roll(coords, stash.currency_pos, speed, matcher, reader, done=done, cache=cache)
+        matched = {stash.cell_at(pos) for pos in done}
+        wrong += sum(1 for cell in matched if not matcher.matches(stash.item_text(cell)))
+        # 롤링 전에 이미 일치한 칸 말고는 아이템이 있으면 한 번 이상 롤링되어야 함
+        skipped += sum(1 for cell, rolls in stash.items.items() if not rolls and cell not in matched)
+        rows.append({'elapsed': result.elapsed, 'rolled': result.rolled, 'reads': reader.reads - reads,
+                     'cached': result.cached, 'satisfied': result.satisfied})
+    return rows, wrong, skipped
+
+
+def measure_pipeline(speed, pipeline, latency=0.0, seed=0):
+    """여러 커런시 단계를 커런시별로 묶어 실행한 경우와 칸마다 커런시를 바꿔 가며 실행한 경우 비교
+
+    칸마다 무작위 희귀도로 단계 계획을 세운다. {방식: {'elapsed', 'clicks', 'pickups', 'travel'}}와
+    계획대로 적용되지 않은 칸 수 합계를 반환한다.
+    """
+    steps = poe_craft.CRAFT_PIPELINES[pipeline]
+    results = {}
+    wrong = 0
+    for mode in ('grouped', 'per_item'):
+        stash = SimulatedStash(seed=seed)
+        slots = {name: (stash.currency_pos[0] - i * round(stash.cell_width), stash.currency_pos[1])
+                 for i, name in enumerate(('chaos', 'alch', 'scour'))}
+        stash.currencies = {pos: name for name, pos in slots.items()}
+        device = SimulatedInputDevice(stash, latency, seed=seed)
+        rng = random.Random(seed)
+        targets = sorted(stash.items, key=lambda cell: (cell[1], cell[0]))
+        rarities = {cell: rng.choice(('normal', 'magic', 'rare')) for cell in targets}
+        plan = poe_craft.plan_steps(targets, steps, rarities)
+        engine = RollEngine(device)
+        started = time.perf_counter()
+        if mode == 'grouped':
+            groups = []
+            for name, cells in poe_craft.group_steps(plan, steps):
+                points = [stash.cell_center(cell) for cell in cells]
+                order = poe_path.plan_order(points, cells, start=slots[name])
+                groups.append((name, [points[i] for i in order]))
+            poe_craft.run_pipeline(engine, groups, slots, speed)
+        else:
+            points = [stash.cell_center(cell) for cell in targets]
+            for i in poe_path.plan_order(points, targets, start=stash.currency_pos):
+                for name in plan[targets[i]]:
+                    engine.roll([points[i]], slots[name], speed)
+        results[mode] = {'elapsed': time.perf_counter() - started, 'clicks': device.clicks,
+                         'pickups': device.pickups, 'travel': device.travel}
+        wrong += sum(1 for cell in targets if stash.applied[cell] != plan[cell])
+    return results, wrong
+
+
+def measure_pipeline_verify(speed, pipeline, drop_rate=0.0, seed=0, interrupt=None):
+    """희귀도를 모르는 채로 모든 칸에 모든 단계를 클릭 확인 모드로 적용 (가상 시계)
+
+    희귀도가 맞지 않는 커런시는 게임처럼 거부된다. interrupt(입력 수)를 주면 그만큼 입력한 뒤
+    비상 정지로 끊고 단계별 끝난 칸으로 이어서 마친다.
+    ({'elapsed', 'clicks', 'passes', 'failed', 'repeated'}, 희귀도 기준 계획과 다르게 적용된 칸 수) 반환
+    """
+    steps = poe_craft.CRAFT_PIPELINES[pipeline]
+    stash = SimulatedStash(seed=seed)
+    slots = {name: (stash.currency_pos[0] - i * round(stash.cell_width), stash.currency_pos[1])
+             for i, name in enumerate(('chaos', 'alch', 'scour'))}
+    stash.currencies = {pos: name for name, pos in slots.items()}
+    rng = random.Random(seed)
+    targets = sorted(stash.items, key=lambda cell: (cell[1], cell[0]))
+    stash.rarities = {cell: rng.choice(('normal', 'magic', 'rare')) for cell in targets}
+    plan = {cell: poe_craft.plan_cell(steps, stash.rarities[cell]) for cell in targets}
+    clock = VirtualClock()
+    device = SimulatedInputDevice(stash, drop_rate=drop_rate, seed=seed, clock=clock)
+    reader = SimulatedItemReader(device)
+    points = [stash.cell_center(cell) for cell in targets]
+    groups = []
+    for name, cells in poe_craft.group_steps(poe_craft.plan_steps(targets, steps), steps):
+        cell_points = [stash.cell_center(cell) for cell in cells]
+        order = poe_path.plan_order(cell_points, cells, start=slots[name])
+        groups.append((name, [cell_points[i] for i in order]))
+    engine = RollEngine(device, clock=clock)
+    pacer = AdaptivePacer() if speed == 'adaptive' else None
+    done = set()
+    step_done = {}
+    results = []
+    device.failsafe_after = interrupt
+    for _ in range(2):
+        try:
+            results += poe_craft.run_pipeline(engine, groups, slots, speed, done=done, reader=reader, pacer=pacer,
+                                              analyzer=ClickVerifier(device, reader), step_done=step_done)
+            break
+        except InputFailSafe:
+            engine.release_inputs()
+            device.failsafe_after = None
+    row = {'elapsed': clock.now(), 'clicks': device.clicks,
+           'passes': max((step.passes for _, step in results), default=0),
+           'failed': sum(step.failed for _, step in results), 'repeated': stash.repeated}
+    wrong = sum(1 for cell in targets if stash.applied[cell] != plan[cell] or cell not in
+                {stash.cell_at(pos) for pos in done})
+    return row, wrong
+
+
+def measure_capture(grabs=500, seed=0):
+    """가상 화면(2560x1440)에서 그리드/커런시 칸 영역 캡처 지연 측정
+
+    링 버퍼 캡처와 매번 새 배열을 만드는 캡처를 번갈아 실행하여 비교한다 (실행 순서/워밍업 차이 배제).
+    ({방식: {영역: stats}}, 버퍼 재사용 여부) 반환
+    """
+    import numpy as np
+    import poe_capture
+    rng = np.random.default_rng(seed)
+    screen = rng.integers(0, 256, size=(1440, 2560, 3), dtype=np.uint8)
+    provider = poe_capture.ArrayCaptureProvider(screen)
+    regions = {'grid': {'left': 20, 'top': 166, 'right': 868, 'bottom': 1014},
+               'currency': {'left': 1709, 'top': 935, 'right': 1771, 'bottom': 997}}
+
+    engine = poe_capture.CaptureEngine(provider)
+    for name, bounds in regions.items():
+        engine.set_region(name, bounds)
+    buffers = {name: {id(buffer) for buffer in region.buffers} for name, region in engine.regions.items()}
+    reused = True
+    latencies = {mode: {name: [] for name in regions} for mode in ('ring', 'alloc')}
+    warmup = max(1, grabs // 10)
+    for i in range(warmup + grabs):
+        for name, bounds in regions.items():
+            # 먼저 실행한 쪽이 원본 화면을 캐시에 올려 두므로 순서를 번갈아 바꿈
+            for mode in (('ring', 'alloc') if i % 2 else ('alloc', 'ring')):
+                if mode == 'ring':
+                    frame = engine.grab(name)
+                    reused = reused and id(frame.image) in buffers[name]
+                    latency = frame.latency
+                else:
+                    # 비교: 캡처마다 새 배열 할당
+                    started = time.perf_counter()
+                    image = np.empty((bounds['bottom'] - bounds['top'], bounds['right'] - bounds['left'], 4),
+                                     dtype=np.uint8)
+                    provider.grab_into(bounds['left'], bounds['top'], image)
+                    latency = time.perf_counter() - started
+                if i >= warmup:
+                    latencies[mode][name].append(latency)
+    engine.close()
+    results = {mode: {name: {'mean': sum(values) / len(values), 'p50': percentile(values, 0.5),
+                             'p99': percentile(values, 0.99)} for name, values in regions.items()}
+               for mode, regions in latencies.items()}
+    return results, reused
+
+
+def measure_startup(trials=5):
+    """새 프로세스에서 poe_roller import/창 표시 시간 측정
+
+    (import 최소 시간, 창 표시 최소 시간 또는 None, 시작 시 import된 무거운 모듈, import 시간 상위 목록) 반환
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = STARTUP_SCRIPT % (STARTUP_HEAVY_MODULES,)
+    runs = []
+    stderr = ''
+    for _ in range(trials):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=here,
+                              capture_output=True, text=True, check=True)
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        stderr = proc.stderr
+
+    # -X importtime 출력: "import time: self | cumulative | 모듈" (최상위 모듈만 집계)
+    slowest = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[0].startswith('import time:'):
+            continue
+        name = parts[2].rstrip()[1:]
+        if name.startswith(' ') or not parts[1].strip().isdigit():
+            continue
+        slowest.append((int(parts[1]) / 1e6, name.strip()))
+    slowest.sort(reverse=True)
+
+    shown = [run['shown'] for run in runs if run['shown'] is not None]
+    return (min(run['import'] for run in runs), min(shown) if shown else None,
+            runs[-1]['heavy'], slowest[:5])
+
+
+def busy(seconds):
+    """입력 호출처럼 seconds 동안 CPU를 쓰는 작업"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def measure_timing(samples=200, intervals=TIMING_INTERVALS, overhead=TIMING_OVERHEAD):
+    """기존 대기(Event.wait)와 정밀 대기(DeadlineTimer)의 간격 오차 비교
+
+    대기 사이마다 overhead만큼 입력 호출을 흉내 내고, 연속한 두 대기가 끝난 시각의 간격에서
+    목표 간격을 뺀 값을 오차로 본다. {모드: {간격: {'mean', 'p50', 'p99', 'max', 'rate'}}} 반환
+    (rate는 목표 대비 실제 초당 횟수 비율)
+    """
+    cancel = threading.Event()
+    timer = DeadlineTimer(cancel)
+    waits = {'event': lambda seconds: cancel.wait(seconds), 'deadline': lambda seconds: timer.wait(seconds)}
+    results = {}
+    with TimerResolution():
+        for mode, wait in waits.items():
+            results[mode] = {}
+            for interval in intervals:
+                timer.reset()
+                errors = []
+                wait(interval)
+                last = time.perf_counter()
+                for _ in range(samples):
+                    busy(overhead)
+                    wait(interval)
+                    now = time.perf_counter()
+                    errors.append(now - last - interval)
+                    last = now
+                mean = sum(errors) / len(errors)
+                results[mode][interval] = {'mean': mean, 'p50': percentile(errors, 0.5), 'p99': percentile(errors, 0.99), 'max': max(errors),
+                                           'rate': interval / (interval + mean)}
+    return results
+
+
+def compare(results, baseline, tolerance=BENCH_TOLERANCE):
+    """기준 결과 대비 처리량이 tolerance 이상 떨어진 프리셋 목록"""
+    regressions = []
+    previous = {row['preset']: row for row in baseline}
+    for row in results:
+        base = previous.get(row['preset'])
+        if base and row['cells_per_sec'] < base['cells_per_sec'] * (1.0 - tolerance):
+            regressions.append((row['preset'], base['cells_per_sec'], row['cells_per_sec']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PoE 롤러 가상 보관함 벤치마크")
+    presets = list(SPEED_PRESETS) + ['adaptive']
+    parser.add_argument('--presets', nargs='+', default=presets, choices=presets)
+    parser.add_argument('--cells', type=int, help="롤링할 칸 수 (기본: 레이아웃의 모든 칸)")
+    parser.add_argument('--layout', default=poe_layout.DEFAULT_LAYOUT, choices=list(poe_layout.LAYOUTS),
+                        help="가상 보관함 크기 (quad는 24x24)")
+    parser.add_argument('--match', type=float, default=0.0, help="정규식 모드: 롤링마다 조건을 만족할 확률 (0~1)")
+    parser.add_argument('--analysis-ms', type=float, help="클릭마다 실행할 가상 검사 시간 (ms)")
+    parser.add_argument('--analysis-workers', type=int, default=1, help="검사 작업자 수 (0이면 입력 스레드에서 실행)")
+    parser.add_argument('--verify', action='store_true', help="클릭 확인 모드 (아이템 텍스트 전후 비교 후 누락된 칸만 재시도)")
+    parser.add_argument('--fill', type=float, default=1.0, help="아이템이 있는 칸 비율")
+    parser.add_argument('--latency', type=float, default=0.0, help="입력 이벤트당 지연 (ms)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="추가 무작위 지연 최대값 (ms)")
+    parser.add_argument('--drop', type=float, default=0.0, help="클릭 누락 확률 (0~1)")
+    parser.add_argument('--min-interval', type=float, default=0.0, help="게임이 처리할 수 있는 최소 클릭 간격 (ms)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="결과를 JSON 파일로 저장")
+    parser.add_argument('--compare', help="기준 JSON과 비교하여 처리량이 떨어지면 실패")
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE)
+    parser.add_argument('--trace', help="프리셋별 Chrome trace JSON 저장 경로 접두사")
+    parser.add_argument('--stop-trials', type=int, default=0, help="중지 지연 측정 반복 횟수 (0이면 처리량 측정)")
+    parser.add_argument('--stop-budget', type=float, default=STOP_BUDGET * 1000, help="허용 중지 지연 (ms)")
+    parser.add_argument('--capture', type=int, default=0, help="영역 캡처 지연 측정 횟수 (numpy 필요)")
+    parser.add_argument('--cache-runs', type=int, default=0, help="칸 판정 캐시 검사: 같은 보관함 연속 실행 횟수")
+    parser.add_argument('--pipeline', choices=list(poe_craft.CRAFT_PIPELINES),
+                        help="여러 커런시 단계: 커런시별 묶음 실행과 칸마다 커런시 교체 비교")
+    parser.add_argument('--release-trials', type=int, default=0, help="중지/비상 정지 후 키 해제 검사 반복 횟수")
+    parser.add_argument('--resume-trials', type=int, default=0, help="중지 후 이어하기 검사 반복 횟수")
+    parser.add_argument('--virtual', action='store_true', help="가상 시계로 실행 (실제로 기다리지 않고 같은 시간 통계 보고)")
+    parser.add_argument('--history', type=int, default=0, help="작업 기록 검사: 가상 작업 수")
+    parser.add_argument('--timing', type=int, default=0, help="대기 정확도 측정: 간격마다 반복 횟수")
+    parser.add_argument('--timing-budget', type=float, default=TIMING_BUDGET * 1000, help="허용 간격 오차 중앙값 (ms)")
+    parser.add_argument('--startup', type=int, default=0, help="시작 시간 측정 반복 횟수 (0이면 처리량 측정)")
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET * 1000, help="허용 시작 시간 (ms)")
+    args = parser.parse_args(argv)
+
+    if args.capture:
+        results, reused = measure_capture(args.capture, args.seed)
+        print(f"{'mode':>6} {'region':>9} {'mean us':>8} {'p50 us':>8} {'p99 us':>8}")
+        for mode, regions in results.items():
+            for name, stats in regions.items():
+                print(f"{mode:>6} {name:>9} {stats['mean'] * 1e6:>8.1f} {stats['p50'] * 1e6:>8.1f} {stats['p99'] * 1e6:>8.1f}")
+        failed = False
+        if not reused:
+            print("링 버퍼가 아닌 새 버퍼에 캡처되었습니다")
+            failed = True
+        for name, stats in results['ring'].items():
+            alloc = results['alloc'][name]
+            if stats['p50'] > alloc['p50'] * (1 + CAPTURE_TOLERANCE):
+                print(f"{name}: 링 버퍼 캡처(중앙값 {stats['p50'] * 1e6:.1f}us)가 "
+                      f"매번 할당하는 캡처({alloc['p50'] * 1e6:.1f}us)보다 느립니다")
+                failed = True
+        return 1 if failed else 0
+
+    if args.history:
+        aborts = max(1, args.history // 5)
+        latencies, rolled, written, failsafe, summary = measure_history(args.presets, args.history,
+                                                                        args.match or 0.3, args.seed, aborts)
+        print(f"record() 최대 {max(latencies) * 1e6:.0f}us, 평균 {sum(latencies) / len(latencies) * 1e6:.0f}us, "
+              f"기록 {written}/{args.history + aborts} (비상 정지 {failsafe}/{aborts})")
+        print(f"{'preset':>8} {'runs':>5} {'cells/s':>8} {'matched':>8} {'chaos/map':>10}")
+        orbs = {row['group']: row['per_map'] for row in summary['orbs']}
+        throughput = {row['group']: row for row in summary['throughput']}
+        for row in summary['success']:
+            print(f"{row['preset']:>8} {row['runs']:>5} {throughput[row['preset']]['cells_per_sec']:>8.2f} "
+                  f"{row['match_rate']:>8.1%} {orbs.get(row['preset']) or 0:>10.2f}")
+        failed = False
+        if written != args.history + aborts or failsafe != aborts or \
+                sum(row['rolled'] for row in summary['throughput']) != rolled:
+            print("기록된 작업/롤링 수가 실행한 것과 다릅니다")
+            failed = True
+        # 롤링할 때마다 match 확률로 일치하므로 롤링한 지도 한 장당 기대 커런시 수는 1/match
+        expected = 1 / (args.match or 0.3)
+        for row in summary['orbs']:
+            if row['per_map'] is None or abs(row['per_map'] - expected) > expected * HISTORY_ORBS_TOLERANCE:
+                print(f"{row['group']}: 지도 한 장당 커런시 {row['per_map'] or 0:.2f}개가 기대값 {expected:.2f}개와 다릅니다")
+                failed = True
+        if max(latencies) > HISTORY_RECORD_BUDGET:
+            print(f"record()가 허용치 {HISTORY_RECORD_BUDGET * 1000:.1f}ms보다 오래 걸렸습니다")
+            failed = True
+        return 1 if failed else 0
+
+    if args.timing:
+        results = measure_timing(args.timing)
+        failed = False
+        print(f"{'mode':>9} {'target ms':>10} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'rate':>7}")
+        for mode, rows in results.items():
+            for interval, row in rows.items():
+                print(f"{mode:>9} {interval * 1000:>10.1f} {row['mean'] * 1000:>8.3f} {row['p50'] * 1000:>8.3f} {row['p99'] * 1000:>8.3f} "
+                      f"{row['max'] * 1000:>8.3f} {row['rate']:>7.1%}")
+                failed = failed or (mode == 'deadline' and abs(row['p50']) * 1000 > args.timing_budget)
+        if failed:
+            print(f"정밀 대기의 간격 오차가 허용치 {args.timing_budget:.1f}ms를 넘었습니다")
+            return 1
+        return 0
+
+    if args.pipeline and args.verify:
+        failed = False
+        print(f"{'preset':>8} {'mode':>9} {'clicks':>7} {'passes':>7} {'failed':>7} {'repeat':>7} {'sec':>7}")
+        for speed in args.presets:
+            for mode, interrupt in (('full', None), ('resumed', 300)):
+                row, wrong = measure_pipeline_verify(speed, args.pipeline, args.drop, args.seed, interrupt)
+                print(f"{speed:>8} {mode:>9} {row['clicks']:>7} {row['passes']:>7} {row['failed']:>7} "
+                      f"{row['repeated']:>7} {row['elapsed']:>7.2f}")
+                if wrong or row['failed'] or row['repeated']:
+                    print(f"{speed:>8} {mode}: 계획과 다르게 적용되었거나 끝나지 않은 칸 {wrong}개, "
+                          f"확인 실패 {row['failed']}칸, 끝난 단계 재적용 {row['repeated']}회")
+                    failed = True
+        return 1 if failed else 0
+
+    if args.pipeline:
+        failed = False
+        print(f"{'preset':>8} {'mode':>9} {'clicks':>7} {'pickups':>8} {'travel px':>10} {'sec':>7}")
+        for speed in args.presets:
+            results, wrong = measure_pipeline(speed, args.pipeline, args.latency / 1000, args.seed)
+            for mode, row in results.items():
+                print(f"{speed:>8} {mode:>9} {row['clicks']:>7} {row['pickups']:>8} {row['travel']:>10.0f} "
+                      f"{row['elapsed']:>7.2f}")
+            if wrong:
+                print(f"{speed:>8} 계획과 다르게 커런시가 적용된 칸 {wrong}개")
+                failed = True
+        return 1 if failed else 0
+
+    if args.cache_runs:
+        failed = False
+        print(f"{'preset':>8} {'run':>4} {'rolled':>7} {'reads':>6} {'cached':>7} {'matched':>8} {'sec':>7}")
+        for speed in args.presets:
+            rows, wrong, skipped = measure_cell_cache(speed, args.cache_runs, args.match or 0.3,
+                                                      args.latency / 1000, args.seed)
+            for run, row in enumerate(rows, 1):
+                print(f"{speed:>8} {run:>4} {row['rolled']:>7} {row['reads']:>6} {row['cached']:>7} "
+                      f"{row['satisfied']:>8} {row['elapsed']:>7.2f}")
+            if wrong:
+                print(f"{speed:>8} 일치하지 않는 지도 {wrong}개를 일치한 것으로 처리했습니다")
+                failed = True
+            if skipped:
+                print(f"{speed:>8} 아이템이 있는 칸 {skipped}개를 읽지도 롤링하지도 않았습니다")
+                failed = True
+        return 1 if failed else 0
+
+    if args.release_trials:
+        failed = False
+        print(f"{'preset':>8} {'mode':>9} {'trials':>7} {'leaked':>7} {'redundant':>10} {'keys/run':>9} {'join ms':>8}")
+        for speed in args.presets:
+            rows = measure_release(speed, args.release_trials, args.latency / 1000, args.seed)
+            for mode in ('stop', 'failsafe'):
+                group = [row for row in rows if row['mode'] == mode]
+                if not group:
+                    continue
+                leaked = sum(1 for row in group if row['leaked'])
+                print(f"{speed:>8} {mode:>9} {len(group):>7} {leaked:>7} {sum(row['redundant'] for row in group):>10} "
+                      f"{sum(row['key_events'] for row in group) / len(group):>9.1f} "
+                      f"{max(row['join'] for row in group) * 1000:>8.2f}")
+                failed = failed or leaked > 0
+        if failed:
+            print("작업이 끝난 뒤 눌린 채 남은 키/버튼이 있습니다")
+        return 1 if failed else 0
+
+    if args.resume_trials:
+        failed = False
+        print(f"{'preset':>8} {'unrolled':>9} {'doubled':>8}")
+        for speed in args.presets:
+            unrolled, doubled = measure_resume(speed, args.resume_trials, args.latency / 1000, args.seed)
+            print(f"{speed:>8} {unrolled:>9} {doubled:>8}")
+            # 중지 직전 한 칸은 다시 롤링될 수 있음 (클릭 전달 여부를 알 수 없음)
+            failed = failed or unrolled > 0 or doubled > args.resume_trials
+        return 1 if failed else 0
+
+    if args.startup:
+        imported, shown, heavy, slowest = measure_startup(args.startup)
+        print(f"import {imported * 1000:.1f}ms")
+        if shown is None:
+            print("창 표시: 디스플레이가 없어 측정하지 않음")
+        else:
+            print(f"창 표시 {shown * 1000:.1f}ms")
+        for seconds, name in slowest:
+            print(f"  {name:<24}{seconds * 1000:>8.1f}ms")
+        failed = False
+        if heavy:
+            print(f"시작 시 import되면 안 되는 모듈: {', '.join(heavy)}")
+            failed = True
+        if (shown if shown is not None else imported) * 1000 > args.startup_budget:
+            print(f"시작 시간이 허용치 {args.startup_budget:.0f}ms를 넘었습니다")
+            failed = True
+        return 1 if failed else 0
+
+    if args.stop_trials:
+        failed = False
+        print(f"{'preset':>8} {'max ms':>8} {'mean ms':>8} {'join ms':>8}")
+        for speed in args.presets:
+            worst, mean, join = measure_stop_latency(speed, args.stop_trials, args.latency / 1000, args.seed)
+            print(f"{speed:>8} {worst * 1000:>8.2f} {mean * 1000:>8.2f} {join * 1000:>8.2f}")
+            failed = failed or worst * 1000 > args.stop_budget
+        if failed:
+            print(f"중지 지연이 허용치 {args.stop_budget:.0f}ms를 넘었습니다")
+            return 1
+        return 0
+
+    if args.virtual and args.analysis_ms is not None:
+        print("--virtual은 분석 작업자 스레드(--analysis-ms)와 함께 쓸 수 없습니다")
+        return 2
+
+    grid = poe_layout.LAYOUTS[args.layout]
+    if args.cells is None:
+        args.cells = grid.rows * grid.cols
+    elif args.cells < grid.rows * grid.cols:
+        print(f"{grid.label} 보관함 {grid.rows * grid.cols}칸 중 앞의 {args.cells}칸만 롤링합니다")
+    results = []
+    print(f"{'preset':>8} {'cells':>6} {'cells/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'missed':>7} {'unrolled':>8}")
+    traces = []
+    failed = False
+    for speed in args.presets:
+        clock = VirtualClock() if args.virtual else None
+        tracer = poe_trace.Tracer((clock or SYSTEM_CLOCK).now_ns) if args.trace else None
+        row = run_preset(speed, args.cells, args.latency / 1000, args.jitter / 1000,
+                         args.drop, args.fill, args.seed, args.min_interval / 1000, tracer, args.layout,
+                         args.match, None if args.analysis_ms is None else args.analysis_ms / 1000,
+                         args.analysis_workers, args.verify, clock)
+        results.append(row)
+        print(f"{row['preset']:>8} {row['cells']:>6} {row['cells_per_sec']:>9.2f} "
+              f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['missed_rate']:>7.2%} {row['unrolled']:>8}")
+        if args.verify:
+            print(f"{'':>8}   재시도 {row['retries']}회, 확인 실패 {row['failed']}칸")
+        if args.virtual:
+            print(f"{'':>8}   가상 {row['elapsed']:.1f}초, 실제 소요 {row['wall'] * 1000:.1f}ms")
+            failed = failed or row['wall'] > VIRTUAL_WALL_BUDGET
+        for report in row['pass_reports'] if args.match or args.analysis_ms is not None or args.verify else ():
+            print(f"{'':>8}   {report['pass']}회차: 롤링 {report['rolled']}, 완료 {report['resolved']}, "
+                  f"남음 {report['remaining']}, {report['elapsed']:.2f}s")
+        if tracer:
+            tracer.export(f"{args.trace}_{speed}.json")
+            traces.append((speed, poe_trace.format_summary(tracer)))
+
+    for speed, text in traces:
+        print(f"\n[{speed}]\n{text}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for preset, before, after in regressions:
+            print(f"속도 저하: {preset} {before:.2f} -> {after:.2f} cells/s")
+        if regressions:
+            return 1
+    if failed:
+        print(f"가상 시계 실행이 허용치 {VIRTUAL_WALL_BUDGET * 1000:.0f}ms보다 오래 걸렸습니다")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
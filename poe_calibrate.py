@@ -0,0 +1,317 @@
+import os
+import json
+
+import numpy as np
+
+from poe_vision import to_gray
+
+# --- 자동 보정 설정 ---
+CHAOS_TEMPLATE_FILE = 'poe_chaos_template.npy'  # '위치 설정' 완료 시 카오스 오브 칸을 잘라 저장
+CALIBRATION_FILE = 'poe_calibration.json'  # 창 크기별 보정 결과 캐시
+PYRAMID_DOWNSAMPLE = 4  # 넓은 범위 탐색은 이 배율로 줄인 이미지에서
+PYRAMID_SCALES = (0.5, 0.625, 0.75, 0.875, 1.0, 1.125, 1.25, 1.5, 1.75, 2.0)  # 템플릿 크기 배율 후보
+REFINE_MARGIN = 8  # 원본 해상도에서 다시 찾을 때 주변 여유 (픽셀, 축소 배율 곱함)
+MATCH_MIN_SCORE = 0.6  # 이보다 낮은 정규화 상관값은 찾지 못한 것으로 처리
+GRID_SEARCH_MARGIN = 0.2  # 추정 그리드 영역을 이 비율만큼 넓혀 격자선 탐색
+GRID_PITCH_RANGE = (0.6, 1.4)  # 추정 칸 간격 대비 탐색할 간격 범위 (2배 고조파 배제)
+GRID_MIN_PERIODICITY = 0.3  # 자기상관 최고값/에너지가 이보다 낮으면 격자선이 없는 것으로 처리
+# -------------
+
+
+def downsample(gray, factor):
+    """factor x factor 블록 평균으로 축소 (피라미드 한 단계)"""
+    if factor <= 1:
+        return gray
+    height = gray.shape[0] // factor * factor
+    width = gray.shape[1] // factor * factor
+    return gray[:height, :width].reshape(height // factor, factor, width // factor, factor).mean(axis=(1, 3))
+
+
+def resize(gray, scale):
+    """양선형 보간으로 크기 변경"""
+    height, width = gray.shape
+    new_h = max(1, int(round(height * scale)))
+    new_w = max(1, int(round(width * scale)))
+    ys = np.clip((np.arange(new_h) + 0.5) / scale - 0.5, 0, height - 1)
+    xs = np.clip((np.arange(new_w) + 0.5) / scale - 0.5, 0, width - 1)
+    y0 = ys.astype(np.intp)
+    x0 = xs.astype(np.intp)
+    y1 = np.minimum(y0 + 1, height - 1)
+    x1 = np.minimum(x0 + 1, width - 1)
+    wy = (ys - y0)[:, None]
+    wx = (xs - x0)[None, :]
+    top = gray[y0][:, x0] * (1 - wx) + gray[y0][:, x1] * wx
+    bottom = gray[y1][:, x0] * (1 - wx) + gray[y1][:, x1] * wx
+    return top * (1 - wy) + bottom * wy
+
+
+def _fast_length(n):
+    """n 이상인 가장 작은 2, 3, 5의 곱 (FFT가 빠른 길이)"""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _window_sums(values, height, width):
+    """모든 height x width 창의 합 (적분 이미지 사용)"""
+    integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1))
+    integral[1:, 1:] = values.cumsum(0, dtype=np.float64).cumsum(1)
+    return (integral[height:, width:] - integral[:-height, width:]
+            - integral[height:, :-width] + integral[:-height, :-width])
+
+
+def match_template(gray, template):
+    """정규화 상관(NCC) 점수 지도 (FFT 상관 + 적분 이미지로 전체 위치를 한 번에 계산)
+
+    점수 지도 [y, x]는 템플릿 왼쪽 위를 (x, y)에 놓았을 때의 값 (-1~1). 템플릿이 더 크면 None.
+    """
+    gray = np.asarray(gray, dtype=np.float64)
+    height, width = gray.shape
+    t_h, t_w = template.shape
+    if t_h > height or t_w > width:
+        return None
+    t = template - template.mean()
+    t_norm = np.sqrt((t * t).sum())
+    if t_norm == 0:
+        return None
+    shape = (_fast_length(height + t_h - 1), _fast_length(width + t_w - 1))
+    spectrum = np.fft.rfft2(gray, shape) * np.fft.rfft2(t[::-1, ::-1], shape)
+    correlation = np.fft.irfft2(spectrum, shape)[t_h - 1:height, t_w - 1:width]
+    sums = _window_sums(gray, t_h, t_w)
+    squares = _window_sums(gray * gray, t_h, t_w)
+    variance = squares - sums * sums / (t_h * t_w)
+    # 거의 단색인 영역은 잡음만으로 점수가 튀므로 제외 (템플릿 분산의 1% 미만)
+    flat = variance < t_norm * t_norm * 0.01
+    scores = correlation / (np.sqrt(np.maximum(variance, 1e-6)) * t_norm)
+    scores[flat] = 0
+    return scores
+
+
+def find_template(gray, template, scales=PYRAMID_SCALES, factor=PYRAMID_DOWNSAMPLE):
+    """여러 크기의 템플릿을 축소 이미지에서 찾은 뒤 원본 해상도에서 위치 보정
+
+    {'score', 'scale', 'left', 'top', 'width', 'height'} 또는 None 반환
+    """
+    small = downsample(gray, factor)
+    best = None
+    for scale in scales:
+        # 이미지와 같은 블록 평균으로 줄여야 축소 단계의 상관값이 유지됨
+        scaled = downsample(resize(template, scale), factor)
+        if min(scaled.shape) < 4:
+            continue
+        scores = match_template(small, scaled)
+        if scores is None:
+            continue
+        y, x = np.unravel_index(np.argmax(scores), scores.shape)
+        if best is None or scores[y, x] > best[0]:
+            best = (scores[y, x], scale, y * factor, x * factor)
+    if best is None:
+        return None
+
+    _, scale, top, left = best
+    scaled = resize(template, scale)
+    margin = REFINE_MARGIN * factor
+    y0 = max(0, top - margin)
+    x0 = max(0, left - margin)
+    region = gray[y0:top + scaled.shape[0] + margin, x0:left + scaled.shape[1] + margin]
+    scores = match_template(region, scaled)
+    if scores is None:
+        return None
+    y, x = np.unravel_index(np.argmax(scores), scores.shape)
+    return {
+        'score': float(scores[y, x]),
+        'scale': scale,
+        'left': int(x0 + x),
+        'top': int(y0 + y),
+        'width': scaled.shape[1],
+        'height': scaled.shape[0],
+    }
+
+
+def line_pitch(profile, expected):
+    """격자선 에지 프로파일에서 칸 간격(소수)과 첫 격자선 위치 추정 (주기성이 약하면 None)"""
+    values = profile - profile.mean()
+    energy = float(np.dot(values, values))
+    if energy <= 0:
+        return None
+    low = max(2, int(expected * GRID_PITCH_RANGE[0]))
+    high = min(len(values) - 2, int(expected * GRID_PITCH_RANGE[1]) + 1)
+    if high <= low:
+        return None
+    lags = np.arange(low, high + 1)
+    autocorr = np.array([np.dot(values[:-lag], values[lag:]) for lag in lags])
+    i = int(np.argmax(autocorr))
+    if autocorr[i] < energy * GRID_MIN_PERIODICITY:
+        return None
+    pitch = float(lags[i])
+    if 0 < i < len(lags) - 1:
+        # 포물선 보간으로 소수 간격
+        a, b, c = autocorr[i - 1], autocorr[i], autocorr[i + 1]
+        denominator = a - 2 * b + c
+        if denominator:
+            pitch += 0.5 * (a - c) / denominator
+    phases = np.arange(int(np.ceil(pitch)))
+    scores = [profile[np.round(np.arange(phase, len(profile), pitch)).astype(np.intp).clip(0, len(profile) - 1)].sum()
+              for phase in phases]
+    return pitch, float(phases[int(np.argmax(scores))])
+
+
+def _snap_lines(profile, origin, pitch, phase, estimate, count):
+    """추정 시작 위치 주변 격자선 중 count+1개 선의 에지 합이 가장 큰 시작선"""
+    base = round((estimate - origin - phase) / pitch)
+    best = None
+    for k in range(base - 3, base + 4):
+        start = phase + k * pitch
+        lines = np.round(start + pitch * np.arange(count + 1)).astype(np.intp)
+        if lines[0] < 0 or lines[-1] >= len(profile):
+            continue
+        score = profile[lines].sum()
+        if best is None or score > best[0]:
+            best = (score, start)
+    return origin + (best[1] if best else phase + base * pitch)
+
+
+def find_grid(gray, estimate, rows, cols):
+    """추정 그리드 경계 주변에서 격자선을 찾아 경계 보정 (찾지 못하면 None)"""
+    height, width = gray.shape
+    margin_x = int((estimate['right'] - estimate['left']) * GRID_SEARCH_MARGIN)
+    margin_y = int((estimate['bottom'] - estimate['top']) * GRID_SEARCH_MARGIN)
+    left = max(0, estimate['left'] - margin_x)
+    right = min(width, estimate['right'] + margin_x)
+    top = max(0, estimate['top'] - margin_y)
+    bottom = min(height, estimate['bottom'] + margin_y)
+    region = gray[top:bottom, left:right]
+    if region.shape[0] < 8 or region.shape[1] < 8:
+        return None
+
+    # 세로 격자선은 가로 방향 밝기 변화, 가로 격자선은 세로 방향 밝기 변화로 나타남
+    profile_x = np.abs(np.diff(region, axis=1)).mean(axis=0)
+    profile_y = np.abs(np.diff(region, axis=0)).mean(axis=1)
+    found_x = line_pitch(profile_x, (estimate['right'] - estimate['left']) / cols)
+    found_y = line_pitch(profile_y, (estimate['bottom'] - estimate['top']) / rows)
+    if found_x is None or found_y is None:
+        return None
+    pitch_x, phase_x = found_x
+    pitch_y, phase_y = found_y
+    grid_left = _snap_lines(profile_x, left, pitch_x, phase_x, estimate['left'], cols)
+    grid_top = _snap_lines(profile_y, top, pitch_y, phase_y, estimate['top'], rows)
+    # diff는 선 바로 앞 픽셀 기준이므로 반 픽셀 보정
+    return {
+        'left': int(round(grid_left + 0.5)),
+        'top': int(round(grid_top + 0.5)),
+        'right': int(round(grid_left + 0.5 + pitch_x * cols)),
+        'bottom': int(round(grid_top + 0.5 + pitch_y * rows)),
+        'pitch': (pitch_x, pitch_y),
+    }
+
+
+def calibrate(image, template, estimate, rows, cols, order='RGB'):
+    """창 스크린샷에서 카오스 오브 칸과 그리드 경계 찾기 (좌표는 이미지 기준)
+
+    estimate: {'chaos_pos', 'chaos_size', 'grid_bounds'} (창 비율로 계산한 추정값)
+    rows/cols가 None이면 (슬롯형 보관함) 그리드 검출 생략
+    찾은 항목만 estimate 값을 대체한 같은 형식의 딕셔너리와 점수, 그리드 검출 여부(grid_found) 반환
+    """
+    gray = to_gray(image, order)
+    result = {
+        'chaos_pos': tuple(estimate['chaos_pos']),
+        'chaos_size': estimate['chaos_size'],
+        'grid_bounds': dict(estimate['grid_bounds']),
+        'score': None,
+        'grid_found': False,
+    }
+    if template is not None:
+        found = find_template(gray, to_gray(template))
+        if found and found['score'] >= MATCH_MIN_SCORE:
+            result['chaos_pos'] = (found['left'] + found['width'] // 2, found['top'] + found['height'] // 2)
+            result['chaos_size'] = found['width']
+            result['score'] = found['score']
+    grid = find_grid(gray, estimate['grid_bounds'], rows, cols) if rows and cols else None
+    if grid:
+        result['grid_bounds'] = {key: grid[key] for key in ('left', 'top', 'right', 'bottom')}
+        result['grid_found'] = True
+    return result
+
+
+def load_template(path=CHAOS_TEMPLATE_FILE):
+    """저장된 카오스 오브 템플릿 (.npy 또는 이미지 파일, 없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    if path.endswith('.npy'):
+        return np.load(path)
+    from poe_vision import load_image
+    return load_image(path)
+
+
+def save_template(image, path=CHAOS_TEMPLATE_FILE, order='RGB'):
+    """카오스 오브 칸 이미지를 그레이스케일 템플릿으로 저장"""
+    np.save(path, to_gray(image, order))
+
+
+class CalibrationCache:
+    """창 크기와 레이아웃별 보정 결과 (창 왼쪽 위 기준 상대 좌표로 저장)"""
+
+    def __init__(self, path=CALIBRATION_FILE):
+        self.path = path
+        self.entries = {}
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(width, height, layout_name):
+        return f"{width}x{height}/{layout_name}"
+
+    def lookup(self, window, layout_name):
+        """창 정보(left/top/width/height)에 맞춘 절대 좌표 결과 (없으면 None)"""
+        entry = self.entries.get(self.key(window['width'], window['height'], layout_name))
+        if not entry:
+            return None
+        x, y = window['left'], window['top']
+        left, top, right, bottom = entry['grid']
+        return {
+            'chaos_pos': (entry['chaos'][0] + x, entry['chaos'][1] + y),
+            'chaos_size': entry['chaos_size'],
+            'grid_bounds': {'left': left + x, 'top': top + y, 'right': right + x, 'bottom': bottom + y},
+            'score': entry.get('score'),
+        }
+
+    def store(self, window, layout_name, result):
+        x, y = window['left'], window['top']
+        bounds = result['grid_bounds']
+        self.entries[self.key(window['width'], window['height'], layout_name)] = {
+            'chaos': [result['chaos_pos'][0] - x, result['chaos_pos'][1] - y],
+            'chaos_size': result['chaos_size'],
+            'grid': [bounds['left'] - x, bounds['top'] - y, bounds['right'] - x, bounds['bottom'] - y],
+            'score': result.get('score'),
+        }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    import sys
+    from poe_vision import load_image
+    from poe_roller import estimate_layout
+    import poe_layout
+    # 사용법: python poe_calibrate.py <창 스크린샷> [템플릿 파일] [레이아웃]
+    screenshot = load_image(sys.argv[1])
+    template = load_template(sys.argv[2]) if len(sys.argv) > 2 else load_template()
+    layout = poe_layout.load_layouts()[sys.argv[3] if len(sys.argv) > 3 else poe_layout.DEFAULT_LAYOUT]
+    height, width = screenshot.shape[:2]
+    guess = estimate_layout({'left': 0, 'top': 0, 'width': width, 'height': height})
+    rows, cols = (layout.rows, layout.cols) if layout.kind == 'grid' else (None, None)
+    found = calibrate(screenshot, template, guess, rows, cols)
+    print(f"카오스 오브: {found['chaos_pos']} 크기 {found['chaos_size']} (점수 {found['score']})")
+    print(f"그리드: {found['grid_bounds']} ({'격자선 검출' if found['grid_found'] else '창 비율 추정'})")
@@ -0,0 +1,270 @@
+import sys
+import time
+import ctypes
+from collections import deque
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    # numpy가 없으면 화면 캡처 기능 없이 동작
+
+# --- 화면 캡처 설정 ---
+CAPTURE_PROVIDERS = ('auto', 'gdi', 'pil')
+CAPTURE_RING_SIZE = 4  # 영역마다 미리 만들어 돌려 쓰는 버퍼 수
+CAPTURE_RING_BYTES = 4 * 1024 * 1024  # 영역 하나의 링 버퍼 총 크기 상한 (큰 영역은 버퍼 수를 줄여 캐시에 남게)
+LATENCY_SAMPLES = 256  # 캡처 지연 통계에 남기는 최근 측정 수
+# -------------
+# 캡처 버퍼는 모두 (높이, 너비, 4) uint8 BGRA (Windows DIB와 같은 배치)
+
+
+class CaptureProvider:
+    """화면 영역을 미리 만든 버퍼에 채우는 인터페이스"""
+    name = 'base'
+
+    def allocate(self, width, height):
+        """영역 크기의 버퍼 생성 (provider가 재사용할 수 있는 형태)"""
+        return np.empty((height, width, 4), dtype=np.uint8)
+
+    def grab_into(self, left, top, buffer):
+        """(left, top)부터 버퍼 크기만큼 화면을 버퍼에 채움"""
+        raise NotImplementedError
+
+    def release(self, buffer):
+        pass
+
+    def close(self):
+        pass
+
+
+class ArrayCaptureProvider(CaptureProvider):
+    """미리 준비한 화면 이미지(배열/스크린샷 파일)에서 잘라 오는 구현 (오프라인 확인/벤치마크용)"""
+    name = 'array'
+
+    def __init__(self, screen):
+        screen = np.asarray(screen, dtype=np.uint8)
+        if screen.ndim == 2:
+            screen = np.repeat(screen[..., None], 3, axis=2)
+        bgra = np.empty(screen.shape[:2] + (4,), dtype=np.uint8)
+        bgra[..., :3] = screen[..., 2::-1]
+        bgra[..., 3] = 255
+        self.screen = bgra
+
+    @classmethod
+    def from_file(cls, path):
+        """저장된 스크린샷으로 생성"""
+        from PIL import Image
+        with Image.open(path) as image:
+            return cls(np.asarray(image.convert('RGB')))
+
+    def grab_into(self, left, top, buffer):
+        height, width = buffer.shape[:2]
+        np.copyto(buffer, self.screen[top:top + height, left:left + width])
+
+
+class PilCaptureProvider(CaptureProvider):
+    """PIL ImageGrab으로 캡처 후 버퍼에 복사 (GDI를 쓸 수 없을 때의 폴백, 캡처마다 할당 발생)"""
+    name = 'pil'
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self._grab = ImageGrab.grab
+
+    def grab_into(self, left, top, buffer):
+        height, width = buffer.shape[:2]
+        image = self._grab(bbox=(left, top, left + width, top + height), all_screens=True)
+        rgb = np.asarray(image.convert('RGB'))
+        buffer[..., :3] = rgb[..., ::-1]
+        buffer[..., 3] = 255
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', ctypes.c_uint32),
+        ('biWidth', ctypes.c_int32),
+        ('biHeight', ctypes.c_int32),
+        ('biPlanes', ctypes.c_uint16),
+        ('biBitCount', ctypes.c_uint16),
+        ('biCompression', ctypes.c_uint32),
+        ('biSizeImage', ctypes.c_uint32),
+        ('biXPelsPerMeter', ctypes.c_int32),
+        ('biYPelsPerMeter', ctypes.c_int32),
+        ('biClrUsed', ctypes.c_uint32),
+        ('biClrImportant', ctypes.c_uint32),
+    ]
+
+
+class GdiCaptureProvider(CaptureProvider):
+    """GDI BitBlt로 DIB 섹션에 직접 캡처 (버퍼가 DIB 메모리 자체라 복사/할당 없음)"""
+    name = 'gdi'
+    SRCCOPY = 0x00CC0020
+    CAPTUREBLT = 0x40000000
+
+    def __init__(self):
+        if sys.platform != 'win32':
+            raise OSError("GDI 캡처는 Windows에서만 사용할 수 있습니다")
+        self._user32 = ctypes.windll.user32
+        self._gdi32 = ctypes.windll.gdi32
+        self._gdi32.CreateDIBSection.restype = ctypes.c_void_p
+        self._gdi32.CreateDIBSection.argtypes = (ctypes.c_void_p, ctypes.POINTER(BITMAPINFOHEADER), ctypes.c_uint,
+                                                 ctypes.POINTER(ctypes.c_void_p), ctypes.c_void_p, ctypes.c_uint32)
+        self._gdi32.CreateCompatibleDC.restype = ctypes.c_void_p
+        self._gdi32.CreateCompatibleDC.argtypes = (ctypes.c_void_p,)
+        self._gdi32.SelectObject.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+        self._gdi32.DeleteObject.argtypes = (ctypes.c_void_p,)
+        self._gdi32.DeleteDC.argtypes = (ctypes.c_void_p,)
+        self._gdi32.BitBlt.argtypes = (ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                       ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_uint32)
+        self._user32.GetDC.restype = ctypes.c_void_p
+        self._user32.ReleaseDC.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+        self._screen_dc = self._user32.GetDC(None)
+        self._sections = {}  # id(buffer) -> (메모리 DC, 비트맵)
+
+    def allocate(self, width, height):
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # 위에서 아래로 저장
+        header.biPlanes = 1
+        header.biBitCount = 32
+        bits = ctypes.c_void_p()
+        memory_dc = self._gdi32.CreateCompatibleDC(self._screen_dc)
+        bitmap = self._gdi32.CreateDIBSection(memory_dc, ctypes.byref(header), 0, ctypes.byref(bits), None, 0)
+        if not bitmap:
+            self._gdi32.DeleteDC(memory_dc)
+            raise OSError("DIB 섹션을 만들 수 없습니다")
+        self._gdi32.SelectObject(memory_dc, bitmap)
+        raw = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        buffer = np.ctypeslib.as_array(raw).reshape(height, width, 4)
+        self._sections[id(buffer)] = (memory_dc, bitmap)
+        return buffer
+
+    def grab_into(self, left, top, buffer):
+        height, width = buffer.shape[:2]
+        memory_dc, _ = self._sections[id(buffer)]
+        self._gdi32.BitBlt(memory_dc, 0, 0, width, height, self._screen_dc, left, top,
+                           self.SRCCOPY | self.CAPTUREBLT)
+
+    def release(self, buffer):
+        section = self._sections.pop(id(buffer), None)
+        if section:
+            memory_dc, bitmap = section
+            self._gdi32.DeleteDC(memory_dc)
+            self._gdi32.DeleteObject(bitmap)
+
+    def close(self):
+        for key in list(self._sections):
+            memory_dc, bitmap = self._sections.pop(key)
+            self._gdi32.DeleteDC(memory_dc)
+            self._gdi32.DeleteObject(bitmap)
+        if self._screen_dc:
+            self._user32.ReleaseDC(None, self._screen_dc)
+            self._screen_dc = None
+
+
+def create_capture_provider(name='auto'):
+    """이름으로 캡처 provider 생성 ('auto'는 Windows면 GDI, 아니면 PIL)"""
+    if not NUMPY_AVAILABLE:
+        raise ImportError("화면 캡처에는 numpy가 필요합니다")
+    if name == 'auto':
+        name = 'gdi' if sys.platform == 'win32' else 'pil'
+    if name == 'gdi':
+        return GdiCaptureProvider()
+    if name == 'pil':
+        return PilCaptureProvider()
+    raise ValueError(f"알 수 없는 캡처 방식: {name}")
+
+
+class Frame:
+    """캡처 결과 (image는 링 버퍼의 버퍼를 그대로 가리키므로 링이 한 바퀴 돌면 덮어써짐)"""
+
+    def __init__(self, image, timestamp, latency, sequence):
+        self.image = image
+        self.timestamp = timestamp
+        self.latency = latency
+        self.sequence = sequence
+
+    def copy(self):
+        return Frame(self.image.copy(), self.timestamp, self.latency, self.sequence)
+
+
+class RegionCapture:
+    """한 영역(ROI)을 미리 만든 버퍼 ring_size개에 돌아가며 캡처
+
+    버퍼 총 크기가 CAPTURE_RING_BYTES를 넘으면 버퍼 수를 줄인다 (그리드처럼 큰 영역을 여러 버퍼로
+    돌리면 매번 캐시에 없는 메모리에 쓰게 되어 새로 할당하는 것보다 느려짐).
+    """
+
+    def __init__(self, provider, bounds, ring_size=CAPTURE_RING_SIZE):
+        self.provider = provider
+        self.left = bounds['left']
+        self.top = bounds['top']
+        self.width = max(1, bounds['right'] - bounds['left'])
+        self.height = max(1, bounds['bottom'] - bounds['top'])
+        ring_size = max(1, min(ring_size, CAPTURE_RING_BYTES // (self.width * self.height * 4)))
+        self.buffers = [provider.allocate(self.width, self.height) for _ in range(ring_size)]
+        self.sequence = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def grab(self):
+        """다음 버퍼에 캡처하여 Frame 반환"""
+        buffer = self.buffers[self.sequence % len(self.buffers)]
+        started = time.perf_counter()
+        self.provider.grab_into(self.left, self.top, buffer)
+        finished = time.perf_counter()
+        self.latencies.append(finished - started)
+        self.sequence += 1
+        return Frame(buffer, finished, finished - started, self.sequence)
+
+    def close(self):
+        for buffer in self.buffers:
+            self.provider.release(buffer)
+        self.buffers = []
+
+
+class CaptureEngine:
+    """이름 붙인 여러 영역(그리드, 커런시 칸 등)의 캡처를 관리"""
+
+    def __init__(self, provider, ring_size=CAPTURE_RING_SIZE):
+        self.provider = provider
+        self.ring_size = ring_size
+        self.regions = {}
+
+    def set_region(self, name, bounds):
+        """영역 등록 (크기가 같으면 위치만 바꾸고 기존 버퍼 재사용)"""
+        region = self.regions.get(name)
+        if region and (region.width, region.height) == \
+                (bounds['right'] - bounds['left'], bounds['bottom'] - bounds['top']):
+            region.left = bounds['left']
+            region.top = bounds['top']
+            return region
+        if region:
+            region.close()
+        region = RegionCapture(self.provider, bounds, self.ring_size)
+        self.regions[name] = region
+        return region
+
+    def grab(self, name):
+        return self.regions[name].grab()
+
+    def stats(self):
+        """영역별 캡처 지연 {이름: {'count', 'mean', 'p50', 'p99'}} (초)"""
+        result = {}
+        for name, region in self.regions.items():
+            values = sorted(region.latencies)
+            if not values:
+                continue
+            result[name] = {
+                'count': region.sequence,
+                'mean': sum(values) / len(values),
+                'p50': values[len(values) // 2],
+                'p99': values[min(len(values) - 1, int(len(values) * 0.99))],
+            }
+        return result
+
+    def close(self):
+        for region in self.regions.values():
+            region.close()
+        self.regions = {}
+        self.provider.close()
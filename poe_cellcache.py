@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+from poe_engine import CELL_EMPTY
+
+# --- 칸 판정 캐시 설정 ---
+CELL_CACHE_SIZE = 1024  # 기억할 칸 수 (쿼드 보관함 576칸 + 여유, 넘으면 가장 오래 안 쓴 칸부터 버림)
+CELL_HASH_TOLERANCE = 4  # 지각 해시가 이 비트 수 이하로 다르면 같은 화면으로 봄
+# -------------
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class CellCache:
+    """칸 화면의 지각 해시로 빈 칸 판정을 기억하는 LRU 캐시
+
+    작업 시작 전에 그리드를 한 번 캡처해 snapshot()으로 칸별 해시를 넣어 두면,
+    get()은 그 칸의 화면이 마지막 판정 때와 같을 때만 판정을 돌려준다.
+    맵 아이콘은 롤링하거나 같은 종류의 새 지도로 바꿔도 그대로라 화면으로는 아이템을
+    구분할 수 없으므로, 아이템이 있는 칸(일치/클릭 확인 결과)은 기억하지 않고 매번 다시 읽는다.
+    """
+
+    def __init__(self, maxsize=CELL_CACHE_SIZE, tolerance=CELL_HASH_TOLERANCE):
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self.entries = OrderedDict()  # pos -> (해시, 상태)
+        self.hashes = {}  # 이번 작업 시작 시 칸별 해시
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def snapshot(self, hashes):
+        """이번 작업의 칸별 해시 {pos: int} 설정 (없는 칸은 캐시를 쓰지 않음)"""
+        self.hashes = dict(hashes)
+
+    def get(self, pos):
+        """화면이 바뀌지 않은 칸의 마지막 판정 (없으면 None)"""
+        current = self.hashes.get(pos)
+        entry = self.entries.get(pos)
+        if current is None or entry is None:
+            self.misses += 1
+            return None
+        cached, state = entry
+        if hamming(current, cached) > self.tolerance:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(pos)
+        self.hits += 1
+        return state
+
+    def put(self, pos, state):
+        """작업 시작 시 화면 기준으로 칸 판정 저장 (빈 칸이 아니면 기억하던 판정 삭제)"""
+        current = self.hashes.get(pos)
+        if current is None or state != CELL_EMPTY:
+            self.entries.pop(pos, None)
+            return
+        self.entries[pos] = (current, state)
+        self.entries.move_to_end(pos)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hashes = {}
@@ -0,0 +1,61 @@
+import os
+import json
+import hashlib
+from array import array
+
+# --- 이어하기 설정 ---
+CHECKPOINT_FILE = 'poe_roller_checkpoint.json'
+# -------------
+
+
+def geometry_hash(layout_name, coords, origin):
+    """레이아웃과 origin 기준 칸 좌표의 해시 (창 이동만으로는 바뀌지 않음)"""
+    h = hashlib.sha1(layout_name.encode('utf-8'))
+    offsets = array('i')
+    for x, y in coords:
+        offsets.append(x - origin[0])
+        offsets.append(y - origin[1])
+    h.update(offsets.tobytes())
+    return h.hexdigest()
+
+
+class Checkpoint:
+    """중단된 작업에서 이미 끝난 칸 목록 (row, col)과 그리드 형상 해시
+
+    steps는 여러 커런시 작업에서 마지막이 아닌 단계를 끝낸 칸 {커런시: set((row, col))}
+    """
+
+    def __init__(self, geometry, done=(), steps=None):
+        self.geometry = geometry
+        self.done = set(tuple(cell) for cell in done)
+        self.steps = {name: set(tuple(cell) for cell in cells) for name, cells in (steps or {}).items()}
+
+    def __len__(self):
+        return len(self.done)
+
+    def save(self, path=CHECKPOINT_FILE):
+        try:
+            with open(path, 'w') as f:
+                json.dump({'geometry': self.geometry, 'done': sorted(self.done),
+                           'steps': {name: sorted(cells) for name, cells in self.steps.items()}}, f)
+        except OSError:
+            pass
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """저장된 체크포인트 (없거나 읽을 수 없으면 None)"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return Checkpoint(data['geometry'], data['done'], data.get('steps'))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def clear_checkpoint(path=CHECKPOINT_FILE):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
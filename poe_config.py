@@ -0,0 +1,125 @@
+import os
+import json
+
+import poe_path
+import poe_layout
+import poe_craft
+from poe_engine import MATCH_MAX_PASSES, MATCH_TIME_LIMIT
+
+# --- 설정 파일 ---
+CONFIG_FILE = 'poe_roller_config.json'
+REGEX_FILE = 'poe_regex_patterns.json'
+DEFAULT_INPUT_BACKEND = 'auto'  # 'auto', 'sendinput', 'pyautogui'
+# 상대 좌표로 변경 (화면 크기 대비 비율)
+DEFAULT_CHAOS_ORB_POS_RATIO = (0.675, 0.665)  # 화면 대비 비율
+DEFAULT_CHAOS_CELL_SIZE_RATIO = 0.0276  # 화면 너비 대비 비율
+DEFAULT_GRID_LEFT_RATIO = 0.0078  # 화면 너비 대비
+DEFAULT_GRID_RIGHT_RATIO = 0.3396  # 화면 너비 대비
+DEFAULT_GRID_TOP_RATIO = 0.1157  # 화면 높이 대비
+DEFAULT_GRID_BOTTOM_RATIO = 0.7046  # 화면 높이 대비
+# -------------
+
+
+def default_grid_bounds(screen_width, screen_height):
+    """기본 그리드 경계 계산"""
+    return {
+        'left': int(DEFAULT_GRID_LEFT_RATIO * screen_width),
+        'right': int(DEFAULT_GRID_RIGHT_RATIO * screen_width),
+        'top': int(DEFAULT_GRID_TOP_RATIO * screen_height),
+        'bottom': int(DEFAULT_GRID_BOTTOM_RATIO * screen_height)
+    }
+
+
+def default_positions(screen_width, screen_height):
+    """기본 카오스 오브 칸/그리드 위치"""
+    return {
+        'chaos_pos': (int(DEFAULT_CHAOS_ORB_POS_RATIO[0] * screen_width),
+                      int(DEFAULT_CHAOS_ORB_POS_RATIO[1] * screen_height)),
+        'chaos_size': int(DEFAULT_CHAOS_CELL_SIZE_RATIO * screen_width),
+        'grid_bounds': default_grid_bounds(screen_width, screen_height),
+    }
+
+
+def read_config(screen_width, screen_height, path=CONFIG_FILE):
+    """설정 파일을 읽어 현재 해상도 기준 절대 좌표의 설정 딕셔너리 반환 (Tk 없이 사용 가능)
+
+    파일이 없거나 읽을 수 없으면 기본값. 좌표 키: chaos_pos, chaos_size, grid_bounds, currency_slots
+    """
+    settings = {
+        'input_backend': DEFAULT_INPUT_BACKEND,
+        'active_regex': [],
+        'path_method': poe_path.DEFAULT_PATH_METHOD,
+        'stash_layout': poe_layout.DEFAULT_LAYOUT,
+        'match_max_passes': MATCH_MAX_PASSES,
+        'match_time_limit': MATCH_TIME_LIMIT,
+        'verify_clicks': False,
+        'craft_pipeline': poe_craft.DEFAULT_PIPELINE,
+        'currency_slots': {},
+        'adaptive_delays': None,
+        'trace_enabled': True,
+        'history_enabled': True,
+    }
+    settings.update(default_positions(screen_width, screen_height))
+    try:
+        if not os.path.exists(path):
+            return settings
+        with open(path, 'r') as f:
+            config = json.load(f)
+
+        for key in ('input_backend', 'active_regex', 'path_method', 'stash_layout', 'match_max_passes',
+                    'match_time_limit', 'verify_clicks', 'craft_pipeline', 'adaptive_delays', 'trace_enabled',
+                    'history_enabled'):
+            if key in config:
+                settings[key] = config[key]
+        if settings['craft_pipeline'] not in poe_craft.CRAFT_PIPELINES:
+            settings['craft_pipeline'] = poe_craft.DEFAULT_PIPELINE
+        settings['currency_slots'] = {
+            name: (int(ratio[0] * screen_width), int(ratio[1] * screen_height))
+            for name, ratio in config.get('currency_slot_ratios', {}).items() if name in poe_craft.CURRENCIES
+        }
+
+        # 새로운 비율 기반 설정이 있는지 확인
+        if config.get('chaos_pos_ratio'):
+            ratio = config['chaos_pos_ratio']
+            settings['chaos_pos'] = (int(ratio[0] * screen_width), int(ratio[1] * screen_height))
+            if config.get('chaos_size_ratio'):
+                settings['chaos_size'] = int(config['chaos_size_ratio'] * screen_width)
+            if config.get('grid_bounds_ratio'):
+                ratio_bounds = config['grid_bounds_ratio']
+                settings['grid_bounds'] = {
+                    'left': int(ratio_bounds['left_ratio'] * screen_width),
+                    'right': int(ratio_bounds['right_ratio'] * screen_width),
+                    'top': int(ratio_bounds['top_ratio'] * screen_height),
+                    'bottom': int(ratio_bounds['bottom_ratio'] * screen_height)
+                }
+        elif config.get('chaos_pos') and config.get('screen_resolution', [1920, 1080]):
+            # 기존 절대 좌표 설정이 있다면 로드하되, 현재 해상도에 맞게 스케일링
+            old_resolution = config.get('screen_resolution', [1920, 1080])
+            scale_x = screen_width / old_resolution[0]
+            scale_y = screen_height / old_resolution[1]
+            settings['chaos_pos'] = (int(config['chaos_pos'][0] * scale_x), int(config['chaos_pos'][1] * scale_y))
+            if config.get('chaos_size'):
+                settings['chaos_size'] = int(config['chaos_size'] * scale_x)
+            if config.get('grid_bounds'):
+                old_grid_bounds = config['grid_bounds']
+                settings['grid_bounds'] = {
+                    'left': int(old_grid_bounds['left'] * scale_x),
+                    'right': int(old_grid_bounds['right'] * scale_x),
+                    'top': int(old_grid_bounds['top'] * scale_y),
+                    'bottom': int(old_grid_bounds['bottom'] * scale_y)
+                }
+    except:
+        # 오류 발생 시 좌표는 기본값 사용
+        settings.update(default_positions(screen_width, screen_height))
+    return settings
+
+
+def read_regex_patterns(path=REGEX_FILE):
+    """저장된 정규식 패턴 {제목: 패턴} (없거나 읽을 수 없으면 빈 딕셔너리)"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except:
+        pass
+    return {}
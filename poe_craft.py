@@ -0,0 +1,130 @@
+import re
+
+# --- 커런시 단계 설정 ---
+CRAFT_PIPELINES = {
+    'chaos': ('chaos',),
+    'alch_chaos': ('alch', 'chaos'),
+    'scour_alch': ('scour', 'alch'),
+    'scour_alch_chaos': ('scour', 'alch', 'chaos'),
+}
+DEFAULT_PIPELINE = 'chaos'
+SLOT_COLORS = {'chaos': 'yellow', 'alch': 'orange', 'scour': 'white'}  # 위치 설정 오버레이 색
+DEFAULT_SLOT_OFFSETS = {'alch': (-1, 0), 'scour': (-2, 0)}  # 카오스 오브 칸 기준 처음 위치 (칸 단위, 위치 설정에서 조정)
+# -------------
+
+RARITY_PATTERN = re.compile(r'^(?:Rarity|아이템 희귀도)\s*:\s*(\S+)', re.MULTILINE)
+RARITY_NAMES = {
+    'normal': 'normal', '일반': 'normal',
+    'magic': 'magic', '마법': 'magic',
+    'rare': 'rare', '희귀': 'rare',
+    'unique': 'unique', '고유': 'unique',
+}
+
+
+class Currency:
+    """커런시 한 종류 (적용할 수 있는 희귀도와 적용 후 희귀도)"""
+
+    def __init__(self, name, label, short, accepts, result):
+        self.name = name
+        self.label = label
+        self.short = short
+        self.accepts = accepts
+        self.result = result
+
+
+CURRENCIES = {
+    'scour': Currency('scour', "정제의 오브", "정제", ('magic', 'rare'), 'normal'),
+    'alch': Currency('alch', "연금술의 오브", "연금", ('normal',), 'rare'),
+    'chaos': Currency('chaos', "카오스 오브", "카오스", ('rare',), 'rare'),
+}
+
+
+def pipeline_label(name):
+    """'정제 → 연금 → 카오스' 형식의 표시 이름"""
+    return " → ".join(CURRENCIES[currency].short for currency in CRAFT_PIPELINES[name])
+
+
+def slot_position(name, chaos_pos, chaos_size, slots):
+    """커런시 칸 중심 좌표 (설정하지 않은 칸은 카오스 오브 칸 기준 기본 위치)"""
+    if name == 'chaos':
+        return chaos_pos
+    if name in slots:
+        return slots[name]
+    dx, dy = DEFAULT_SLOT_OFFSETS.get(name, (0, 0))
+    return (chaos_pos[0] + dx * chaos_size, chaos_pos[1] + dy * chaos_size)
+
+
+def item_rarity(text):
+    """아이템 텍스트의 희귀도 ('normal', 'magic', 'rare', 'unique', 알 수 없으면 None)"""
+    if not text:
+        return None
+    match = RARITY_PATTERN.search(text)
+    if not match:
+        return None
+    return RARITY_NAMES.get(match.group(1).lower())
+
+
+def plan_cell(pipeline, rarity=None):
+    """한 칸에 적용할 커런시 순서 (희귀도를 모르면 모든 단계, 알면 적용할 수 없는 단계는 뺌)"""
+    if rarity is None:
+        return list(pipeline)
+    steps = []
+    for name in pipeline:
+        currency = CURRENCIES[name]
+        if rarity in currency.accepts:
+            steps.append(name)
+            rarity = currency.result
+    return steps
+
+
+def plan_steps(keys, pipeline, rarities=None):
+    """칸마다 단계 계획 {key: [커런시, ...]} (rarities: {key: 희귀도}, 없는 칸은 모든 단계)"""
+    rarities = rarities or {}
+    return {key: plan_cell(pipeline, rarities.get(key)) for key in keys}
+
+
+def group_steps(plan, pipeline):
+    """단계 계획을 커런시별로 묶음 [(커런시, [key, ...]), ...] (파이프라인 순서, 빈 단계 제외)
+
+    칸마다 단계는 파이프라인의 부분 순서이므로 커런시 순서대로 한 번씩 돌면
+    모든 칸의 단계 순서가 지켜진다.
+    """
+    groups = []
+    for name in pipeline:
+        keys = [key for key, steps in plan.items() if name in steps]
+        if keys:
+            groups.append((name, keys))
+    return groups
+
+
+def run_pipeline(engine, groups, slots, speed='fast', matcher=None, done=None, cache=None, reader=None,
+                 analyzer=None, step_done=None, results=None, **kwargs):
+    """커런시마다 한 번만 Shift로 집어 해당 칸 전부에 적용 [(커런시, RollResult), ...] 반환
+
+    groups: [(커런시, 방문 순서대로 정렬된 좌표 목록)], slots: {커런시: 보관함 칸 좌표}
+    matcher/done/cache(정규식 조건, 이어하기, 칸 판정 캐시)는 마지막 단계에만 적용하고,
+    done에 든 칸은 모든 단계에서 건너뛴다. step_done({커런시: set(좌표)})을 주면 마지막이 아닌
+    단계도 끝낸 칸을 기록하고 건너뛰므로 이어할 때 이미 정제/연금한 칸에 다시 쓰지 않는다.
+    정규식과 자동 속도 조절의 클릭 반영 확인(reader)은 같은 커런시를 다시 쓸 수 있는 마지막 단계
+    (카오스 오브처럼 적용 후 희귀도에 다시 적용 가능)에서만 쓴다. 다른 단계는 희귀도가 맞지 않는
+    칸에서 게임이 커런시를 거부해 텍스트가 그대로이므로 누락으로 오인하기 때문이다.
+    클릭 확인(analyzer)에는 단계마다 커런시를 알려 거부된 칸을 끝난 것으로 보게 한다.
+    results(list)를 주면 단계가 끝날 때마다 그 안에 추가한다 (중간에 예외가 나도 끝난 단계가 남음).
+    나머지 인자는 engine.roll에 그대로 전달.
+    """
+    results = [] if results is None else results
+    for i, (name, coords) in enumerate(groups):
+        if engine.cancel.is_set():
+            break
+        last = i == len(groups) - 1
+        currency = CURRENCIES[name]
+        final = last and currency.result in currency.accepts
+        step = done if last else (step_done.setdefault(name, set()) if step_done is not None else None)
+        if done:
+            coords = [pos for pos in coords if pos not in done]
+        if analyzer is not None:
+            analyzer.currency = currency
+        result = engine.roll(coords, slots[name], speed, matcher if final else None, reader if final else None,
+                             done=step, cache=cache if last else None, analyzer=analyzer, **kwargs)
+        results.append((name, result))
+    return results
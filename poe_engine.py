@@ -0,0 +1,561 @@
+import time
+import threading
+
+from poe_trace import NullTracer
+from poe_timing import DeadlineTimer, TimerResolution, SYSTEM_CLOCK
+from poe_input import InputState
+import poe_path
+from poe_pipeline import AnalysisPipeline, ANALYSIS_ERROR
+
+# --- 롤링 설정 ---
+# 속도 프리셋: (move_duration, click_delay)
+SPEED_PRESETS = {
+    'slow': (0.15, 0.15),
+    'normal': (0.08, 0.08),
+    'fast': (0.03, 0.03),
+    'max': (0.0, 0.0),
+}
+CLICK_PRESS_DELAY = 0.02  # 마우스를 누르고 떼는 사이의 미세한 딜레이
+SHIFT_SETTLE_DELAY = 0.05  # Shift를 누른 뒤 커런시 선택 전 대기
+SELECT_SETTLE_DELAY = 0.1  # 커런시 선택 후 대기
+MATCH_MAX_PASSES = 10  # 정규식 모드에서 일치하지 않은 칸을 다시 롤링하는 최대 횟수
+MATCH_SETTLE_DELAY = 0.05  # 롤링 후 아이템 텍스트를 읽기 전 대기
+MATCH_TIME_LIMIT = 0  # 정규식 모드 전체 시간 제한 (초, 0이면 제한 없음)
+REPLAN_METHOD = 'nn2opt'  # 두 번째 패스부터 남은 칸의 방문 순서 (듬성듬성한 칸에 유리)
+# 칸 상태 (PassScheduler.state)
+CELL_PENDING = 0  # 아직 조건을 만족하지 않음
+CELL_SATISFIED = 1  # 조건 만족 (정규식 모드가 아니면 롤링 완료)
+CELL_FAILED = 2  # 롤링 후 텍스트를 읽지 못함 (다음 패스에서 다시 시도)
+CELL_EMPTY = 3  # 아이템이 없음
+# 자동 속도 조절: (move_duration, press_delay, click_delay)
+ADAPTIVE_START = (0.03, 0.02, 0.03)
+ADAPTIVE_FLOOR = (0.0, 0.005, 0.0)
+ADAPTIVE_CEILING = (0.15, 0.05, 0.2)
+ADAPTIVE_DECREASE = 0.85  # 연속 성공 시 딜레이 감소 비율
+ADAPTIVE_BACKOFF = 2.0  # 클릭 누락/지연 시 딜레이 증가 배수
+ADAPTIVE_BACKOFF_STEP = 0.005  # 딜레이가 0에 가까울 때 최소 증가량
+ADAPTIVE_SUCCESS_STREAK = 8  # 이 횟수 이상 연속 성공하면 성공할 때마다 딜레이 감소
+ADAPTIVE_PROBE_INTERVAL = 4  # 안정 상태에서는 몇 칸마다 한 번씩만 확인
+ADAPTIVE_LAG_FACTOR = 3.0  # 응답 시간이 최소치의 몇 배를 넘으면 지연으로 판단
+ADAPTIVE_LAG_MARGIN = 0.03  # 응답 시간이 최소치보다 이만큼은 늦어야 지연으로 판단
+ADAPTIVE_FAILED_MARGIN = 1.15  # 누락이 났던 딜레이보다 이 배수 이상 유지
+ADAPTIVE_MAX_RETRY = 2  # 누락된 클릭을 같은 칸에 다시 시도하는 횟수
+# -------------
+
+
+class AdaptivePacer:
+    """클릭이 실제로 반영됐는지를 보고 딜레이를 자동 조절
+
+    연속으로 성공하면 딜레이를 조금씩 줄이고, 누락되거나 게임 응답이 느려지면
+    크게 늘린다 (AIMD 방식과 반대 방향: 느리게 빨라지고 빠르게 물러남).
+    """
+
+    def __init__(self, start=ADAPTIVE_START, floor=ADAPTIVE_FLOOR, ceiling=ADAPTIVE_CEILING):
+        self.values = list(start)
+        self.floor = floor
+        self.ceiling = ceiling
+        self.streak = 0
+        self.counter = 0
+        self.best_response = None
+        self.successes = 0
+        self.failures = 0
+        self.failed_at = None  # 마지막으로 클릭이 누락된 딜레이 (이 아래로는 다시 줄이지 않음)
+
+    def delays(self):
+        """현재 (move_duration, press_delay, click_delay)"""
+        return tuple(self.values)
+
+    @property
+    def stable(self):
+        return self.streak >= ADAPTIVE_SUCCESS_STREAK
+
+    def should_probe(self):
+        """이번 칸의 클릭 반영 여부를 확인할지 (안정 상태에서는 일부만 확인)"""
+        self.counter += 1
+        return not self.stable or self.counter % ADAPTIVE_PROBE_INTERVAL == 0
+
+    def record(self, registered, response_time=None):
+        """확인 결과 반영 (registered가 None이면 판단 불가로 무시)"""
+        if registered is None:
+            return
+        lagging = False
+        if response_time is not None:
+            if self.best_response is None or response_time < self.best_response:
+                self.best_response = response_time
+            lagging = response_time > max(self.best_response * ADAPTIVE_LAG_FACTOR,
+                                          self.best_response + ADAPTIVE_LAG_MARGIN)
+        if registered and not lagging:
+            self.successes += 1
+            self.streak += 1
+            if self.streak >= ADAPTIVE_SUCCESS_STREAK:
+                self._scale(ADAPTIVE_DECREASE)
+        else:
+            if not registered:
+                self.failures += 1
+                self.failed_at = tuple(self.values)
+            self.streak = 0
+            self._scale(ADAPTIVE_BACKOFF)
+
+    def _scale(self, factor):
+        for i, value in enumerate(self.values):
+            if factor > 1:
+                value = max(value * factor, value + ADAPTIVE_BACKOFF_STEP)
+            else:
+                value *= factor
+                if self.failed_at is not None:
+                    value = max(value, self.failed_at[i] * ADAPTIVE_FAILED_MARGIN)
+            self.values[i] = min(self.ceiling[i], max(self.floor[i], value))
+
+
+class StatusChannel:
+    """작업 스레드가 진행 상태를 기록하고 UI가 일정 주기로 읽어 가는 공유 상태
+
+    작업 스레드는 필드 대입만 하고 (문자열 조합/Tk 호출 없음), 표시 문자열은
+    UI 쪽에서 render()로 만든다. 필드 대입은 GIL 아래에서 원자적이므로 잠금이 필요 없다.
+    """
+
+    def __init__(self, clock=SYSTEM_CLOCK):
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.message = ""
+        self.done = 0
+        self.total = 0
+        self.pass_no = 0  # 정규식 모드의 회차 (0이면 표시 안 함)
+        self.satisfied = 0
+        self.started = None
+        self.finished = None  # 작업이 끝나면 마지막 메시지
+        self.version = 0
+
+    def set_message(self, message):
+        self.message = message
+        self.version += 1
+
+    def start(self, total):
+        self.total = total
+        self.done = 0
+        self.started = self.clock.now()
+        self.version += 1
+
+    def progress(self, done, total=None, pass_no=0, satisfied=0):
+        if total is not None:
+            self.total = total
+        self.done = done
+        self.pass_no = pass_no
+        self.satisfied = satisfied
+        self.version += 1
+
+    def finish(self, message):
+        self.finished = message
+        self.version += 1
+
+    def render(self):
+        """현재 상태를 진행률/속도/남은 시간이 포함된 문자열로 표시"""
+        if not self.total or self.started is None:
+            return self.message
+        text = self.message
+        if self.pass_no:
+            text += f" {self.pass_no}회차"
+        text += f" [{self.done}/{self.total}]"
+        if self.pass_no:
+            text += f" 일치 {self.satisfied}"
+        elapsed = self.clock.now() - self.started
+        if self.done and elapsed > 0:
+            rate = self.done / elapsed
+            text += f" {rate:.1f}칸/초, 남은 시간 {(self.total - self.done) / rate:.0f}초"
+        return text
+
+
+class PassScheduler:
+    """칸별 상태를 bytearray 하나로 관리하며 패스마다 아직 끝나지 않은 칸만 배정
+
+    첫 패스는 주어진 순서를 그대로 쓰고, 다음 패스부터는 남은 칸만으로 경로를 다시
+    계획하여 몇 칸 남지 않은 후반 패스가 그리드 전체를 훑지 않게 한다.
+    패스 수 제한, 시간 제한, 모든 칸 완료 중 먼저 오는 조건에서 멈춘다.
+    """
+
+    def __init__(self, coords, max_passes=1, max_seconds=0, clock=time.perf_counter):
+        self.coords = coords
+        self.state = bytearray(len(coords))
+        self.max_passes = max_passes
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self.started = clock()
+        self.pass_no = 0
+        self.resolved = 0  # 이번 패스에서 끝난 칸 수
+        self.reports = []  # 패스별 {'pass', 'rolled', 'resolved', 'remaining', 'elapsed'}
+        self.stop_reason = None  # 'done', 'passes', 'time'
+
+    def mark(self, index, state):
+        resolved = (CELL_SATISFIED, CELL_EMPTY)
+        self.resolved += (state in resolved) - (self.state[index] in resolved)
+        self.state[index] = state
+
+    def count(self, state):
+        return self.state.count(state)
+
+    def remaining(self):
+        return [i for i, state in enumerate(self.state) if state in (CELL_PENDING, CELL_FAILED)]
+
+    def next_pass(self, position=None):
+        """다음 패스에서 방문할 칸 인덱스 목록 (멈출 조건이면 빈 목록)"""
+        pending = self.remaining()
+        if not pending:
+            self.stop_reason = 'done'
+            return []
+        if self.pass_no >= self.max_passes:
+            self.stop_reason = 'passes'
+            return []
+        if self.max_seconds and self.clock() - self.started >= self.max_seconds:
+            self.stop_reason = 'time'
+            return []
+        if self.pass_no:
+            points = [self.coords[i] for i in pending]
+            order = poe_path.plan_order(points, None, REPLAN_METHOD, position)
+            pending = [pending[i] for i in order]
+        self.pass_no += 1
+        self.resolved = 0
+        return pending
+
+    def finish_pass(self, rolled):
+        """패스 결과 기록"""
+        self.reports.append({
+            'pass': self.pass_no,
+            'rolled': rolled,
+            'resolved': self.resolved,
+            'remaining': len(self.remaining()),
+            'elapsed': self.clock() - self.started,
+        })
+
+
+class RollResult:
+    """롤링 작업 결과"""
+
+    def __init__(self, total):
+        self.total = total
+        self.rolled = 0
+        self.satisfied = 0
+        self.rolled_satisfied = 0  # 한 번 이상 롤링한 뒤 조건을 만족한 칸 수 (처음부터 일치한 칸 제외)
+        self.empty = 0
+        self.passes = 0
+        self.retries = 0  # 클릭 확인에 실패해 다시 롤링한 횟수
+        self.failed = 0  # 끝까지 반영을 확인하지 못한 칸 수
+        self.errors = 0  # 분석(analyze)이 예외로 끝난 횟수 (그 칸은 실패로 처리)
+        self.cached = 0  # 화면이 그대로라 지난 판정을 재사용하고 건너뛴 칸 수
+        self.pass_reports = []  # PassScheduler.reports
+        self.stop_reason = None
+        self.stopped = False
+        self.missed = 0  # 반영되지 않은 것으로 확인된 클릭 수
+        self.cell_times = []  # 칸마다 입력에 걸린 시간 (초)
+        self.elapsed = 0.0
+        self.delays = None  # 자동 속도 조절로 도달한 딜레이
+        self.timing = {}  # 간격 종류별 대기 오차 (DeadlineTimer.report)
+
+    @property
+    def cells_per_sec(self):
+        return self.rolled / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class RollEngine:
+    """커런시를 집고 좌표 목록을 차례로 클릭하는 롤링 루프 (Tk 없이 동작)"""
+
+    def __init__(self, input_backend, channel=None, tracer=None, clock=None):
+        self.input = input_backend
+        # 작업 경로의 모든 시각/대기는 이 시계 하나를 사용 (테스트/벤치마크는 VirtualClock)
+        self.clock = clock or SYSTEM_CLOCK
+        self.channel = channel or StatusChannel(self.clock)
+        # 중지 요청 이벤트: 루프 검사와 모든 대기(입력 백엔드 포함)가 이 이벤트 하나를 사용
+        self.cancel = threading.Event()
+        self.input.bind_cancel(self.cancel)
+        # 모든 대기(입력 백엔드 포함)를 마감 시각 기준 정밀 대기로 처리
+        self.timer = DeadlineTimer(self.cancel, self.clock)
+        self.input.bind_timer(self.timer)
+        self.tracer = tracer or NullTracer()
+        self.visit = None  # 트레이스에 기록할 현재 칸 방문 번호
+        # 누른 키/버튼 기억: 필요한 누름/뗌만 보내고 작업이 어떻게 끝나든 모두 뗌
+        self.state = InputState(self.input)
+        self.need_initial_shift = True
+        self.texts = {}  # 이번 작업에서 마지막으로 읽은 칸별 아이템 텍스트
+        self.last_result = None  # 마지막으로 시작한 roll()의 결과 (예외로 끝나도 그때까지 채워짐)
+
+    def release_inputs(self):
+        """눌린 키/버튼 모두 해제 (비상 정지 중에도 보내며, 어느 스레드에서나 호출 가능)"""
+        return self.state.release_all()
+
+    def select_currency(self, currency_pos, move_duration):
+        """Shift를 누른 채 커런시를 우클릭하여 연속 사용 상태로 만듦"""
+        self.status("카오스 오브 선택 중...")
+        t = self.tracer.now()
+        if not self.state.is_held('shift'):
+            self.state.set_keys(('shift',))
+            if self.wait(SHIFT_SETTLE_DELAY, 'shift'):
+                return
+        self.input.move(currency_pos, move_duration)
+        if self.cancel.is_set():
+            return
+        self.state.right_click()
+        self.wait(SELECT_SETTLE_DELAY, 'select')
+        self.need_initial_shift = False
+        self.tracer.add('select', t)
+
+    def status(self, message):
+        self.channel.set_message(message)
+
+    def stop(self):
+        """중지 요청 (진행 중인 대기가 즉시 깨어남, 어느 스레드에서나 호출 가능)"""
+        self.cancel.set()
+
+    def reset_stop(self):
+        """새 작업 시작 전 중지 요청 초기화"""
+        self.cancel.clear()
+
+    def wait(self, seconds, label='wait'):
+        """중지 요청이 오면 즉시 깨어나는 대기 (중지되면 True)"""
+        return self.timer.wait(seconds, label)
+
+    def read_text(self, reader, pos):
+        """아이템 텍스트를 읽고 응답 시간과 함께 반환"""
+        t = self.tracer.now()
+        started = self.clock.now()
+        text = reader.read()
+        self.texts[pos] = text
+        elapsed = self.clock.now() - started
+        self.tracer.add('read', t, self.visit)
+        return text, elapsed
+
+    def click(self, pos, move_duration, press_delay, click_delay):
+        """한 칸 클릭하고 입력에 걸린 시간 반환"""
+        cell_start = self.clock.now()
+        t = self.tracer.now()
+        self.state.click_cell(pos, press_delay, move_duration)
+        self.tracer.add('click', t, self.visit)
+        if click_delay > 0 and not self.cancel.is_set():
+            t = self.tracer.now()
+            self.wait(click_delay, 'click')
+            self.tracer.add('delay', t, self.visit)
+        return self.clock.now() - cell_start
+
+    def roll_cell(self, pos, result, speed_values, matcher, reader, pacer, probe=False):
+        """한 칸 롤링 (probe면 클릭 반영 여부를 확인하여 pacer에 알리고 누락되면 재시도)"""
+        for attempt in range(ADAPTIVE_MAX_RETRY + 1):
+            move_duration, press_delay, click_delay = pacer.delays() if pacer else speed_values
+            before = self.texts.get(pos)
+
+            result.cell_times.append(self.click(pos, move_duration, press_delay, click_delay))
+            result.rolled += 1
+
+            if not (probe or matcher) or self.cancel.is_set():
+                return None
+            t = self.tracer.now()
+            if self.wait(MATCH_SETTLE_DELAY, 'settle'):
+                return None
+            self.tracer.add('settle', t, self.visit)
+            text, response_time = self.read_text(reader, pos)
+            if probe:
+                registered = None
+                if before is not None and text is not None:
+                    registered = text != before
+                pacer.record(registered, response_time)
+                if registered is False:
+                    result.missed += 1
+                    continue
+            return text
+        return self.texts.get(pos)
+
+    def apply_analysis(self, scheduler, coords, results, done, matcher, result):
+        """분석 결과를 칸 상태에 반영 (matcher가 있으면 일치 여부는 matcher가 정하고 실패/빈 칸만 반영)
+
+        분석 오류는 실패로 처리해 다시 롤링하고, 판단 보류(None)는 끝난 것으로 치지 않고 남겨 둔다.
+        """
+        for index, state in results:
+            if state == ANALYSIS_ERROR:
+                result.errors += 1
+                state = CELL_FAILED
+            elif state is None:
+                if matcher:
+                    continue
+                state = CELL_PENDING
+            if matcher and state == CELL_SATISFIED:
+                continue
+            scheduler.mark(index, state)
+            if done is not None:
+                if state == CELL_SATISFIED:
+                    done.add(coords[index])
+                else:
+                    done.discard(coords[index])
+
+    def roll(self, coords, currency_pos, speed='fast', matcher=None, reader=None,
+             max_passes=MATCH_MAX_PASSES, pacer=None, done=None, max_seconds=MATCH_TIME_LIMIT,
+             analyzer=None, cache=None):
+        """coords 순서대로 롤링 (matcher가 있으면 일치하지 않은 칸만 다음 패스에서 다시 롤링)
+
+        speed가 'adaptive'면 pacer(없으면 새로 생성)가 딜레이를 정한다.
+        done(set)을 주면 그 안의 칸은 건너뛰고, 끝난 칸(matcher가 있으면 일치한 칸)을
+        바로바로 추가한다. 중간에 예외가 나도 그때까지 끝난 칸이 남는다.
+        analyzer(poe_pipeline.Analyzer)를 주면 클릭 직후 캡처만 하고 분석은 작업자에게
+        넘겨 다음 칸 클릭과 겹쳐 처리하며, 결과(실패/빈 칸)는 다음 패스 배정에 반영한다.
+        cache(poe_cellcache.CellCache)를 주면 지난 작업에서 비어 있던 칸은 화면이 그대로면
+        (텍스트 읽기/클릭 없이) 건너뛰며, 끝나면 이번 판정을 저장한다.
+        """
+        if done is not None:
+            coords = [pos for pos in coords if pos not in done]
+        if speed == 'adaptive':
+            pacer = pacer or AdaptivePacer()
+            speed_values = pacer.delays()
+        else:
+            pacer = None
+            move_duration, click_delay = SPEED_PRESETS[speed]
+            speed_values = (move_duration, CLICK_PRESS_DELAY, click_delay)
+        result = self.last_result = RollResult(len(coords))
+        multi_pass = matcher or analyzer
+        if not multi_pass:
+            cache = None  # 한 번씩만 롤링하는 모드는 매번 모든 칸을 롤링해야 함
+        scheduler = PassScheduler(coords, max_passes if multi_pass else 1, max_seconds if multi_pass else 0,
+                                  self.clock.now)
+        pipeline = None
+        if analyzer:
+            pipeline = AnalysisPipeline(analyzer.analyze, analyzer.workers, processes=analyzer.processes,
+                                        cancel=self.cancel)
+        self.texts = {}
+        rolled_cells = set()  # 이번 작업에서 한 번 이상 롤링한 칸 인덱스
+        self.tracer.reset()
+        self.timer.reset()
+        resolution = TimerResolution().start()  # 작업 중에만 타이머 해상도를 올림
+        started = self.clock.now()
+        try:
+            if self.need_initial_shift:
+                self.select_currency(currency_pos, speed_values[0])
+
+            self.status("롤링 중... (중지: ESC 또는 F10)")
+
+            lookahead = set()
+            visits = 0
+            position = currency_pos
+
+            while not self.cancel.is_set():
+                pending = scheduler.next_pass(position)
+                if not pending:
+                    break
+                if analyzer and not matcher and scheduler.pass_no > 1:
+                    # 반영되지 않은 칸만 잠시 쉬었다가 다시 롤링
+                    self.status(f"반영되지 않은 {len(pending)}칸 다시 롤링 중...")
+                    if self.wait(analyzer.retry_backoff * 2 ** (scheduler.pass_no - 2), 'backoff'):
+                        break
+                result.passes += 1
+                pass_rolled = result.rolled
+                self.channel.start(len(pending))
+
+                for i, index in enumerate(pending):
+                    map_pos = coords[index]
+                    self.visit = visits
+                    visits += 1
+                    if self.cancel.is_set():
+                        break
+
+                    t = self.tracer.now()
+                    if matcher:
+                        self.channel.progress(i + 1, len(pending), scheduler.pass_no, scheduler.count(CELL_SATISFIED))
+                    else:
+                        self.channel.progress(i + 1)
+                    self.tracer.add('status', t, self.visit)
+
+                    if cache is not None and scheduler.pass_no == 1:
+                        state = cache.get(map_pos)
+                        if state is not None:
+                            scheduler.mark(index, state)
+                            result.cached += 1
+                            continue
+
+                    if matcher and scheduler.pass_no == 1:
+                        # 처음 보는 칸은 롤링 전에 이미 조건을 만족하는지 (아이템이 있는지) 확인
+                        self.input.move(map_pos, pacer.delays()[0] if pacer else speed_values[0])
+                        position = map_pos
+                        if self.cancel.is_set():
+                            continue
+                        text, _ = self.read_text(reader, map_pos)
+                        if text is None:
+                            scheduler.mark(index, CELL_EMPTY)
+                            continue
+                        if matcher.matches(text):
+                            scheduler.mark(index, CELL_SATISFIED)
+                            if done is not None:
+                                done.add(map_pos)
+                            continue
+
+                    # 자동 속도 조절: 확인할 칸은 한 칸 앞서 롤링 전 텍스트를 읽어 두어
+                    # 확인하는 클릭의 직전 간격이 다른 클릭과 같도록 함
+                    probe = pacer is not None and reader is not None and (matcher or map_pos in lookahead)
+                    if pacer and reader and not matcher and i + 1 < len(pending):
+                        next_pos = coords[pending[i + 1]]
+                        if pacer.should_probe():
+                            self.input.move(next_pos, pacer.delays()[0])
+                            self.read_text(reader, next_pos)
+                            lookahead.add(next_pos)
+
+                    if analyzer:
+                        t = self.tracer.now()
+                        occupied = analyzer.before(map_pos, pacer.delays()[0] if pacer else speed_values[0])
+                        self.tracer.add('before', t, self.visit)
+                        if not occupied:
+                            scheduler.mark(index, CELL_EMPTY)
+                            continue
+                        if self.cancel.is_set():
+                            continue
+
+                    text = self.roll_cell(map_pos, result, speed_values, matcher, reader, pacer, probe)
+                    rolled_cells.add(index)
+                    position = map_pos
+                    if pipeline and not self.cancel.is_set():
+                        t = self.tracer.now()
+                        payload = analyzer.capture(map_pos)
+                        self.tracer.add('capture', t, self.visit)
+                        if not self.cancel.is_set():
+                            pipeline.submit(index, payload)
+                    if matcher:
+                        if matcher.matches(text):
+                            scheduler.mark(index, CELL_SATISFIED)
+                            if done is not None:
+                                done.add(map_pos)
+                        elif text is None and not self.cancel.is_set():
+                            scheduler.mark(index, CELL_FAILED)
+                    elif not pipeline and not self.cancel.is_set():
+                        # 중지 직전 칸은 클릭이 전달됐는지 알 수 없으므로 끝난 것으로 치지 않음
+                        scheduler.mark(index, CELL_SATISFIED)
+                        if done is not None:
+                            done.add(map_pos)
+                    if pipeline:
+                        self.apply_analysis(scheduler, coords, pipeline.results(), done, matcher, result)
+
+                if pipeline:
+                    # 다음 패스 배정 전에 이번 패스의 분석 결과를 모두 반영
+                    t = self.tracer.now()
+                    self.apply_analysis(scheduler, coords, pipeline.flush(), done, matcher, result)
+                    self.tracer.add('flush', t)
+                scheduler.finish_pass(result.rolled - pass_rolled)
+
+            result.stopped = self.cancel.is_set()
+        finally:
+            result.satisfied = scheduler.count(CELL_SATISFIED) if matcher else 0
+            if matcher:
+                result.rolled_satisfied = sum(1 for index in rolled_cells if scheduler.state[index] == CELL_SATISFIED)
+            result.empty = scheduler.count(CELL_EMPTY)
+            result.failed = scheduler.count(CELL_FAILED)
+            if analyzer and not matcher:
+                result.retries = sum(report['rolled'] for report in scheduler.reports[1:])
+            self.release_inputs()
+            self.visit = None
+            if pipeline:
+                pipeline.close()
+            if cache is not None:
+                for index, pos in enumerate(coords):
+                    cache.put(pos, scheduler.state[index])
+            result.elapsed = self.clock.now() - started
+            result.pass_reports = scheduler.reports
+            result.timing = self.timer.report()
+            result.stop_reason = 'stopped' if self.cancel.is_set() else scheduler.stop_reason
+            resolution.stop()
+            self.need_initial_shift = True
+            if pacer:
+                result.delays = pacer.delays()
+        return result
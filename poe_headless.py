@@ -0,0 +1,298 @@
+"""Tk 창 없이 롤링 작업을 실행하는 명령줄/데몬 모드 (결과는 JSON으로 출력)
+
+사용법: python poe_headless.py [--speed fast] [--match] [--regex 제목 ...] [--verify]
+                              [--pipeline scour_alch_chaos] [--layout quad] [--no-skip-empty] [--resume]
+       python poe_headless.py --serve [--port 47800]
+
+데몬은 127.0.0.1에서만 접속을 받고, 한 줄에 JSON 하나씩 요청/응답한다.
+  {"cmd": "run", "speed": "max", "match": true}  작업 실행 (끝나면 결과 응답, 작업은 한 번에 하나)
+  {"cmd": "stop"}      실행 중인 작업 중지
+  {"cmd": "status"}    진행 상태
+  {"cmd": "shutdown"}  데몬 종료
+"""
+import sys
+import json
+import ctypes
+import argparse
+import threading
+import socketserver
+
+import poe_config
+import poe_layout
+import poe_checkpoint
+import poe_job
+from poe_engine import RollEngine, AdaptivePacer, SPEED_PRESETS
+from poe_input import create_input_backend, InputFailSafe
+from poe_matcher import compile_matcher
+
+# --- 헤드리스 설정 ---
+DAEMON_HOST = '127.0.0.1'  # 로컬에서만 접속 가능
+DAEMON_PORT = 47800
+STOP_KEYS = ('esc', 'f10')  # keyboard 라이브러리가 있으면 등록
+# -------------
+
+
+def screen_size(fallback=(1920, 1080)):
+    """주 모니터 해상도 (Windows는 DPI 인식 후 실제 픽셀, 그 외는 fallback)"""
+    if sys.platform == 'win32':
+        try:
+            ctypes.windll.shcore.SetProcessDpiAwareness(1)
+        except:
+            pass
+        user32 = ctypes.windll.user32
+        return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
+    return tuple(fallback)
+
+
+class HeadlessRoller:
+    """설정 파일을 읽어 Tk 없이 작업 실행 (입력 백엔드/캡처/칸 판정 캐시/속도 조절/작업 기록은 작업 간 유지)"""
+
+    def __init__(self, config_path=poe_config.CONFIG_FILE, regex_path=poe_config.REGEX_FILE, input_backend=None):
+        self.config_path = config_path
+        self.regex_path = regex_path
+        self.input_backend = input_backend  # 설정 파일의 입력 백엔드 대신 사용할 이름
+        self.input = None
+        self.engine = None
+        self.capture = None
+        self.cell_cache = None
+        self.pacer = None
+        self.history = None
+        self.lock = threading.Lock()
+
+    def get_engine(self, name):
+        if self.engine is None:
+            try:
+                self.input = create_input_backend(name)
+            except Exception:
+                self.input = create_input_backend('pyautogui')
+            self.engine = RollEngine(self.input)
+        return self.engine
+
+    def capture_for(self, grid_bounds):
+        """그리드 영역이 등록된 캡처 엔진을 돌려주는 함수 (numpy가 없으면 None)"""
+        try:
+            import poe_capture
+        except ImportError:
+            return None
+        if not poe_capture.NUMPY_AVAILABLE:
+            return None
+
+        def get_capture():
+            if self.capture is None:
+                self.capture = poe_capture.CaptureEngine(poe_capture.create_capture_provider())
+            self.capture.set_region('grid', grid_bounds)
+            return self.capture
+        return get_capture
+
+    def run(self, request):
+        """작업 하나 실행 후 결과 딕셔너리 반환 (다른 작업이 실행 중이면 바로 실패 응답)"""
+        if not self.lock.acquire(blocking=False):
+            return {'ok': False, 'error': "다른 작업이 실행 중입니다"}
+        try:
+            return self._run(request)
+        finally:
+            self.lock.release()
+
+    def _run(self, request):
+        try:
+            with open(self.config_path, 'r') as f:
+                saved = json.load(f).get('screen_resolution') or (1920, 1080)
+        except (OSError, ValueError):
+            saved = (1920, 1080)
+        width, height = screen_size(saved)
+        settings = poe_config.read_config(width, height, self.config_path)
+        if request.get('layout'):
+            settings['stash_layout'] = request['layout']
+
+        speed = request.get('speed', 'fast')
+        if speed not in SPEED_PRESETS and speed != 'adaptive':
+            return {'ok': False, 'error': f"알 수 없는 속도: {speed}"}
+        matcher = None
+        if request.get('match') or request.get('regex'):
+            patterns = poe_config.read_regex_patterns(self.regex_path)
+            titles = request.get('regex') or settings['active_regex']
+            missing = [title for title in titles if title not in patterns]
+            if missing or not titles:
+                return {'ok': False, 'error': f"정규식을 찾을 수 없습니다: {', '.join(missing) or '(선택 없음)'}"}
+            matcher = compile_matcher([patterns[title] for title in sorted(titles)])
+
+        if self.pacer is None:
+            self.pacer = AdaptivePacer(start=settings['adaptive_delays']) if settings['adaptive_delays'] \
+                else AdaptivePacer()
+        engine = self.get_engine(self.input_backend or settings['input_backend'])
+        if self.history is None and settings['history_enabled']:
+            import poe_history
+            self.history = poe_history.HistoryWriter()
+        context = poe_job.RollContext.from_settings(settings, poe_layout.load_layouts(),
+                                                    self.capture_for(settings['grid_bounds']), self.cell_cache)
+
+        # 이어하기: 앱과 같은 체크포인트 파일 사용 (그리드 형상이 같을 때만)
+        origin = (settings['grid_bounds']['left'], settings['grid_bounds']['top'])
+        geometry = poe_checkpoint.geometry_hash(context.layout.name, context.coords, origin)
+        done = set()
+        step_done = {}
+        checkpoint = poe_checkpoint.load_checkpoint()
+        if request.get('resume') and checkpoint and checkpoint.geometry == geometry:
+            done = {pos for pos, cell in zip(context.coords, context.cells) if cell in checkpoint.done}
+            step_done = {name: {pos for pos, cell in zip(context.coords, context.cells) if cell in cells}
+                         for name, cells in checkpoint.steps.items()}
+
+        job = poe_job.RollJob(
+            speed, matcher,
+            skip_empty=request.get('skip_empty', True),
+            verify=request.get('verify', settings['verify_clicks']),
+            pipeline=request.get('pipeline', settings['craft_pipeline']),
+            done=done,
+            max_passes=request.get('max_passes', settings['match_max_passes']),
+            max_seconds=request.get('time_limit', settings['match_time_limit']),
+            step_done=step_done
+        )
+        engine.reset_stop()
+        engine.need_initial_shift = True
+        engine.channel.reset()
+        report = None
+        try:
+            report = poe_job.run_job(engine, context, job, self.pacer, self.history)
+            report['ok'] = True
+        except InputFailSafe:
+            report = {'ok': False, 'error': "비상 정지 (마우스가 화면 모서리로 이동됨)"}
+        except Exception as e:
+            report = {'ok': False, 'error': str(e)}
+        finally:
+            engine.release_inputs()
+            self.cell_cache = context.cell_cache
+            completed = bool(report and report.get('completed'))
+            if completed or not (done or any(step_done.values())):
+                poe_checkpoint.clear_checkpoint()
+            else:
+                poe_checkpoint.Checkpoint(
+                    geometry, [cell for pos, cell in zip(context.coords, context.cells) if pos in done],
+                    {name: [cell for pos, cell in zip(context.coords, context.cells) if pos in cells]
+                     for name, cells in step_done.items()}).save()
+        report['done'] = len(done)
+        report['summary'] = poe_job.format_report(report, done, len(context.coords)) if report['ok'] else ""
+        return report
+
+    def stop(self):
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine.release_inputs()
+
+    def status(self):
+        if self.engine is None:
+            return {'running': False}
+        channel = self.engine.channel
+        return {'running': self.lock.locked(), 'message': channel.render(), 'done': channel.done,
+                'total': channel.total, 'pass': channel.pass_no, 'satisfied': channel.satisfied}
+
+    def close(self):
+        self.stop()
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """한 줄에 JSON 요청 하나를 읽어 한 줄 JSON으로 응답"""
+
+    def handle(self):
+        roller = self.server.roller
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self.reply({'ok': False, 'error': "JSON이 아닙니다"})
+                continue
+            command = request.get('cmd', 'run')
+            if command == 'run':
+                self.reply(roller.run(request))
+            elif command == 'stop':
+                roller.stop()
+                self.reply({'ok': True})
+            elif command == 'status':
+                self.reply(dict(roller.status(), ok=True))
+            elif command == 'shutdown':
+                roller.stop()
+                self.reply({'ok': True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            else:
+                self.reply({'ok': False, 'error': f"알 수 없는 명령: {command}"})
+
+    def reply(self, data):
+        self.wfile.write((json.dumps(data, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+class JobServer(socketserver.ThreadingTCPServer):
+    """연결마다 스레드 (실행 중에도 다른 연결에서 stop/status 가능)"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, roller, port=DAEMON_PORT):
+        super().__init__((DAEMON_HOST, port), JobHandler)
+        self.roller = roller
+
+
+def register_stop_keys(roller):
+    """ESC/F10으로 중지 (keyboard 라이브러리가 없으면 비상 정지(화면 모서리)만 사용)"""
+    try:
+        import keyboard
+        for key in STOP_KEYS:
+            keyboard.add_hotkey(key, roller.stop)
+    except Exception:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=poe_config.CONFIG_FILE)
+    parser.add_argument('--regex-file', default=poe_config.REGEX_FILE)
+    parser.add_argument('--input', help="입력 백엔드 (기본: 설정 파일 값)")
+    parser.add_argument('--speed', default='fast', choices=list(SPEED_PRESETS) + ['adaptive'])
+    parser.add_argument('--match', action='store_true', help="정규식 모드 (--regex가 없으면 앱에서 선택한 정규식)")
+    parser.add_argument('--regex', nargs='+', help="사용할 정규식 제목")
+    parser.add_argument('--verify', action='store_true', default=None, help="클릭 확인")
+    parser.add_argument('--pipeline', help="커런시 순서 (기본: 설정 파일 값)")
+    parser.add_argument('--layout', help="보관함 레이아웃 (기본: 설정 파일 값)")
+    parser.add_argument('--no-skip-empty', action='store_true', help="빈 칸 확인 없이 모든 칸 롤링")
+    parser.add_argument('--resume', action='store_true', help="중단된 작업 이어하기")
+    parser.add_argument('--serve', action='store_true', help="데몬으로 실행 (로컬 소켓으로 작업 요청)")
+    parser.add_argument('--port', type=int, default=DAEMON_PORT)
+    args = parser.parse_args(argv)
+
+    roller = HeadlessRoller(args.config, args.regex_file, args.input)
+    register_stop_keys(roller)
+    if args.serve:
+        server = JobServer(roller, args.port)
+        print(json.dumps({'ok': True, 'listening': f"{DAEMON_HOST}:{server.server_address[1]}"}), flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            roller.close()
+        return 0
+
+    request = {'speed': args.speed, 'match': args.match, 'regex': args.regex, 'layout': args.layout,
+               'skip_empty': not args.no_skip_empty, 'resume': args.resume}
+    if args.verify is not None:
+        request['verify'] = args.verify
+    if args.pipeline:
+        request['pipeline'] = args.pipeline
+    try:
+        report = roller.run(request)
+    except KeyboardInterrupt:
+        roller.stop()
+        return 130
+    finally:
+        roller.close()
+    print(json.dumps(report, ensure_ascii=False))
+    return 0 if report.get('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
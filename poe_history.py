@@ -0,0 +1,219 @@
+"""작업 기록 저장소 (SQLite, 추가만 함)와 기간/프리셋별 집계
+
+사용법: python poe_history.py [--db poe_roller_history.sqlite3] [--period day] [--by preset]
+"""
+import sys
+import queue
+import argparse
+import threading
+from array import array
+
+# --- 작업 기록 설정 ---
+HISTORY_FILE = 'poe_roller_history.sqlite3'
+HISTORY_QUEUE_SIZE = 64  # 디스크 쓰기를 기다릴 수 있는 작업 수 (넘치면 버림)
+HISTORY_CLOSE_TIMEOUT = 2.0  # 종료 시 남은 기록을 다 쓰기를 기다리는 최대 시간 (초)
+PERIOD_FORMATS = {'hour': '%Y-%m-%d %H:00', 'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m'}
+GROUP_COLUMNS = ('preset', 'machine', 'backend', 'layout', 'pipeline')
+# -------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    machine TEXT, backend TEXT, layout TEXT, preset TEXT, pipeline TEXT, matcher TEXT,
+    targets INTEGER, rolled INTEGER, satisfied INTEGER, rolled_satisfied INTEGER, empty INTEGER, cached INTEGER,
+    retries INTEGER, failed INTEGER, missed INTEGER, passes INTEGER,
+    elapsed REAL, stop_reason TEXT, completed INTEGER, outcome TEXT, error TEXT,
+    cell_times BLOB
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    currency TEXT NOT NULL,
+    rolled INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS steps_run ON steps(run_id);
+"""
+RUN_COLUMNS = ('started', 'machine', 'backend', 'layout', 'preset', 'pipeline', 'matcher',
+               'targets', 'rolled', 'satisfied', 'rolled_satisfied', 'empty', 'cached', 'retries', 'failed', 'missed', 'passes',
+               'elapsed', 'stop_reason', 'completed', 'outcome', 'error')
+ADDED_COLUMNS = {'outcome': 'TEXT', 'error': 'TEXT', 'rolled_satisfied': 'INTEGER'}  # 처음 버전 이후 추가된 열 (기존 파일에 없으면 추가)
+OUTCOMES = ('completed', 'stopped', 'failsafe', 'error')
+
+
+def connect(path=HISTORY_FILE):
+    """기록 파일 열기 (없으면 생성, WAL이라 앱이 쓰는 중에도 조회 가능)"""
+    import sqlite3
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for column, kind in ADDED_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+    conn.commit()
+    return conn
+
+
+def insert_run(conn, run, steps=(), cell_times=b''):
+    """작업 하나 추가 (run: RUN_COLUMNS 키의 딕셔너리, steps: [(커런시, 롤링 수)], cell_times: float32 바이트)"""
+    values = [run.get(column) for column in RUN_COLUMNS]
+    placeholders = ', '.join('?' * (len(RUN_COLUMNS) + 1))
+    cursor = conn.execute(f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}, cell_times) VALUES ({placeholders})",
+                          values + [cell_times])
+    conn.executemany("INSERT INTO steps (run_id, currency, rolled) VALUES (?, ?, ?)",
+                     [(cursor.lastrowid, currency, rolled) for currency, rolled in steps])
+    conn.commit()
+    return cursor.lastrowid
+
+
+class HistoryWriter:
+    """작업 기록을 별도 스레드에서 SQLite에 추가 (record()는 디스크를 기다리지 않음)
+
+    sqlite3 import와 파일 열기도 기록 스레드에서 하므로 앱 시작과 작업 스레드에 부담이 없다.
+    """
+
+    def __init__(self, path=HISTORY_FILE, maxsize=HISTORY_QUEUE_SIZE):
+        self.path = path
+        self.queue = queue.Queue(maxsize)
+        self.written = 0
+        self.dropped = 0
+        self.error = None  # 마지막 쓰기 오류 (기록 실패는 작업에 영향을 주지 않음)
+        self.thread = threading.Thread(target=self._run, name='poe-history', daemon=True)
+        self.thread.start()
+
+    def record(self, run, steps=(), cell_times=()):
+        """작업 하나 기록 요청 (큐가 가득 차면 버리고 False)"""
+        try:
+            self.queue.put_nowait((dict(run), list(steps), array('f', cell_times).tobytes()))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=HISTORY_CLOSE_TIMEOUT):
+        """남은 기록을 쓰고 스레드 종료 (timeout 안에 못 끝내면 남은 기록은 버림)"""
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+    def _run(self):
+        conn = None
+        machine = None
+        try:
+            import platform
+            machine = platform.node()
+            conn = connect(self.path)
+        except Exception as e:
+            self.error = e
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if conn is None:
+                self.dropped += 1
+                continue
+            run, steps, cell_times = item
+            run.setdefault('machine', machine)
+            try:
+                insert_run(conn, run, steps, cell_times)
+                self.written += 1
+            except Exception as e:
+                self.error = e
+                self.dropped += 1
+        if conn is not None:
+            conn.close()
+
+
+def run_record(report, started, layout, preset, pipeline, matcher=None, backend=None):
+    """poe_job.run_job 결과 요약을 기록용 딕셔너리로 변환 (outcome: OUTCOMES 중 하나)"""
+    run = {column: report.get(column) for column in RUN_COLUMNS if column in report}
+    run.update(started=started, layout=layout, preset=preset, pipeline=pipeline, backend=backend,
+               matcher=' | '.join(getattr(matcher, 'patterns', ())) if matcher else '',
+               completed=int(bool(report.get('completed'))))
+    return run
+
+
+def cell_times(conn, run_id):
+    """작업 하나의 칸별 입력 시간 목록 (초)"""
+    row = conn.execute("SELECT cell_times FROM runs WHERE id = ?", (run_id,)).fetchone()
+    times = array('f')
+    if row and row[0]:
+        times.frombytes(row[0])
+    return list(times)
+
+
+def throughput(conn, period='day', by=None):
+    """기간별(by를 주면 기간×그룹별) 처리량 [{'period', 'group', 'runs', 'rolled', 'seconds', 'cells_per_sec'}]"""
+    group = by if by in GROUP_COLUMNS else "''"
+    rows = conn.execute(
+        f"SELECT strftime(?, started, 'unixepoch', 'localtime') AS period, {group} AS grp, "
+        f"COUNT(*), SUM(rolled), SUM(elapsed) FROM runs WHERE rolled > 0 "
+        f"GROUP BY period, grp ORDER BY period, grp", (PERIOD_FORMATS.get(period, PERIOD_FORMATS['day']),))
+    return [{'period': period, 'group': grp, 'runs': runs, 'rolled': rolled, 'seconds': seconds,
+             'cells_per_sec': rolled / seconds if seconds else 0.0}
+            for period, grp, runs, rolled, seconds in rows]
+
+
+def success_by_preset(conn):
+    """프리셋별 성공률 [{'preset', 'runs', 'completed_rate', 'aborted_rate', 'match_rate', 'failed_rate'}]
+
+    aborted_rate는 비상 정지나 오류로 끝난 작업 비율, match_rate는 정규식 모드 작업의 일치 칸 비율 (정규식 작업이 없으면 None),
+    failed_rate는 반영을 끝내 확인하지 못한 칸 비율 (클릭 확인 모드).
+    """
+    rows = conn.execute(
+        "SELECT preset, COUNT(*), SUM(completed), SUM(outcome IN ('failsafe', 'error')), "
+        "SUM(targets), SUM(failed), "
+        "SUM(CASE WHEN matcher != '' THEN targets ELSE 0 END), "
+        "SUM(CASE WHEN matcher != '' THEN satisfied ELSE 0 END) "
+        "FROM runs GROUP BY preset ORDER BY preset")
+    return [{'preset': preset, 'runs': runs, 'completed_rate': completed / runs, 'aborted_rate': (aborted or 0) / runs,
+             'match_rate': satisfied / match_targets if match_targets else None,
+             'failed_rate': (failed or 0) / targets if targets else 0.0}
+            for preset, runs, completed, aborted, targets, failed, match_targets, satisfied in rows]
+
+
+def orbs_per_map(conn, by='preset'):
+    """정규식 모드에서 롤링해서 일치시킨 지도 한 장당 쓴 커런시 수 [{'group', 'currency', 'used', 'satisfied', 'per_map'}]
+
+    처음부터 일치해 롤링하지 않은 지도는 세지 않는다 (rolled_satisfied가 없는 예전 기록은 제외).
+    """
+    group = f"r.{by}" if by in GROUP_COLUMNS else "''"
+    rows = conn.execute(
+        f"SELECT {group} AS grp, s.currency, SUM(s.rolled), SUM(r.rolled_satisfied) "
+        f"FROM steps s JOIN runs r ON r.id = s.run_id WHERE r.matcher != '' AND r.rolled_satisfied IS NOT NULL "
+        f"GROUP BY grp, s.currency ORDER BY grp, s.currency")
+    return [{'group': grp, 'currency': currency, 'used': used, 'satisfied': satisfied,
+             'per_map': used / satisfied if satisfied else None}
+            for grp, currency, used, satisfied in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PoE 롤러 작업 기록 조회")
+    parser.add_argument('--db', default=HISTORY_FILE)
+    parser.add_argument('--period', default='day', choices=list(PERIOD_FORMATS))
+    parser.add_argument('--by', choices=GROUP_COLUMNS, help="처리량을 나눠 볼 기준")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    print(f"{'period':<16} {'group':<12} {'runs':>5} {'rolled':>7} {'cells/s':>8}")
+    for row in throughput(conn, args.period, args.by):
+        print(f"{row['period']:<16} {row['group'] or '':<12} {row['runs']:>5} {row['rolled']:>7} "
+              f"{row['cells_per_sec']:>8.2f}")
+    print(f"\n{'preset':<10} {'runs':>5} {'completed':>10} {'aborted':>8} {'matched':>8} {'failed':>7}")
+    for row in success_by_preset(conn):
+        matched = f"{row['match_rate']:.1%}" if row['match_rate'] is not None else '-'
+        print(f"{row['preset']:<10} {row['runs']:>5} {row['completed_rate']:>10.1%} {row['aborted_rate']:>8.1%} {matched:>8} "
+              f"{row['failed_rate']:>7.1%}")
+    print(f"\n{'preset':<10} {'currency':<8} {'used':>6} {'maps':>6} {'per map':>8}")
+    for row in orbs_per_map(conn):
+        per_map = f"{row['per_map']:.2f}" if row['per_map'] is not None else '-'
+        print(f"{row['group']:<10} {row['currency']:<8} {row['used']:>6} {row['satisfied']:>6} {per_map:>8}")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
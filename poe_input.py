@@ -0,0 +1,534 @@
+import sys
+import time
+import ctypes
+import threading
+
+# --- 입력 백엔드 설정 ---
+INPUT_BACKENDS = ('auto', 'sendinput', 'pyautogui', 'recording', 'null')
+MOVE_STEP_INTERVAL = 0.01  # duration이 있는 이동 시 중간 이동 이벤트 간격
+FAILSAFE_MARGIN = 0  # 화면 모서리 판정 여유 (픽셀)
+# -------------
+
+
+class InputFailSafe(Exception):
+    """마우스가 화면 모서리로 이동하여 비상 정지"""
+
+
+class InputBackend:
+    """입력 백엔드 기본 클래스
+
+    한 셀을 클릭하는 동작(이동 → 누름 → 뗌)을 백엔드별로 최소한의 호출로 처리한다.
+    bind_cancel()로 중지 이벤트를 연결하면 모든 대기가 중지 요청 즉시 깨어난다.
+    """
+    name = 'base'
+    cancel = None
+    timer = None
+
+    def bind_cancel(self, event):
+        """중지 이벤트 연결 (threading.Event)"""
+        self.cancel = event
+
+    def bind_timer(self, timer):
+        """정밀 대기 타이머 연결 (poe_timing.DeadlineTimer, 중지 이벤트는 타이머가 확인)"""
+        self.timer = timer
+
+    def cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    def now(self):
+        """현재 시각 (초, 타이머가 연결되어 있으면 타이머의 시계)"""
+        return self.timer.clock.now() if self.timer is not None else time.perf_counter()
+
+    def wait(self, seconds, label='wait'):
+        """대기 (중지 요청이 오면 즉시 깨어나고 True 반환, label은 타이머의 오차 기록용)"""
+        if self.timer is not None:
+            return self.timer.wait(seconds, label)
+        if self.cancel is None:
+            if seconds > 0:
+                time.sleep(seconds)
+            return False
+        if seconds <= 0:
+            return self.cancel.is_set()
+        return self.cancel.wait(seconds)
+
+    def move_steps(self, start, pos, duration):
+        """start에서 pos까지 직선 보간한 중간 지점과 간격 (마지막 지점 제외)"""
+        steps = max(1, int(duration / MOVE_STEP_INTERVAL))
+        for step in range(1, steps):
+            ratio = step / steps
+            yield (start[0] + (pos[0] - start[0]) * ratio,
+                   start[1] + (pos[1] - start[1]) * ratio), duration / steps
+
+    def move(self, pos, duration=0.0):
+        raise NotImplementedError
+
+    def mouse_down(self, button='left'):
+        raise NotImplementedError
+
+    def mouse_up(self, button='left'):
+        raise NotImplementedError
+
+    def right_click(self):
+        self.mouse_down(button='right')
+        self.mouse_up(button='right')
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        """키 조합 입력 (순서대로 누르고 역순으로 뗌)"""
+        for key in keys:
+            self.key_down(key)
+        for key in reversed(keys):
+            self.key_up(key)
+
+    def click_cell(self, pos, press_delay=0.0, move_duration=0.0):
+        """셀 하나 클릭 (이동 중 중지되면 클릭하지 않음, 누른 버튼은 항상 뗌)"""
+        self.move(pos, move_duration)
+        if self.cancelled():
+            return
+        self.mouse_down()
+        if press_delay > 0:
+            self.wait(press_delay, 'press')
+        self.mouse_up()
+
+    def click_cells(self, positions, press_delay=0.0, move_duration=0.0):
+        """여러 셀 연속 클릭"""
+        for pos in positions:
+            if self.cancelled():
+                return
+            self.click_cell(pos, press_delay, move_duration)
+
+    def release(self, item):
+        """키/버튼 하나를 뗌 (item: ('key', 이름) 또는 ('button', 이름), 비상 정지 상태에서도 보냄)"""
+        kind, name = item
+        if kind == 'key':
+            self.key_up(name)
+        else:
+            self.mouse_up(name)
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(InputBackend):
+    """기존 pyautogui 호출 방식 (셀마다 moveTo/mouseDown/mouseUp 3회 호출)"""
+    name = 'pyautogui'
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = 0.0
+
+    def _call(self, func, *args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except self._pyautogui.FailSafeException as e:
+            raise InputFailSafe(str(e))
+
+    def move(self, pos, duration=0.0):
+        if duration > 0:
+            # pyautogui의 duration 이동은 중간에 멈출 수 없어 직접 보간
+            start = self._pyautogui.position()
+            for point, interval in self.move_steps(start, pos, duration):
+                self._call(self._pyautogui.moveTo, point, _pause=False)
+                if self.wait(interval, 'move'):
+                    return
+        self._call(self._pyautogui.moveTo, pos, _pause=False)
+
+    def mouse_down(self, button='left'):
+        self._call(self._pyautogui.mouseDown, button=button, _pause=False)
+
+    def mouse_up(self, button='left'):
+        self._call(self._pyautogui.mouseUp, button=button, _pause=False)
+
+    def right_click(self):
+        self._call(self._pyautogui.rightClick)
+
+    def key_down(self, key):
+        self._call(self._pyautogui.keyDown, key)
+
+    def key_up(self, key):
+        self._call(self._pyautogui.keyUp, key)
+
+    def hotkey(self, *keys):
+        self._call(self._pyautogui.hotkey, *keys)
+
+    def release(self, item):
+        # 커서가 화면 모서리에 있어도 떼기는 보내야 하므로 잠시 FAILSAFE를 끔
+        failsafe = self._pyautogui.FAILSAFE
+        self._pyautogui.FAILSAFE = False
+        try:
+            super().release(item)
+        finally:
+            self._pyautogui.FAILSAFE = failsafe
+
+
+class RecordingBackend(InputBackend):
+    """이벤트를 실제로 보내지 않고 기록만 하는 백엔드 (Linux/테스트용)"""
+    name = 'recording'
+
+    def __init__(self, record=True, clock=time.perf_counter):
+        self.record = record
+        self.clock = clock
+        self.events = []
+        self.position = (0, 0)
+        self.held = set()
+
+    def _emit(self, kind, arg=None):
+        if self.record:
+            self.events.append((self.clock(), kind, arg))
+
+    def move(self, pos, duration=0.0):
+        if duration > 0 and self.wait(duration, 'move'):
+            return
+        self.position = (int(pos[0]), int(pos[1]))
+        self._emit('move', self.position)
+
+    def mouse_down(self, button='left'):
+        self.held.add(button)
+        self._emit('down', button)
+
+    def mouse_up(self, button='left'):
+        self.held.discard(button)
+        self._emit('up', button)
+
+    def key_down(self, key):
+        self.held.add(key)
+        self._emit('key_down', key)
+
+    def key_up(self, key):
+        self.held.discard(key)
+        self._emit('key_up', key)
+
+    def clear(self):
+        self.events = []
+
+
+class NullBackend(RecordingBackend):
+    """모든 이벤트를 버리는 백엔드"""
+    name = 'null'
+
+    def __init__(self):
+        super().__init__(record=False)
+
+
+# --- Windows SendInput 백엔드 ---
+if sys.platform == 'win32':
+    from ctypes import wintypes
+
+    ULONG_PTR = ctypes.c_size_t
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG),
+                    ('mouseData', wintypes.DWORD), ('dwFlags', wintypes.DWORD),
+                    ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD),
+                    ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD),
+                    ('dwExtraInfo', ULONG_PTR)]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD),
+                    ('wParamH', wintypes.WORD)]
+
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [('type', wintypes.DWORD), ('union', _INPUTUNION)]
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_RIGHTDOWN = 0x0008
+MOUSEEVENTF_RIGHTUP = 0x0010
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+MOUSEEVENTF_ABSOLUTE = 0x8000
+KEYEVENTF_KEYUP = 0x0002
+VK_CODES = {'shift': 0x10, 'ctrl': 0x11, 'alt': 0x12, 'c': 0x43}
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+
+
+class SendInputBackend(InputBackend):
+    """Win32 SendInput으로 한 셀의 이벤트를 모아 한 번에 전송하는 백엔드
+
+    이동+누름을 한 번의 SendInput 호출로 보내고, 누름 딜레이가 없으면 뗌까지
+    같은 호출에 포함한다. click_cells는 누름 딜레이가 없을 때 여러 셀을 한 번에 보낸다.
+    """
+    name = 'sendinput'
+
+    def __init__(self):
+        if sys.platform != 'win32':
+            raise OSError("SendInput 백엔드는 Windows에서만 사용할 수 있습니다")
+        self._user32 = ctypes.windll.user32
+        self._user32.SendInput.argtypes = (wintypes.UINT, ctypes.c_void_p, ctypes.c_int)
+        self._user32.SendInput.restype = wintypes.UINT
+        self.refresh_metrics()
+
+    def refresh_metrics(self):
+        """가상 화면 크기 갱신 (절대 좌표 정규화용)"""
+        metrics = self._user32.GetSystemMetrics
+        self.virtual_left = metrics(SM_XVIRTUALSCREEN)
+        self.virtual_top = metrics(SM_YVIRTUALSCREEN)
+        self.virtual_width = max(2, metrics(SM_CXVIRTUALSCREEN))
+        self.virtual_height = max(2, metrics(SM_CYVIRTUALSCREEN))
+        self.screen_width = metrics(SM_CXSCREEN)
+        self.screen_height = metrics(SM_CYSCREEN)
+
+    def cursor_pos(self):
+        point = wintypes.POINT()
+        self._user32.GetCursorPos(ctypes.byref(point))
+        return (point.x, point.y)
+
+    def _check_failsafe(self):
+        """pyautogui FAILSAFE와 동일하게 주 모니터 모서리를 검사"""
+        x, y = self.cursor_pos()
+        right = self.screen_width - 1
+        bottom = self.screen_height - 1
+        if (x <= FAILSAFE_MARGIN or x >= right - FAILSAFE_MARGIN) and \
+                (y <= FAILSAFE_MARGIN or y >= bottom - FAILSAFE_MARGIN):
+            raise InputFailSafe("마우스가 화면 모서리로 이동되었습니다")
+
+    def _mouse_event(self, flags, pos=None):
+        event = INPUT(type=INPUT_MOUSE)
+        if pos is not None:
+            event.union.mi.dx = ((int(pos[0]) - self.virtual_left) * 65535) // (self.virtual_width - 1)
+            event.union.mi.dy = ((int(pos[1]) - self.virtual_top) * 65535) // (self.virtual_height - 1)
+            flags |= MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
+        event.union.mi.dwFlags = flags
+        return event
+
+    def _key_event(self, key, up=False):
+        vk = VK_CODES[key]
+        event = INPUT(type=INPUT_KEYBOARD)
+        event.union.ki.wVk = vk
+        event.union.ki.wScan = self._user32.MapVirtualKeyW(vk, 0)
+        event.union.ki.dwFlags = KEYEVENTF_KEYUP if up else 0
+        return event
+
+    def submit(self, events, check=True):
+        """이벤트 목록을 한 번의 SendInput 호출로 전송 (check면 먼저 비상 정지 검사)"""
+        if not events:
+            return
+        if check:
+            self._check_failsafe()
+        array = (INPUT * len(events))(*events)
+        sent = self._user32.SendInput(len(events), array, ctypes.sizeof(INPUT))
+        if sent != len(events):
+            raise OSError(ctypes.GetLastError(), "SendInput 전송 실패")
+
+    def move(self, pos, duration=0.0):
+        if duration > 0:
+            # pyautogui moveTo(duration=...)처럼 직선 보간 이동
+            for point, interval in self.move_steps(self.cursor_pos(), pos, duration):
+                self.submit([self._mouse_event(0, point)])
+                if self.wait(interval, 'move'):
+                    return
+        self.submit([self._mouse_event(0, pos)])
+
+    def mouse_down(self, button='left'):
+        flag = MOUSEEVENTF_RIGHTDOWN if button == 'right' else MOUSEEVENTF_LEFTDOWN
+        self.submit([self._mouse_event(flag)])
+
+    def mouse_up(self, button='left'):
+        flag = MOUSEEVENTF_RIGHTUP if button == 'right' else MOUSEEVENTF_LEFTUP
+        self.submit([self._mouse_event(flag)])
+
+    def right_click(self):
+        self.submit([self._mouse_event(MOUSEEVENTF_RIGHTDOWN),
+                     self._mouse_event(MOUSEEVENTF_RIGHTUP)])
+
+    def key_down(self, key):
+        self.submit([self._key_event(key)])
+
+    def key_up(self, key):
+        self.submit([self._key_event(key, up=True)])
+
+    def hotkey(self, *keys):
+        events = [self._key_event(key) for key in keys]
+        events += [self._key_event(key, up=True) for key in reversed(keys)]
+        self.submit(events)
+
+    def click_cell(self, pos, press_delay=0.0, move_duration=0.0):
+        if move_duration > 0:
+            self.move(pos, move_duration)
+            if self.cancelled():
+                return
+            events = [self._mouse_event(MOUSEEVENTF_LEFTDOWN)]
+        else:
+            # 이동과 누름을 한 번에 전송
+            events = [self._mouse_event(MOUSEEVENTF_LEFTDOWN, pos)]
+        if press_delay > 0:
+            self.submit(events)
+            self.wait(press_delay, 'press')
+            self.submit([self._mouse_event(MOUSEEVENTF_LEFTUP)])
+        else:
+            events.append(self._mouse_event(MOUSEEVENTF_LEFTUP))
+            self.submit(events)
+
+    def release(self, item):
+        kind, name = item
+        if kind == 'key':
+            self.submit([self._key_event(name, up=True)], check=False)
+        else:
+            flag = MOUSEEVENTF_RIGHTUP if name == 'right' else MOUSEEVENTF_LEFTUP
+            self.submit([self._mouse_event(flag)], check=False)
+
+    def click_cells(self, positions, press_delay=0.0, move_duration=0.0):
+        if press_delay > 0 or move_duration > 0:
+            return super().click_cells(positions, press_delay, move_duration)
+        events = []
+        for pos in positions:
+            events.append(self._mouse_event(MOUSEEVENTF_LEFTDOWN, pos))
+            events.append(self._mouse_event(MOUSEEVENTF_LEFTUP))
+        self.submit(events)
+
+
+class InputState:
+    """입력 백엔드로 보낸 키/버튼 누름을 기억하여 목표 상태에 필요한 이벤트만 보냄
+
+    held에는 눌려 있을 수 있는 키/버튼 (('key', 'shift'), ('button', 'left'))을 기억한다.
+    눌린 키를 다시 누르거나 떼어진 키를 다시 떼는 이벤트는 보내지 않는다. 보내는 도중
+    예외(비상 정지 등)가 나면 눌린 것으로 남겨 두고, release_all()이 비상 정지 상태에서도
+    남은 것을 모두 뗀다. release_all()은 어느 스레드에서나 호출할 수 있다. held는 항상 lock 안에서
+    읽고 쓴다 (버튼 클릭은 백엔드 호출 동안 lock을 잡지 않아 release_all()이 기다리지 않음).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.held = set()
+        self.lock = threading.Lock()
+
+    def is_held(self, key):
+        with self.lock:
+            return ('key', key) in self.held
+
+    def hold(self, key):
+        """키를 누른 상태로 (이미 눌려 있으면 이벤트 없음)"""
+        item = ('key', key)
+        with self.lock:
+            if item in self.held:
+                return
+            self.held.add(item)
+            self.backend.key_down(key)
+
+    def release(self, key):
+        """키를 뗀 상태로 (눌려 있지 않으면 이벤트 없음)"""
+        item = ('key', key)
+        with self.lock:
+            if item not in self.held:
+                return
+            self.backend.key_up(key)
+            self.held.discard(item)
+
+    def set_keys(self, keys):
+        """keys만 눌린 상태로 (나머지 키는 떼고 없는 키는 누름)"""
+        with self.lock:
+            stale = [name for kind, name in self.held if kind == 'key' and name not in keys]
+        for name in stale:
+            self.release(name)
+        for key in keys:
+            self.hold(key)
+
+    def click_cell(self, pos, press_delay=0.0, move_duration=0.0):
+        """셀 하나 클릭 (백엔드가 버튼을 떼기 전에 예외가 나면 버튼이 눌린 것으로 남음)"""
+        item = ('button', 'left')
+        with self.lock:
+            self.held.add(item)
+        self.backend.click_cell(pos, press_delay, move_duration)
+        with self.lock:
+            self.held.discard(item)
+
+    def right_click(self):
+        item = ('button', 'right')
+        with self.lock:
+            self.held.add(item)
+        self.backend.right_click()
+        with self.lock:
+            self.held.discard(item)
+
+    def release_all(self):
+        """눌려 있을 수 있는 키/버튼을 모두 뗌 (보낸 떼기 목록 반환)"""
+        with self.lock:
+            items = sorted(self.held)
+            for item in items:
+                try:
+                    self.backend.release(item)
+                except Exception:
+                    pass
+                self.held.discard(item)
+        return items
+
+
+def create_input_backend(name='auto'):
+    """이름으로 입력 백엔드 생성 ('auto'는 Windows면 SendInput, 아니면 pyautogui)"""
+    if name == 'auto':
+        name = 'sendinput' if sys.platform == 'win32' else 'pyautogui'
+    if name == 'sendinput':
+        return SendInputBackend()
+    if name == 'pyautogui':
+        return PyAutoGuiBackend()
+    if name == 'recording':
+        return RecordingBackend()
+    if name == 'null':
+        return NullBackend()
+    raise ValueError(f"알 수 없는 입력 백엔드: {name}")
+
+
+def measure_cell_cost(backend, positions, rounds=3):
+    """셀당 입력 호출 비용 측정 (누름 딜레이 제외, 초 단위)"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for pos in positions:
+            backend.click_cell(pos)
+        elapsed = (time.perf_counter() - start) / max(1, len(positions))
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare_backends(names=None, cells=144):
+    """백엔드별 셀당 비용 비교 (사용할 수 없는 백엔드는 건너뜀)"""
+    if names is None:
+        names = ('pyautogui', 'sendinput', 'recording', 'null')
+    # 12x12 그리드의 한 지점 주변을 반복 (실제 커서를 멀리 움직이지 않도록)
+    positions = [(400 + (i % 12), 400 + (i // 12) % 12) for i in range(cells)]
+    results = {}
+    for name in names:
+        try:
+            backend = create_input_backend(name)
+        except Exception as e:
+            results[name] = None
+            print(f"{name:>10}: 사용 불가 ({e})")
+            continue
+        try:
+            cost = measure_cell_cost(backend, positions)
+        finally:
+            backend.close()
+        results[name] = cost
+    baseline = results.get('pyautogui')
+    for name, cost in results.items():
+        if cost is None:
+            continue
+        line = f"{name:>10}: {cost * 1e6:9.1f} us/cell, {cells}칸 {cost * cells * 1000:8.2f} ms"
+        if baseline:
+            line += f" (pyautogui 대비 x{baseline / cost:.1f})"
+        print(line)
+    return results
+
+
+if __name__ == "__main__":
+    compare_backends()
@@ -0,0 +1,253 @@
+import time
+
+import poe_path
+import poe_layout
+import poe_craft
+import poe_timing
+from poe_engine import MATCH_MAX_PASSES, MATCH_TIME_LIMIT
+from poe_input import InputFailSafe
+from poe_matcher import ItemTextReader, WindowsClipboard
+from poe_verify import ClickVerifier
+
+
+class RollJob:
+    """한 번의 롤링 작업 옵션"""
+
+    def __init__(self, speed='fast', matcher=None, skip_empty=True, verify=False,
+                 pipeline=poe_craft.DEFAULT_PIPELINE, done=None, max_passes=MATCH_MAX_PASSES,
+                 max_seconds=MATCH_TIME_LIMIT, step_done=None):
+        self.speed = speed
+        self.matcher = matcher
+        self.skip_empty = skip_empty  # 작업 전에 그리드를 캡처해 빈 칸 제외 (numpy 필요)
+        self.verify = verify
+        self.pipeline = pipeline
+        self.done = done  # 이어하기: 끝난 칸 좌표 (작업 중 계속 추가됨)
+        self.step_done = step_done  # 이어하기: 여러 커런시 작업의 단계별 끝난 칸 {커런시: set(좌표)}
+        self.max_passes = max_passes
+        self.max_seconds = max_seconds
+
+
+class RollContext:
+    """작업할 보관함/커런시 좌표와 화면 캡처 자원 (앱과 헤드리스 실행이 공유, Tk 없이 동작)
+
+    get_capture는 그리드 영역이 등록된 poe_capture.CaptureEngine을 돌려주는 함수 (없으면 캡처 기능 없이 동작)
+    """
+
+    def __init__(self, layout, coords, cells, grid_bounds, chaos_pos, chaos_size, currency_slots=None,
+                 path_method=poe_path.DEFAULT_PATH_METHOD, get_capture=None, cell_cache=None):
+        self.layout = layout
+        self.coords = coords
+        self.cells = cells
+        self.grid_bounds = grid_bounds
+        self.chaos_pos = chaos_pos
+        self.chaos_size = chaos_size
+        self.currency_slots = currency_slots or {}
+        self.path_method = path_method
+        self.get_capture = get_capture
+        self.cell_cache = cell_cache
+
+    @classmethod
+    def from_settings(cls, settings, layouts=None, get_capture=None, cell_cache=None):
+        """poe_config.read_config 결과로 생성"""
+        layouts = layouts or poe_layout.LAYOUTS
+        layout = layouts.get(settings['stash_layout']) or poe_layout.LAYOUTS[poe_layout.DEFAULT_LAYOUT]
+        table = poe_layout.coordinate_table(layout, settings['grid_bounds'])
+        return cls(layout, table, table.cells, settings['grid_bounds'], settings['chaos_pos'],
+                   settings['chaos_size'], settings['currency_slots'], settings['path_method'],
+                   get_capture, cell_cache)
+
+    def currency_slot(self, name):
+        return poe_craft.slot_position(name, self.chaos_pos, self.chaos_size, self.currency_slots)
+
+    def occupied_indices(self):
+        """그리드를 한 번 캡처하여 아이템이 있는 칸의 인덱스만 반환"""
+        if self.layout.kind != 'grid':
+            # 고정 슬롯 보관함은 격자 분석을 할 수 없으므로 모든 칸 방문
+            return list(range(len(self.coords)))
+        import poe_vision
+        frame = self.get_capture().grab('grid')
+        mask = poe_vision.occupancy_mask(frame.image, self.layout.rows, self.layout.cols, order='BGRA')
+        return [i for i, (row, col) in enumerate(self.cells) if mask[row, col]]
+
+    def snapshot_cells(self):
+        """그리드를 캡처하여 칸별 지각 해시를 칸 판정 캐시에 설정 (격자 보관함만)"""
+        if self.layout.kind != 'grid':
+            return None
+        import poe_vision
+        import poe_cellcache
+        if self.cell_cache is None:
+            self.cell_cache = poe_cellcache.CellCache()
+        frame = self.get_capture().grab('grid')
+        hashes = poe_vision.cell_hashes(frame.image, self.layout.rows, self.layout.cols, order='BGRA')
+        self.cell_cache.snapshot({pos: int(hashes[row, col]) for pos, (row, col) in zip(self.coords, self.cells)})
+        return self.cell_cache
+
+    def plan_coords(self, indices, start=None):
+        """방문할 칸들을 커서 이동 거리가 짧은 순서로 정렬하고 거리 절약량 보고 (start: 커런시 칸, 기본은 카오스 오브)"""
+        start = start or self.chaos_pos
+        points = [self.coords[i] for i in indices]
+        cells = [self.cells[i] for i in indices]
+        order = poe_path.plan_order(points, cells, self.path_method, start)
+        report = poe_path.travel_report(points, cells, order, start)
+        return [points[i] for i in order], report
+
+
+def run_job(engine, context, job, pacer=None, history=None):
+    """한 번의 롤링 작업 실행 후 결과 요약 딕셔너리 반환 (InputFailSafe 등 예외는 호출한 쪽에서 처리)
+
+    history(poe_history.HistoryWriter)를 주면 한 칸 이상 롤링한 작업을 기록한다 (디스크 쓰기는 기록 스레드에서).
+    비상 정지나 예외로 끝난 작업도 그때까지의 결과와 outcome('failsafe'/'error')으로 기록한 뒤 예외를 다시 던진다.
+
+    반환 키: targets, rolled, satisfied, rolled_satisfied (롤링 후 일치한 칸), empty, passes, cached, retries, failed,
+    errors, stopped, stop_reason, completed, outcome ('completed'/'stopped'), elapsed, saved_px, steps [(커런시, 롤링 수)], delays, missed,
+    empty_stash, matcher, verify, timing (간격 종류별 대기 오차, 여러 커런시면 마지막 단계)
+    """
+    started = time.time()
+    matcher = job.matcher or None
+    report = {'targets': 0, 'rolled': 0, 'satisfied': 0, 'rolled_satisfied': 0, 'empty': 0, 'passes': 0, 'cached': 0,
+              'retries': 0, 'failed': 0, 'errors': 0, 'stopped': False, 'stop_reason': None, 'completed': False, 'outcome': None,
+              'error': None, 'elapsed': 0.0, 'saved_px': 0.0, 'steps': [], 'delays': None, 'missed': 0,
+              'empty_stash': False, 'matcher': bool(matcher), 'verify': False, 'timing': {}}
+    results = []  # [(커런시, RollResult)] 끝난 단계
+    names = []  # 실행할 커런시 순서
+    engine.last_result = None
+    try:
+        roll_job(engine, context, job, pacer, report, results, names)
+        report['outcome'] = 'completed' if report['completed'] else 'stopped'
+    except InputFailSafe as e:
+        report.update(outcome='failsafe', error=str(e) or "비상 정지")
+        raise
+    except Exception as e:
+        report.update(outcome='error', error=str(e))
+        raise
+    finally:
+        if report['outcome'] in ('failsafe', 'error'):
+            # 진행 중이던 단계는 엔진에 남은 결과(중단 직전까지 롤링한 칸)로 채움
+            last = engine.last_result
+            if last is not None and len(results) < len(names) and all(step is not last for _, step in results):
+                results.append((names[len(results)], last))
+            summarize(report, results, len(names) > 1)
+        if history is not None and (report['rolled'] or report['outcome'] in ('failsafe', 'error')):
+            import poe_history
+            run = poe_history.run_record(report, started, context.layout.name, job.speed, job.pipeline, matcher,
+                                         engine.input.name)
+            history.record(run, report['steps'] or [(names[0] if names else 'chaos', report['rolled'])],
+                           [t for _, step in results for t in step.cell_times])
+    return report
+
+
+def summarize(report, results, multi=False):
+    """단계별 결과 [(커런시, RollResult)]를 요약 딕셔너리에 반영 (판정/대기 통계는 마지막 단계 기준)"""
+    if not results:
+        return
+    result = results[-1][1]
+    if multi:
+        report['steps'] = [(name, step.rolled) for name, step in results]
+    report['rolled'] = sum(step.rolled for _, step in results)
+    report['elapsed'] = sum(step.elapsed for _, step in results)
+    report.update(satisfied=result.satisfied, rolled_satisfied=result.rolled_satisfied, empty=result.empty,
+                  passes=result.passes, cached=result.cached, retries=result.retries, failed=result.failed, errors=result.errors, stopped=result.stopped,
+                  stop_reason=result.stop_reason, delays=result.delays, missed=result.missed, timing=result.timing)
+
+
+def roll_job(engine, context, job, pacer, report, results, names):
+    """run_job의 실제 작업 (report/results/names를 채움, 예외가 나도 그때까지 채운 내용이 남음)"""
+    speed = job.speed
+    matcher = job.matcher or None
+
+    # 빈 칸 제외 (카오스 오브 선택 전, 툴팁이 없는 상태에서 캡처)
+    indices = list(range(len(context.coords)))
+    if job.skip_empty and context.get_capture:
+        engine.channel.set_message("보관함 빈 칸 확인 중...")
+        try:
+            indices = context.occupied_indices()
+        except Exception:
+            pass
+        if not indices:
+            report['empty_stash'] = True
+            return
+
+    # 지난 작업에서 비어 있던 칸은 화면이 그대로면 건너뜀
+    cache = None
+    if (matcher or job.verify) and context.get_capture:
+        try:
+            cache = context.snapshot_cells()
+        except Exception:
+            cache = None
+
+    # 정규식 모드와 자동 속도 조절은 게임의 아이템 텍스트 복사를 사용
+    reader = None
+    if matcher or speed == 'adaptive' or job.verify:
+        reader = ItemTextReader(engine.input, WindowsClipboard())
+
+    # 클릭 확인: 정규식 모드는 롤링 후 텍스트를 이미 확인하므로 따로 하지 않음
+    analyzer = None
+    if job.verify and not matcher:
+        analyzer = ClickVerifier(engine.input, reader)
+        report['verify'] = True
+
+    steps = poe_craft.CRAFT_PIPELINES.get(job.pipeline, ('chaos',))
+    options = dict(reader=reader, max_passes=job.max_passes, pacer=pacer, max_seconds=job.max_seconds,
+                   analyzer=analyzer)
+    if len(steps) > 1:
+        # 여러 커런시: 커런시별로 묶어 커런시마다 한 번만 집고 해당 칸 전부에 적용
+        groups = []
+        plan = poe_craft.plan_steps(indices, steps)
+        for name, group in poe_craft.group_steps(plan, steps):
+            group_coords, path_report = context.plan_coords(group, context.currency_slot(name))
+            groups.append((name, group_coords))
+            report['saved_px'] += path_report['saved_px']
+        names.extend(name for name, _ in groups)
+        slots = {name: context.currency_slot(name) for name in steps}
+        report['targets'] = len(groups[-1][1]) if groups else 0
+        poe_craft.run_pipeline(engine, groups, slots, speed, matcher, job.done, cache,
+                               step_done=job.step_done, results=results, **options)
+        if not results:
+            report['stopped'] = True
+            return
+        report['completed'] = len(results) == len(groups) and not results[-1][1].stopped
+        summarize(report, results, True)
+    else:
+        # 커서 이동 경로 최적화
+        coords, path_report = context.plan_coords(indices)
+        report['saved_px'] = path_report['saved_px']
+        report['targets'] = len(coords)
+        names.append(steps[0])
+
+        # 맵 롤링
+        result = engine.roll(coords, context.chaos_pos, speed, matcher, done=job.done, cache=cache, **options)
+        results.append((steps[0], result))
+        report['completed'] = not result.stopped
+        summarize(report, results)
+
+
+def format_report(report, done=None, total=None):
+    """작업 결과 요약 문장 (앱 상태 표시줄용)"""
+    if report['empty_stash']:
+        return "보관함에 지도가 없습니다. "
+    summary = ""
+    if report['steps']:
+        summary += "단계별 롤링: " + ", ".join(
+            f"{poe_craft.CURRENCIES[name].short} {rolled}칸" for name, rolled in report['steps']) + ". "
+    if done and not report['completed']:
+        summary += f"{len(done)}/{total}칸 완료 (이어하기 가능). "
+    if report['matcher']:
+        summary += f"정규식 일치 {report['satisfied']}/{report['targets']}칸 ({report['passes']}회차"
+        if report['empty']:
+            summary += f", 빈 칸 {report['empty']}"
+        summary += "). "
+        if report['stop_reason'] == 'time':
+            summary += "시간 제한 도달. "
+    if report['cached']:
+        summary += f"지난 작업에서 비어 있던 {report['cached']}칸 건너뜀. "
+    if report['verify']:
+        summary += f"클릭 재시도 {report['retries']}회, 확인 실패 {report['failed']}칸. "
+    if report.get('errors'):
+        summary += f"분석 오류 {report['errors']}회. "
+    if report['delays']:
+        move_duration, press_delay, click_delay = report['delays']
+        summary += f"자동 속도: 클릭 간격 {(press_delay + click_delay) * 1000:.0f}ms, 재시도 {report['missed']}회. "
+    timing = poe_timing.format_timing(report.get('timing') or {})
+    if timing:
+        summary += f"{timing}. "
+    return summary
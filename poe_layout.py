@@ -0,0 +1,113 @@
+import os
+import json
+from array import array
+from functools import lru_cache
+
+# --- 보관함 레이아웃 설정 ---
+LAYOUT_FILE = 'poe_layouts.json'  # 사용자 정의 레이아웃 (선택)
+DEFAULT_LAYOUT = 'normal'
+# -------------
+
+
+class GridLayout:
+    """rows x cols 균일 격자 보관함 (일반 12x12, 쿼드 24x24 등)"""
+    kind = 'grid'
+
+    def __init__(self, name, rows, cols, label=None):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.label = label or f"{rows}x{cols}"
+
+    def cells(self):
+        """칸 목록 (row, col), 열 우선 순서"""
+        return [(row, col) for col in range(self.cols) for row in range(self.rows)]
+
+    def centers(self):
+        """grid_bounds 안에서 칸 중심의 상대 위치 (0~1)"""
+        return [((col + 0.5) / self.cols, (row + 0.5) / self.rows) for row, col in self.cells()]
+
+
+class SlotLayout:
+    """칸 위치가 고정된 보관함 (맵/화폐 탭 등, grid_bounds 기준 상대 좌표 목록)"""
+    kind = 'slots'
+
+    def __init__(self, name, slots, label=None):
+        self.name = name
+        self.slots = tuple((float(x), float(y)) for x, y in slots)
+        self.rows = 1
+        self.cols = len(self.slots)
+        self.label = label or name
+
+    def cells(self):
+        """슬롯 번호를 (0, 번호)로 표현"""
+        return [(0, index) for index in range(len(self.slots))]
+
+    def centers(self):
+        return list(self.slots)
+
+
+LAYOUTS = {
+    'normal': GridLayout('normal', 12, 12, "일반 12x12"),
+    'quad': GridLayout('quad', 24, 24, "쿼드 24x24"),
+}
+
+
+def load_layouts(path=LAYOUT_FILE):
+    """기본 레이아웃에 사용자 정의 레이아웃 파일 내용을 더한 {이름: 레이아웃}
+
+    파일 형식: {"이름": {"rows": 8, "cols": 8}} 또는 {"이름": {"slots": [[x, y], ...]}}
+    (slots는 grid_bounds 기준 0~1 상대 좌표)
+    """
+    layouts = dict(LAYOUTS)
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for name, spec in json.load(f).items():
+                    if 'slots' in spec:
+                        layouts[name] = SlotLayout(name, spec['slots'], spec.get('label'))
+                    else:
+                        layouts[name] = GridLayout(name, int(spec['rows']), int(spec['cols']), spec.get('label'))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return layouts
+
+
+class CoordinateTable:
+    """레이아웃의 칸별 화면 좌표 (x, y는 array로 저장, 시퀀스처럼 (x, y) 튜플로 접근)"""
+
+    def __init__(self, xs, ys, cells):
+        self.xs = xs
+        self.ys = ys
+        self.cells = cells
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        return (self.xs[index], self.ys[index])
+
+    def __iter__(self):
+        return zip(self.xs, self.ys)
+
+    def translated(self, dx, dy):
+        """평행 이동한 새 좌표표"""
+        return CoordinateTable(array('i', (x + dx for x in self.xs)),
+                               array('i', (y + dy for y in self.ys)), self.cells)
+
+
+@lru_cache(maxsize=32)
+def _coordinate_table(layout, bounds):
+    left, top, right, bottom = bounds
+    width = right - left
+    height = bottom - top
+    centers = layout.centers()
+    xs = array('i', (round(left + x * width) for x, _ in centers))
+    ys = array('i', (round(top + y * height) for _, y in centers))
+    return CoordinateTable(xs, ys, tuple(layout.cells()))
+
+
+def coordinate_table(layout, bounds):
+    """grid_bounds에 맞춘 레이아웃 좌표표 (같은 레이아웃/경계는 캐시된 표 재사용)"""
+    key = (bounds['left'], bounds['top'], bounds['right'], bounds['bottom'])
+    return _coordinate_table(layout, key)
@@ -0,0 +1,133 @@
+import re
+import sys
+import ctypes
+from functools import lru_cache
+
+# --- 아이템 텍스트 매칭 설정 ---
+COPY_KEYS = ('ctrl', 'c')  # 게임 내 아이템 텍스트 복사 단축키
+COPY_TIMEOUT = 0.25  # 클립보드 갱신 대기 시간
+COPY_POLL_INTERVAL = 0.005
+MATCH_FLAGS = re.IGNORECASE | re.MULTILINE
+# -------------
+
+# 검색어 하나: "따옴표로 묶은 말" (공백 포함 가능) 또는 공백 없는 말, 앞의 !는 부정
+SEARCH_TERM = re.compile(r'(!?)"([^"]*)"?|(\S+)')
+
+
+def parse_search(text):
+    """PoE 보관함 검색 문자열을 [(부정 여부, 정규식 문자열)] 조건 목록으로 분리 (모두 만족해야 일치)
+
+    '"!poison" "m q.*1[0-9][0-9]%"'는 poison이 없고 m q.*1[0-9][0-9]%가 있는 아이템.
+    """
+    terms = []
+    for bang, quoted, bare in SEARCH_TERM.findall(text):
+        term = bare or bang + quoted
+        negate = term.startswith('!')
+        if negate:
+            term = term[1:]
+        if term:
+            terms.append((negate, term))
+    return terms
+
+
+def compile_search(text):
+    """검색 문자열의 조건별 정규식 컴파일 [(부정 여부, 정규식)] (잘못된 정규식이면 re.error)"""
+    return [(negate, re.compile(term, MATCH_FLAGS)) for negate, term in parse_search(text)]
+
+
+class PatternMatcher:
+    """PoE 보관함 검색 문자열 여러 개 중 하나라도 만족하는지 검사하는 매처
+
+    검색 문자열마다 따로 컴파일하므로 역참조 번호나 인라인 플래그가 다른 패턴에 영향을 주지 않는다.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self._searches = [terms for terms in map(compile_search, self.patterns) if terms]
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def matches(self, text):
+        """아이템 텍스트가 검색 문자열 중 하나라도 만족하는지 확인 (문자열 안의 조건은 모두 만족해야 함)"""
+        if not text:
+            return False
+        return any(all((regex.search(text) is None) == negate for negate, regex in terms)
+                   for terms in self._searches)
+
+
+@lru_cache(maxsize=16)
+def _compile_matcher(patterns):
+    return PatternMatcher(patterns)
+
+
+def compile_matcher(patterns):
+    """패턴 목록으로 매처 생성 (같은 패턴 조합은 캐시된 매처 재사용)"""
+    return _compile_matcher(tuple(patterns))
+
+
+class Clipboard:
+    """클립보드 읽기 인터페이스"""
+
+    def sequence(self):
+        """클립보드가 바뀔 때마다 증가하는 번호"""
+        raise NotImplementedError
+
+    def read_text(self):
+        raise NotImplementedError
+
+
+class WindowsClipboard(Clipboard):
+    """Win32 API로 직접 클립보드를 읽음 (작업 스레드에서 Tk 없이 사용)"""
+    CF_UNICODETEXT = 13
+
+    def __init__(self):
+        if sys.platform != 'win32':
+            raise OSError("Windows 클립보드는 Windows에서만 사용할 수 있습니다")
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._user32.GetClipboardData.restype = ctypes.c_void_p
+        self._kernel32.GlobalLock.argtypes = (ctypes.c_void_p,)
+        self._kernel32.GlobalLock.restype = ctypes.c_void_p
+        self._kernel32.GlobalUnlock.argtypes = (ctypes.c_void_p,)
+
+    def sequence(self):
+        return self._user32.GetClipboardSequenceNumber()
+
+    def read_text(self):
+        if not self._user32.OpenClipboard(None):
+            return None
+        try:
+            handle = self._user32.GetClipboardData(self.CF_UNICODETEXT)
+            if not handle:
+                return None
+            pointer = self._kernel32.GlobalLock(handle)
+            if not pointer:
+                return None
+            try:
+                return ctypes.wstring_at(pointer)
+            finally:
+                self._kernel32.GlobalUnlock(handle)
+        finally:
+            self._user32.CloseClipboard()
+
+
+class ItemTextReader:
+    """커서 아래 아이템의 텍스트를 게임의 복사 기능으로 읽음"""
+
+    def __init__(self, input_backend, clipboard, timeout=COPY_TIMEOUT):
+        self.input = input_backend
+        self.clipboard = clipboard
+        self.timeout = timeout
+
+    def read(self):
+        """복사 단축키를 보내고 클립보드가 갱신되면 텍스트 반환 (시간 초과 시 None)"""
+        before = self.clipboard.sequence()
+        self.input.hotkey(*COPY_KEYS)
+        deadline = self.input.now() + self.timeout
+        while self.input.now() < deadline:
+            if self.clipboard.sequence() != before:
+                return self.clipboard.read_text()
+            if self.input.wait(COPY_POLL_INTERVAL, 'poll'):
+                break
+        return None
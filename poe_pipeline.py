@@ -0,0 +1,131 @@
+import queue
+import threading
+
+# --- 분석 파이프라인 설정 ---
+ANALYSIS_WORKERS = 1  # 분석 작업자 수 (0이면 입력 스레드에서 바로 분석)
+ANALYSIS_QUEUE_SIZE = 8  # 분석 대기열 최대 길이 (가득 차면 입력 스레드가 잠시 기다림)
+# -------------
+
+ANALYSIS_ERROR = 'error'  # analyze()가 예외를 던진 칸의 결과 (실패로 보고 다시 롤링)
+
+
+class Analyzer:
+    """칸마다 클릭 결과를 검사하는 인터페이스
+
+    capture()는 입력 스레드에서 클릭 직후 바로 호출되므로 짧게 (화면 일부 캡처 등),
+    analyze()는 작업자 스레드/프로세스에서 호출되므로 무거운 처리를 해도 된다.
+    analyze()는 poe_engine의 CELL_* 상태를 반환한다 (None이면 판단 보류: 끝난 것으로 치지 않고
+    남겨 둠). analyze()가 예외를 던지면 결과는 ANALYSIS_ERROR가 되어 실패로 처리된다.
+    processes=True로 쓰려면 analyze가 pickle 가능한 모듈 수준 함수/객체여야 한다.
+    """
+    workers = ANALYSIS_WORKERS
+    processes = False  # 무거운 이미지 처리는 프로세스 풀에서 (GIL 회피)
+    retry_backoff = 0.0  # 실패한 칸을 다시 롤링하는 패스 전 대기 (패스마다 두 배)
+
+    def before(self, pos, move_duration=0.0):
+        """클릭 직전 입력 스레드에서 호출 (False면 아이템이 없는 칸으로 보고 건너뜀)"""
+        return True
+
+    def capture(self, pos):
+        return pos
+
+    def analyze(self, payload):
+        raise NotImplementedError
+
+
+class AnalysisPipeline:
+    """입력 스레드가 넣은 캡처를 작업자가 분석하고 결과를 돌려주는 생산자/소비자 파이프라인
+
+    submit()은 대기열이 가득 차면 자리가 날 때까지 기다린다 (중지 요청 시 즉시 포기).
+    결과는 results()로 입력 스레드가 원하는 때에 한꺼번에 가져간다.
+    """
+
+    def __init__(self, analyze, workers=ANALYSIS_WORKERS, maxsize=ANALYSIS_QUEUE_SIZE,
+                 processes=False, cancel=None):
+        self.analyze = analyze
+        self.cancel = cancel
+        self.tasks = queue.Queue(maxsize=max(1, maxsize))
+        self.done = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Condition()
+        self.executor = None
+        if processes and workers:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.threads = []
+        for _ in range(workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _run(self, payload):
+        if self.executor is not None:
+            return self.executor.submit(self.analyze, payload).result()
+        return self.analyze(payload)
+
+    def _work(self):
+        while True:
+            item = self.tasks.get()
+            if item is None:
+                return
+            key, payload = item
+            try:
+                result = self._run(payload)
+            except Exception:
+                result = ANALYSIS_ERROR
+            self.done.put((key, result))
+            with self.lock:
+                self.pending -= 1
+                self.lock.notify_all()
+
+    def _cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    def submit(self, key, payload):
+        """분석 요청 (작업자가 없으면 바로 분석, 중지되어 포기하면 False)"""
+        if not self.threads:
+            try:
+                self.done.put((key, self._run(payload)))
+            except Exception:
+                self.done.put((key, ANALYSIS_ERROR))
+            return True
+        with self.lock:
+            self.pending += 1
+        while True:
+            try:
+                self.tasks.put((key, payload), timeout=0.01)
+                return True
+            except queue.Full:
+                if self._cancelled():
+                    with self.lock:
+                        self.pending -= 1
+                        self.lock.notify_all()
+                    return False
+
+    def results(self):
+        """지금까지 끝난 (key, 결과) 목록 (기다리지 않음)"""
+        items = []
+        while True:
+            try:
+                items.append(self.done.get_nowait())
+            except queue.Empty:
+                return items
+
+    def flush(self):
+        """넣은 요청이 모두 분석될 때까지 기다린 뒤 결과 반환 (중지 요청 시 즉시 반환)"""
+        with self.lock:
+            while self.pending and not self._cancelled():
+                self.lock.wait(0.01)
+        return self.results()
+
+    def close(self):
+        """작업자 종료 (아직 분석하지 않은 요청은 버림)"""
+        while True:
+            try:
+                self.tasks.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self.threads:
+            self.tasks.put(None)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,42 +1,73 @@
 import tkinter as tk
 from tkinter import font, messagebox
-import pyautogui
 import threading
-import time
-import keyboard
 import sys
 import ctypes
 import os
 import json
 import re
+import importlib.util
 from tkinter import ttk, scrolledtext
-# Windows API 관련 import (선택적)
-try:
-    import win32gui
-    import win32api
-    import win32con
-    WIN32_AVAILABLE = True
-except ImportError:
-    WIN32_AVAILABLE = False
-    # pywin32가 없어도 기본 기능은 작동하도록 함
+from poe_input import create_input_backend, InputFailSafe
+from poe_matcher import compile_matcher, compile_search
+import poe_path
+from poe_engine import RollEngine, AdaptivePacer, StatusChannel, MATCH_MAX_PASSES, MATCH_TIME_LIMIT
+import poe_trace
+import poe_window
+import poe_layout
+import poe_checkpoint
+import poe_craft
+import poe_config
+import poe_job
+from poe_timing import SYSTEM_CLOCK
+from poe_config import (CONFIG_FILE, REGEX_FILE, DEFAULT_INPUT_BACKEND, DEFAULT_CHAOS_ORB_POS_RATIO,
+                        DEFAULT_CHAOS_CELL_SIZE_RATIO, DEFAULT_GRID_LEFT_RATIO, DEFAULT_GRID_RIGHT_RATIO,
+                        DEFAULT_GRID_TOP_RATIO, DEFAULT_GRID_BOTTOM_RATIO)
+# 무거운 모듈(pyautogui, keyboard, numpy, pywin32, psutil)은 실제로 필요할 때 import
+# 시작 시에는 설치 여부만 확인 (pywin32가 없어도 기본 기능은 작동하도록 함)
+WIN32_AVAILABLE = importlib.util.find_spec('win32api') is not None
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+_win32_modules = None
+
+
+def load_win32():
+    """pywin32 모듈을 처음 필요할 때 import (win32gui, win32api, win32con)"""
+    global _win32_modules
+    if _win32_modules is None:
+        import win32gui
+        import win32api
+        import win32con
+        _win32_modules = (win32gui, win32api, win32con)
+    return _win32_modules
+
 
 # --- 기본 설정 ---
-# 상대 좌표로 변경 (화면 크기 대비 비율)
-DEFAULT_CHAOS_ORB_POS_RATIO = (0.675, 0.665)  # 화면 대비 비율
-DEFAULT_CHAOS_CELL_SIZE_RATIO = 0.0276  # 화면 너비 대비 비율
-GRID_ROWS = 12
-GRID_COLS = 12
-DEFAULT_GRID_LEFT_RATIO = 0.0078  # 화면 너비 대비
-DEFAULT_GRID_RIGHT_RATIO = 0.3396  # 화면 너비 대비
-DEFAULT_GRID_TOP_RATIO = 0.1157  # 화면 높이 대비
-DEFAULT_GRID_BOTTOM_RATIO = 0.7046  # 화면 높이 대비
+# 기본 좌표 비율과 설정 파일 이름은 poe_config에 (헤드리스 실행과 공유)
 STOP_KEY_1 = 'esc'
 STOP_KEY_2 = 'f10'
-CONFIG_FILE = 'poe_roller_config.json'
-REGEX_FILE = 'poe_regex_patterns.json'
+STATUS_POLL_MS = 66  # 작업 중 상태 표시 갱신 주기 (약 15Hz)
+DISPLAY_POLL_MS = 50  # 백그라운드 디스플레이 감지 완료 확인 주기
+QUIT_JOIN_TIMEOUT = 0.5  # 종료 시 작업 스레드가 끝나기를 기다리는 최대 시간 (초)
 VERSION = "v1.3"
 # -------------
 
+
+def estimate_layout(window):
+    """창(left/top/width/height) 크기 비율로 추정한 카오스 오브 칸과 그리드 경계"""
+    width, height = window['width'], window['height']
+    return {
+        'chaos_pos': (window['left'] + int(width * DEFAULT_CHAOS_ORB_POS_RATIO[0]),
+                      window['top'] + int(height * DEFAULT_CHAOS_ORB_POS_RATIO[1])),
+        'chaos_size': max(30, int(width * DEFAULT_CHAOS_CELL_SIZE_RATIO)),
+        'grid_bounds': {
+            'left': window['left'] + int(width * DEFAULT_GRID_LEFT_RATIO),
+            'right': window['left'] + int(width * DEFAULT_GRID_RIGHT_RATIO),
+            'top': window['top'] + int(height * DEFAULT_GRID_TOP_RATIO),
+            'bottom': window['top'] + int(height * DEFAULT_GRID_BOTTOM_RATIO)
+        }
+    }
+
+
 class MapRollerApp:
     def __init__(self, root):
         self.root = root
@@ -48,16 +79,36 @@ class MapRollerApp:
         self.chaos_cell_size = None
         self.grid_bounds = {}
         self.map_coords = []
+        self.map_cells = []  # map_coords와 같은 순서의 (row, col)
+        self.layouts = poe_layout.load_layouts()
+        self.layout_name = poe_layout.DEFAULT_LAYOUT  # 보관함 종류 (일반/쿼드/사용자 정의)
+        self.checkpoint = poe_checkpoint.load_checkpoint()  # 중단된 작업에서 끝난 칸 (이어하기용)
+        self.resume = False
+        self.match_max_passes = MATCH_MAX_PASSES  # 정규식 모드 최대 회차
+        self.match_time_limit = MATCH_TIME_LIMIT  # 정규식 모드 시간 제한 (초, 0이면 없음)
+        self.verify_clicks = False  # 칸마다 클릭 반영 여부 확인 후 누락된 칸만 재시도
+        self.craft_pipeline = poe_craft.DEFAULT_PIPELINE  # 적용할 커런시 순서
+        self.currency_slots = {}  # 카오스 오브 외 커런시 칸 중심 좌표 {이름: (x, y)}
         self.is_running = False
         self.automation_thread = None
         self.overlay_windows = []
-        self.shift_pressed = False
-        self.need_initial_shift = True
         self.setup_mode = False
         self.dragging = None  # 현재 드래그 중인 오버레이
         self.drag_mode = None  # 'move' or 'resize'
         self.drag_start = None
         self.regex_patterns = {}  # 저장된 정규식 패턴들
+        self.active_regex_titles = set()  # 롤링 중지 조건으로 사용할 정규식 제목
+        self.input_backend_name = DEFAULT_INPUT_BACKEND
+        self.path_method = poe_path.DEFAULT_PATH_METHOD
+        self.pacer = AdaptivePacer()  # 자동 속도 조절 상태 (실행 간 유지)
+        self.window_tracker = None  # PoE 창 캐시 및 이동/크기 변경 감시
+        self.window_baseline = None  # 창 변경 시 좌표를 다시 계산할 기준 창과 그때 좌표
+        self.pending_window = None  # 작업 중에 들어온 창 변경 (작업이 끝나면 적용)
+        self.capture = None  # 그리드/커런시 칸 화면 캡처 (첫 사용 시 생성)
+        self.cell_cache = None  # 칸 화면 해시별 지난 판정 (정규식/클릭 확인 모드, 실행 간 유지)
+        self.trace_enabled = True  # 칸별 단계 시간 기록 (poe_roller_trace.json으로 저장)
+        self.history_enabled = True  # 작업마다 결과를 poe_roller_history.sqlite3에 추가
+        self.history = None  # 작업 기록 스레드 (첫 작업 시 생성)
         
         # 설정 로드
         self.load_config()
@@ -70,64 +121,119 @@ class MapRollerApp:
         self.setup_ui()
         
         self.generate_coordinates()
-        self.setup_hotkeys()
+        # 단축키 등록은 창이 뜬 뒤에 (keyboard import가 느림)
+        self.root.after(0, self.setup_hotkeys)
+        self.root.after(DISPLAY_POLL_MS, self.poll_display_info)
 
-        # pyautogui 설정
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0.0
+        # 입력 백엔드 및 롤링 엔진은 첫 작업 시작 시 생성 (get_engine)
+        self.input = None
+        self.engine = None
+        self.tracer = poe_trace.Tracer() if self.trace_enabled else poe_trace.NullTracer()
+        self.clock = SYSTEM_CLOCK  # 작업 경로의 모든 시각/대기가 사용하는 시계
+        self.status_channel = StatusChannel(self.clock)
         
         # 종료 시 Shift 키 해제를 위한 이벤트 바인딩
         self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
     
     def detect_display_info(self):
-        """디스플레이 정보 감지"""
+        """디스플레이 정보 감지 (화면 크기는 바로 구하고 DPI/멀티 모니터 정보는 백그라운드에서 감지)"""
+        if sys.platform == 'win32':
+            try:
+                # Windows 10+ DPI 인식
+                ctypes.windll.shcore.SetProcessDpiAwareness(1)
+            except:
+                pass
+        
         try:
-            if WIN32_AVAILABLE:
-                # 주 모니터 정보
-                self.screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-                self.screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-                
-                # DPI 감지
-                try:
-                    # Windows 10+ DPI 인식
-                    ctypes.windll.shcore.SetProcessDpiAwareness(1)
-                    hdc = win32gui.GetDC(0)
-                    self.dpi_x = win32api.GetDeviceCaps(hdc, win32con.LOGPIXELSX)
-                    self.dpi_y = win32api.GetDeviceCaps(hdc, win32con.LOGPIXELSY)
-                    win32gui.ReleaseDC(0, hdc)
-                except:
-                    self.dpi_x = self.dpi_y = 96  # 기본 DPI
-                
-                # DPI 스케일링 팩터
-                self.dpi_scale_x = self.dpi_x / 96.0
-                self.dpi_scale_y = self.dpi_y / 96.0
-                
-                # 가상 화면 크기 (멀티 모니터)
-                self.virtual_screen_width = win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN)
-                self.virtual_screen_height = win32api.GetSystemMetrics(win32con.SM_CYVIRTUALSCREEN)
-                self.virtual_screen_left = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN)
-                self.virtual_screen_top = win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN)
-            else:
-                # pywin32가 없는 경우 tkinter로 화면 정보 가져오기
-                self.screen_width = self.root.winfo_screenwidth()
-                self.screen_height = self.root.winfo_screenheight()
-                self.dpi_x = self.dpi_y = 96
-                self.dpi_scale_x = self.dpi_scale_y = 1.0
-                self.virtual_screen_width = self.screen_width
-                self.virtual_screen_height = self.screen_height
-                self.virtual_screen_left = 0
-                self.virtual_screen_top = 0
-            
-        except Exception as e:
+            self.screen_width = self.root.winfo_screenwidth()
+            self.screen_height = self.root.winfo_screenheight()
+        except:
             # 기본값으로 폴백
             self.screen_width = 1920
             self.screen_height = 1080
-            self.dpi_x = self.dpi_y = 96
-            self.dpi_scale_x = self.dpi_scale_y = 1.0
-            self.virtual_screen_width = self.screen_width
-            self.virtual_screen_height = self.screen_height
-            self.virtual_screen_left = 0
-            self.virtual_screen_top = 0
+        self.dpi_x = self.dpi_y = 96
+        self.dpi_scale_x = self.dpi_scale_y = 1.0
+        self.virtual_screen_width = self.screen_width
+        self.virtual_screen_height = self.screen_height
+        self.virtual_screen_left = 0
+        self.virtual_screen_top = 0
+        
+        self.display_info = None
+        if WIN32_AVAILABLE:
+            threading.Thread(target=self.detect_display_details, daemon=True).start()
+        else:
+            self.display_info = {}
+    
+    def detect_display_details(self):
+        """pywin32로 실제 해상도, DPI, 가상 화면 크기 감지 (백그라운드 스레드, Tk 호출 없음)"""
+        info = {}
+        try:
+            win32gui, win32api, win32con = load_win32()
+            # 주 모니터 정보
+            info['screen_width'] = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
+            info['screen_height'] = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+            
+            # DPI 감지
+            try:
+                hdc = win32gui.GetDC(0)
+                info['dpi_x'] = win32api.GetDeviceCaps(hdc, win32con.LOGPIXELSX)
+                info['dpi_y'] = win32api.GetDeviceCaps(hdc, win32con.LOGPIXELSY)
+                win32gui.ReleaseDC(0, hdc)
+            except:
+                info['dpi_x'] = info['dpi_y'] = 96  # 기본 DPI
+            
+            # DPI 스케일링 팩터
+            info['dpi_scale_x'] = info['dpi_x'] / 96.0
+            info['dpi_scale_y'] = info['dpi_y'] / 96.0
+            
+            # 가상 화면 크기 (멀티 모니터)
+            info['virtual_screen_width'] = win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN)
+            info['virtual_screen_height'] = win32api.GetSystemMetrics(win32con.SM_CYVIRTUALSCREEN)
+            info['virtual_screen_left'] = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN)
+            info['virtual_screen_top'] = win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN)
+        except:
+            info = {}
+        self.display_info = info
+    
+    def poll_display_info(self):
+        """백그라운드 디스플레이 감지 결과 적용 (해상도가 다르면 좌표와 창 위치 다시 계산)"""
+        info = self.display_info
+        if info is None:
+            self.root.after(DISPLAY_POLL_MS, self.poll_display_info)
+            return
+        resized = (info.get('screen_width', self.screen_width), info.get('screen_height', self.screen_height)) != \
+            (self.screen_width, self.screen_height)
+        for key, value in info.items():
+            setattr(self, key, value)
+        # 화면 정보 표시줄은 감지 전 기본값(96 DPI)으로 만들어졌으므로 갱신
+        self.screen_info_label.config(text=self.screen_info_text())
+        if resized and not self.setup_mode:
+            self.load_config()
+            self.generate_coordinates()
+            self.place_window()
+    
+    def screen_info_text(self):
+        """화면 정보 표시줄 문구"""
+        return f"해상도: {self.screen_width}x{self.screen_height} | DPI: {self.dpi_x}x{self.dpi_y}"
+
+    def get_engine(self):
+        """입력 백엔드와 롤링 엔진을 첫 작업 시작 시 생성 (pyautogui 등은 이때 import)"""
+        if self.engine is None:
+            self.input = self.create_input()
+            self.engine = RollEngine(
+                self.input,
+                channel=self.status_channel,
+                tracer=self.tracer,
+                clock=self.clock
+            )
+        return self.engine
+    
+    def create_input(self):
+        """입력 백엔드 생성 (실패 시 pyautogui로 폴백)"""
+        try:
+            return create_input_backend(self.input_backend_name)
+        except Exception:
+            return create_input_backend('pyautogui')
     
     def ratio_to_absolute(self, x_ratio, y_ratio):
         """비율 좌표를 절대 좌표로 변환 (DPI 스케일링 고려)"""
@@ -163,6 +269,8 @@ class MapRollerApp:
                     'bottom': self.screen_height
                 }
             
+            win32gui, win32api, _ = load_win32()
+            
             # 마우스 커서 위치 가져오기
             cursor_pos = win32gui.GetCursorPos()
             
@@ -210,136 +318,64 @@ class MapRollerApp:
             }
     
     def get_poe_window_info(self):
-        """Path of Exile 창 정보 가져오기"""
+        """Path of Exile 창 정보 가져오기 (찾았던 창은 기억해 두고 재사용)"""
         try:
             if not WIN32_AVAILABLE:
                 return None
-            
-            try:
-                import psutil
-                PSUTIL_AVAILABLE = True
-            except ImportError:
-                PSUTIL_AVAILABLE = False
-            
-            poe_hwnd = None
-            
-            # 1. 실행중인 프로세스에서 PoE 찾기 (psutil 사용 가능한 경우)
-            if PSUTIL_AVAILABLE:
-                poe_processes = [
-                    "PathOfExile_KG.exe",
-                    "PathOfExile.exe", 
-                    "PathOfExile_x64.exe",
-                    "PathOfExile_x64Steam.exe",
-                    "PathOfExile64.exe",
-                    "PoE.exe"
-                ]
-                
-                for proc in psutil.process_iter(['pid', 'name']):
-                    try:
-                        if proc.info['name'] in poe_processes:
-                            # 프로세스가 있으면 해당 프로세스의 창 찾기
-                            def enum_windows_callback(hwnd, windows):
-                                if win32gui.IsWindowVisible(hwnd):
-                                    _, found_pid = win32gui.GetWindowThreadProcessId(hwnd)
-                                    if found_pid == proc.info['pid']:
-                                        # 메인 창인지 확인 (제목이 있고 크기가 적당한)
-                                        title = win32gui.GetWindowText(hwnd)
-                                        rect = win32gui.GetWindowRect(hwnd)
-                                        width = rect[2] - rect[0]
-                                        height = rect[3] - rect[1]
-                                        if width > 300 and height > 200:  # 최소 크기 체크
-                                            windows.append(hwnd)
-                                return True
-                            
-                            windows = []
-                            win32gui.EnumWindows(enum_windows_callback, windows)
-                            if windows:
-                                poe_hwnd = windows[0]  # 첫 번째 유효한 창 선택
-                                break
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
-            
-            # 2. 프로세스로 못 찾았으면 창 제목으로 찾기
-            if not poe_hwnd:
-                poe_titles = [
-                    "Path of Exile",
-                    "Path of Exile 2",
-                    "PoE",
-                    "PathOfExile"
-                ]
-                
-                for title in poe_titles:
-                    poe_hwnd = win32gui.FindWindow(None, title)
-                    if poe_hwnd:
-                        break
-            
-            # 3. 부분 제목 매칭으로 찾기
-            if not poe_hwnd:
-                def enum_windows_callback(hwnd, windows):
-                    if win32gui.IsWindowVisible(hwnd):
-                        title = win32gui.GetWindowText(hwnd).lower()
-                        if any(keyword in title for keyword in ["path of exile", "poe", "pathofexile"]):
-                            rect = win32gui.GetWindowRect(hwnd)
-                            width = rect[2] - rect[0]
-                            height = rect[3] - rect[1]
-                            if width > 300 and height > 200:
-                                windows.append(hwnd)
-                    return True
-                
-                windows = []
-                win32gui.EnumWindows(enum_windows_callback, windows)
-                if windows:
-                    poe_hwnd = windows[0]
-            
-            if not poe_hwnd:
-                return None
-            
-            # 창 위치와 크기 가져오기
-            rect = win32gui.GetWindowRect(poe_hwnd)
-            title = win32gui.GetWindowText(poe_hwnd)
-            
-            return {
-                'hwnd': poe_hwnd,
-                'title': title,
-                'left': rect[0],
-                'top': rect[1],
-                'right': rect[2],
-                'bottom': rect[3],
-                'width': rect[2] - rect[0],
-                'height': rect[3] - rect[1]
-            }
-        except Exception as e:
-            # psutil이 없으면 기존 방식으로 폴백
-            try:
-                poe_titles = [
-                    "Path of Exile",
-                    "Path of Exile 2", 
-                    "PoE",
-                    "PathOfExile"
-                ]
-                
-                poe_hwnd = None
-                for title in poe_titles:
-                    poe_hwnd = win32gui.FindWindow(None, title)
-                    if poe_hwnd:
-                        break
-                
-                if not poe_hwnd:
-                    return None
-                
-                rect = win32gui.GetWindowRect(poe_hwnd)
-                return {
-                    'hwnd': poe_hwnd,
-                    'title': win32gui.GetWindowText(poe_hwnd),
-                    'left': rect[0],
-                    'top': rect[1],
-                    'right': rect[2],
-                    'bottom': rect[3],
-                    'width': rect[2] - rect[0],
-                    'height': rect[3] - rect[1]
-                }
-            except:
-                return None
+            if self.window_tracker is None:
+                self.window_tracker = poe_window.WindowTracker(poe_window.Win32WindowProvider())
+            return self.window_tracker.find()
+        except:
+            return None
+
+    def on_poe_window_changed(self, old_info, new_info):
+        """감시 스레드에서 창 이동/크기 변경을 받아 Tk 스레드로 전달"""
+        self.root.after(0, self.apply_window_change, old_info, new_info)
+
+    def window_state(self):
+        """창에 따라 옮기는 좌표들 (카오스 오브, 커런시 칸, 그리드, 칸 크기)"""
+        return (self.chaos_pos_center, dict(self.currency_slots), dict(self.grid_bounds), self.chaos_cell_size)
+
+    def apply_window_change(self, old_info, new_info):
+        """게임 창이 움직이거나 크기가 바뀌면 카오스 오브/그리드 좌표를 따라 옮김
+
+        좌표는 매번 기준 창(좌표를 설정했던 창)에서 새로 계산하므로 여러 번 바뀌어도 오차가 쌓이지 않는다.
+        작업 중에는 좌표를 바꾸지 않고 끝난 뒤 마지막 창 상태로 한 번 맞춘다.
+        """
+        if self.setup_mode or not self.chaos_pos_center or not poe_window.usable_window(new_info):
+            return
+        if self.is_running or (self.automation_thread is not None and self.status_channel.finished is None):
+            self.pending_window = (self.pending_window[0] if self.pending_window else old_info, new_info)
+            return
+
+        baseline = self.window_baseline
+        if baseline is None or baseline['applied'] != self.window_state():
+            # 처음이거나 좌표를 다시 설정했으면 지금 좌표와 직전 창을 기준으로 삼음
+            baseline = self.window_baseline = {'window': old_info, 'state': self.window_state(), 'last': old_info}
+        base = baseline['window']
+        chaos_pos, slots, grid, size = baseline['state']
+        last = baseline['last']
+
+        self.chaos_pos_center = poe_window.translate_point(chaos_pos, base, new_info)
+        self.currency_slots = {name: poe_window.translate_point(pos, base, new_info) for name, pos in slots.items()}
+        left, top = poe_window.translate_point((grid['left'], grid['top']), base, new_info)
+        right, bottom = poe_window.translate_point((grid['right'], grid['bottom']), base, new_info)
+        self.grid_bounds = {'left': left, 'right': right, 'top': top, 'bottom': bottom}
+        
+        if (last['width'], last['height']) == (new_info['width'], new_info['height']):
+            # 이동만 했으면 좌표를 다시 계산하지 않고 평행 이동
+            dx = new_info['left'] - last['left']
+            dy = new_info['top'] - last['top']
+            self.map_coords = self.map_coords.translated(dx, dy)
+        else:
+            self.chaos_cell_size = max(30, round(size * new_info['width'] / base['width']))
+            self.generate_coordinates()
+        baseline['applied'] = self.window_state()
+        baseline['last'] = new_info
+        
+        self.save_config()
+        if not self.is_running:
+            self.status_var.set(f"게임 창 변경 감지: 좌표를 {new_info['width']}x{new_info['height']} 창에 맞춤")
 
     def save_config(self):
         """현재 설정을 파일로 저장"""
@@ -370,7 +406,19 @@ class MapRollerApp:
             # 하위 호환성을 위한 기존 포맷도 유지
             'chaos_pos': self.chaos_pos_center,
             'chaos_size': self.chaos_cell_size,
-            'grid_bounds': self.grid_bounds
+            'grid_bounds': self.grid_bounds,
+            'input_backend': self.input_backend_name,
+            'active_regex': sorted(self.active_regex_titles),
+            'path_method': self.path_method,
+            'stash_layout': self.layout_name,
+            'match_max_passes': self.match_max_passes,
+            'match_time_limit': self.match_time_limit,
+            'verify_clicks': self.verify_clicks,
+            'craft_pipeline': self.craft_pipeline,
+            'currency_slot_ratios': {name: self.absolute_to_ratio(*pos) for name, pos in self.currency_slots.items()},
+            'adaptive_delays': list(self.pacer.delays()),
+            'trace_enabled': self.trace_enabled,
+            'history_enabled': self.history_enabled
         }
         try:
             with open(CONFIG_FILE, 'w') as f:
@@ -379,98 +427,28 @@ class MapRollerApp:
             pass
 
     def load_config(self):
-        """저장된 설정 로드"""
-        try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
-                    
-                # 새로운 비율 기반 설정이 있는지 확인
-                if 'chaos_pos_ratio' in config and config['chaos_pos_ratio']:
-                    # 비율 기반 설정 로드
-                    chaos_pos_ratio = config['chaos_pos_ratio']
-                    self.chaos_pos_center = self.ratio_to_absolute(chaos_pos_ratio[0], chaos_pos_ratio[1])
-                    
-                    if 'chaos_size_ratio' in config and config['chaos_size_ratio']:
-                        self.chaos_cell_size = self.size_ratio_to_absolute(config['chaos_size_ratio'])
-                    else:
-                        self.chaos_cell_size = self.size_ratio_to_absolute(DEFAULT_CHAOS_CELL_SIZE_RATIO)
-                    
-                    if 'grid_bounds_ratio' in config and config['grid_bounds_ratio']:
-                        ratio_bounds = config['grid_bounds_ratio']
-                        self.grid_bounds = {
-                            'left': int(ratio_bounds['left_ratio'] * self.screen_width),
-                            'right': int(ratio_bounds['right_ratio'] * self.screen_width),
-                            'top': int(ratio_bounds['top_ratio'] * self.screen_height),
-                            'bottom': int(ratio_bounds['bottom_ratio'] * self.screen_height)
-                        }
-                    else:
-                        self.grid_bounds = self.get_default_grid_bounds()
-                        
-                else:
-                    # 기존 절대 좌표 설정이 있다면 로드하되, 현재 해상도에 맞게 스케일링
-                    old_chaos_pos = config.get('chaos_pos')
-                    old_chaos_size = config.get('chaos_size')
-                    old_grid_bounds = config.get('grid_bounds')
-                    old_resolution = config.get('screen_resolution', [1920, 1080])
-                    
-                    if old_chaos_pos and old_resolution:
-                        # 이전 해상도 대비 현재 해상도로 스케일링
-                        scale_x = self.screen_width / old_resolution[0]
-                        scale_y = self.screen_height / old_resolution[1]
-                        
-                        self.chaos_pos_center = (
-                            int(old_chaos_pos[0] * scale_x),
-                            int(old_chaos_pos[1] * scale_y)
-                        )
-                        
-                        if old_chaos_size:
-                            self.chaos_cell_size = int(old_chaos_size * scale_x)
-                        else:
-                            self.chaos_cell_size = self.size_ratio_to_absolute(DEFAULT_CHAOS_CELL_SIZE_RATIO)
-                        
-                        if old_grid_bounds:
-                            self.grid_bounds = {
-                                'left': int(old_grid_bounds['left'] * scale_x),
-                                'right': int(old_grid_bounds['right'] * scale_x),
-                                'top': int(old_grid_bounds['top'] * scale_y),
-                                'bottom': int(old_grid_bounds['bottom'] * scale_y)
-                            }
-                        else:
-                            self.grid_bounds = self.get_default_grid_bounds()
-                    else:
-                        # 기본값 사용
-                        self.load_default_config()
-            else:
-                # 설정 파일이 없으면 기본값 사용
-                self.load_default_config()
-        except:
-            # 오류 발생 시 기본값 사용
-            self.load_default_config()
-    
-    def load_default_config(self):
-        """기본 설정 로드"""
-        self.chaos_pos_center = self.ratio_to_absolute(*DEFAULT_CHAOS_ORB_POS_RATIO)
-        self.chaos_cell_size = self.size_ratio_to_absolute(DEFAULT_CHAOS_CELL_SIZE_RATIO)
-        self.grid_bounds = self.get_default_grid_bounds()
-    
-    def get_default_grid_bounds(self):
-        """기본 그리드 경계 계산"""
-        return {
-            'left': int(DEFAULT_GRID_LEFT_RATIO * self.screen_width),
-            'right': int(DEFAULT_GRID_RIGHT_RATIO * self.screen_width),
-            'top': int(DEFAULT_GRID_TOP_RATIO * self.screen_height),
-            'bottom': int(DEFAULT_GRID_BOTTOM_RATIO * self.screen_height)
-        }
+        """저장된 설정 로드 (좌표는 현재 해상도 기준으로 변환)"""
+        config = poe_config.read_config(self.screen_width, self.screen_height)
+        self.input_backend_name = config['input_backend']
+        self.active_regex_titles = set(config['active_regex'])
+        self.path_method = config['path_method']
+        self.layout_name = config['stash_layout']
+        self.match_max_passes = config['match_max_passes']
+        self.match_time_limit = config['match_time_limit']
+        self.verify_clicks = config['verify_clicks']
+        self.craft_pipeline = config['craft_pipeline']
+        self.currency_slots = config['currency_slots']
+        self.trace_enabled = config['trace_enabled']
+        self.history_enabled = config['history_enabled']
+        if config['adaptive_delays']:
+            self.pacer = AdaptivePacer(start=config['adaptive_delays'])
+        self.chaos_pos_center = config['chaos_pos']
+        self.chaos_cell_size = config['chaos_size']
+        self.grid_bounds = config['grid_bounds']
 
     def load_regex_patterns(self):
         """저장된 정규식 패턴 로드"""
-        try:
-            if os.path.exists(REGEX_FILE):
-                with open(REGEX_FILE, 'r', encoding='utf-8') as f:
-                    self.regex_patterns = json.load(f)
-        except:
-            self.regex_patterns = {}
+        self.regex_patterns = poe_config.read_regex_patterns()
 
     def save_regex_patterns(self):
         """정규식 패턴 저장"""
@@ -514,9 +492,9 @@ class MapRollerApp:
                 messagebox.showwarning("경고", "정규식을 입력하세요")
                 return
                 
-            # 정규식 유효성 검사
+            # 검색어(따옴표/! 조건)별 정규식 유효성 검사
             try:
-                re.compile(pattern)
+                compile_search(pattern)
             except re.error as e:
                 messagebox.showerror("오류", f"잘못된 정규식: {str(e)}")
                 return
@@ -554,15 +532,19 @@ class MapRollerApp:
         bottom_frame = tk.Frame(regex_window)
         bottom_frame.pack(fill="x", padx=10, pady=10)
         
+        titles = []
+        
         def update_listbox():
             listbox.delete(0, tk.END)
-            for title in sorted(self.regex_patterns.keys()):
-                listbox.insert(tk.END, title)
+            titles[:] = sorted(self.regex_patterns.keys())
+            for title in titles:
+                mark = "[사용] " if title in self.active_regex_titles else ""
+                listbox.insert(tk.END, f"{mark}{title}")
         
         def on_select(event):
             selection = listbox.curselection()
             if selection:
-                title = listbox.get(selection[0])
+                title = titles[selection[0]]
                 pattern = self.regex_patterns.get(title, "")
                 selected_text.delete("1.0", tk.END)
                 selected_text.insert("1.0", pattern)
@@ -577,9 +559,10 @@ class MapRollerApp:
         def delete_regex():
             selection = listbox.curselection()
             if selection:
-                title = listbox.get(selection[0])
+                title = titles[selection[0]]
                 if messagebox.askyesno("삭제 확인", f"'{title}' 정규식을 삭제하시겠습니까?"):
                     del self.regex_patterns[title]
+                    self.active_regex_titles.discard(title)
                     self.save_regex_patterns()
                     update_listbox()
                     selected_text.delete("1.0", tk.END)
@@ -587,14 +570,27 @@ class MapRollerApp:
         def load_to_edit():
             selection = listbox.curselection()
             if selection:
-                title = listbox.get(selection[0])
+                title = titles[selection[0]]
                 pattern = self.regex_patterns.get(title, "")
                 title_entry.delete(0, tk.END)
                 title_entry.insert(0, title)
                 regex_text.delete("1.0", tk.END)
                 regex_text.insert("1.0", pattern)
         
+        def toggle_active():
+            selection = listbox.curselection()
+            if selection:
+                title = titles[selection[0]]
+                if title in self.active_regex_titles:
+                    self.active_regex_titles.discard(title)
+                else:
+                    self.active_regex_titles.add(title)
+                self.save_config()
+                update_listbox()
+                listbox.selection_set(selection[0])
+        
         tk.Button(bottom_frame, text="복사", command=copy_regex, width=10).pack(side=tk.LEFT, padx=5)
+        tk.Button(bottom_frame, text="롤링 사용", command=toggle_active, width=10).pack(side=tk.LEFT, padx=5)
         tk.Button(bottom_frame, text="수정하기", command=load_to_edit, width=10).pack(side=tk.LEFT, padx=5)
         tk.Button(bottom_frame, text="삭제", command=delete_regex, width=10).pack(side=tk.LEFT, padx=5)
         tk.Button(bottom_frame, text="닫기", command=regex_window.destroy, width=10).pack(side=tk.RIGHT, padx=5)
@@ -602,6 +598,12 @@ class MapRollerApp:
         listbox.bind('<<ListboxSelect>>', on_select)
         update_listbox()
 
+    def get_active_matcher(self):
+        """롤링에 사용하도록 선택된 정규식들을 하나의 매처로 컴파일"""
+        patterns = [self.regex_patterns[title] for title in sorted(self.active_regex_titles)
+                    if title in self.regex_patterns]
+        return compile_matcher(patterns)
+
     def hide_console(self):
         """콘솔 창 숨기기"""
         if sys.platform == 'win32':
@@ -609,21 +611,26 @@ class MapRollerApp:
             if console_window:
                 ctypes.windll.user32.ShowWindow(console_window, 0)
 
-    def setup_ui(self):
-        self.root.title(f"PoE 자동 롤러 - {VERSION}")
-        self.root.attributes('-alpha', 0.9)
-        self.root.attributes('-topmost', True)
-        self.root.overrideredirect(True)
-        self.root.config(bg='black')
-
+    def place_window(self):
+        """화면 크기에 맞춰 창 크기와 위치 설정 (창 너비 반환)"""
         # 화면 크기에 비례한 창 크기 계산
         window_width = min(580, int(self.screen_width * 0.3))
-        window_height = min(280, int(self.screen_height * 0.26))
+        window_height = min(335, int(self.screen_height * 0.31))
         
         # 창 위치를 화면 우상단에 배치
         x_coordinate = self.screen_width - window_width - 30
         y_coordinate = 30
         self.root.geometry(f"{window_width}x{window_height}+{x_coordinate}+{y_coordinate}")
+        return window_width
+
+    def setup_ui(self):
+        self.root.title(f"PoE 자동 롤러 - {VERSION}")
+        self.root.attributes('-alpha', 0.9)
+        self.root.attributes('-topmost', True)
+        self.root.overrideredirect(True)
+        self.root.config(bg='black')
+
+        window_width = self.place_window()
 
         # 상태 표시
         self.status_var = tk.StringVar()
@@ -633,9 +640,8 @@ class MapRollerApp:
         
         # 화면 정보 표시
         info_font = font.Font(family="Malgun Gothic", size=8)
-        screen_info = f"해상도: {self.screen_width}x{self.screen_height} | DPI: {self.dpi_x}x{self.dpi_y}"
-        info_label = tk.Label(self.root, text=screen_info, fg="gray", bg="black", font=info_font)
-        info_label.pack(pady=1)
+        self.screen_info_label = tk.Label(self.root, text=self.screen_info_text(), fg="gray", bg="black", font=info_font)
+        self.screen_info_label.pack(pady=1)
         
         # 위치 설정 안내
         setup_font = font.Font(family="Malgun Gothic", size=9)
@@ -657,6 +663,51 @@ class MapRollerApp:
         tk.Radiobutton(speed_frame, text="보통", variable=self.speed_var, value="normal", fg="white", bg="black", selectcolor="black", font=hotkey_font).pack(side=tk.LEFT, expand=True)
         tk.Radiobutton(speed_frame, text="빠르게", variable=self.speed_var, value="fast", fg="white", bg="black", selectcolor="black", font=hotkey_font).pack(side=tk.LEFT, expand=True)
         tk.Radiobutton(speed_frame, text="극한 속도", variable=self.speed_var, value="max", fg="white", bg="black", selectcolor="black", font=hotkey_font).pack(side=tk.LEFT, expand=True)
+        adaptive_radio = tk.Radiobutton(speed_frame, text="자동", variable=self.speed_var, value="adaptive", fg="white", bg="black", selectcolor="black", font=hotkey_font)
+        if sys.platform != 'win32':
+            adaptive_radio.config(state=tk.DISABLED)
+        adaptive_radio.pack(side=tk.LEFT, expand=True)
+
+        # 옵션
+        option_frame = tk.Frame(self.root, bg="black")
+        option_frame.pack(padx=10, fill="x")
+        
+        self.skip_empty_var = tk.BooleanVar(value=NUMPY_AVAILABLE)
+        skip_empty_check = tk.Checkbutton(option_frame, text="빈 칸 건너뛰기", variable=self.skip_empty_var, fg="white", bg="black", selectcolor="black", font=setup_font)
+        if not NUMPY_AVAILABLE:
+            skip_empty_check.config(state=tk.DISABLED)
+        skip_empty_check.pack(side=tk.LEFT, expand=True)
+        
+        self.match_stop_var = tk.BooleanVar(value=False)
+        match_stop_check = tk.Checkbutton(option_frame, text="정규식 일치 시 중지", variable=self.match_stop_var, fg="white", bg="black", selectcolor="black", font=setup_font)
+        if sys.platform != 'win32':
+            match_stop_check.config(state=tk.DISABLED)
+        match_stop_check.pack(side=tk.LEFT, expand=True)
+        
+        self.verify_var = tk.BooleanVar(value=self.verify_clicks)
+        verify_check = tk.Checkbutton(option_frame, text="클릭 확인", variable=self.verify_var, fg="white", bg="black", selectcolor="black", font=setup_font)
+        if sys.platform != 'win32':
+            verify_check.config(state=tk.DISABLED)
+        verify_check.pack(side=tk.LEFT, expand=True)
+        
+        option_frame2 = tk.Frame(self.root, bg="black")
+        option_frame2.pack(padx=10, fill="x")
+        
+        self.resume_var = tk.BooleanVar(value=self.checkpoint is not None)
+        self.resume_check = tk.Checkbutton(option_frame2, text="이어하기", variable=self.resume_var, fg="white", bg="black", selectcolor="black", font=setup_font)
+        self.resume_check.pack(side=tk.LEFT, expand=True)
+        
+        self.layout_var = tk.StringVar(value=self.current_layout().label)
+        layout_labels = [layout.label for layout in self.layouts.values()]
+        layout_menu = tk.OptionMenu(option_frame2, self.layout_var, *layout_labels, command=self.change_layout)
+        layout_menu.config(fg="white", bg="black", activebackground="gray20", highlightthickness=0, font=setup_font)
+        layout_menu.pack(side=tk.LEFT, expand=True)
+        
+        self.craft_var = tk.StringVar(value=poe_craft.pipeline_label(self.craft_pipeline))
+        craft_labels = [poe_craft.pipeline_label(name) for name in poe_craft.CRAFT_PIPELINES]
+        craft_menu = tk.OptionMenu(option_frame2, self.craft_var, *craft_labels, command=self.change_craft_pipeline)
+        craft_menu.config(fg="white", bg="black", activebackground="gray20", highlightthickness=0, font=setup_font)
+        craft_menu.pack(side=tk.LEFT, expand=True)
 
         # 버튼 프레임
         button_frame = tk.Frame(self.root, bg="black")
@@ -693,25 +744,14 @@ class MapRollerApp:
                     "게임이 실행중인지 확인하고 다시 시도해주세요.")
                 return
             
-            # PoE 창 크기에 맞춰 기본 설정 계산
             poe_width = poe_info['width']
             poe_height = poe_info['height']
             
-            # 상대적 위치로 카오스 오브와 인벤토리 위치 추정
-            chaos_x = poe_info['left'] + int(poe_width * 0.675)
-            chaos_y = poe_info['top'] + int(poe_height * 0.665)
-            self.chaos_pos_center = (chaos_x, chaos_y)
-            
-            # 셀 크기도 창 크기에 비례하여 설정
-            self.chaos_cell_size = max(30, int(poe_width * 0.0276))
-            
-            # 그리드 경계 설정
-            self.grid_bounds = {
-                'left': poe_info['left'] + int(poe_width * 0.0078),
-                'right': poe_info['left'] + int(poe_width * 0.3396),
-                'top': poe_info['top'] + int(poe_height * 0.1157),
-                'bottom': poe_info['top'] + int(poe_height * 0.7046)
-            }
+            # 저장된 보정 결과 > 화면 템플릿 매칭 > 창 비율 추정 순으로 위치 결정
+            found, method = self.calibrate_layout(poe_info)
+            self.chaos_pos_center = found['chaos_pos']
+            self.chaos_cell_size = found['chaos_size']
+            self.grid_bounds = found['grid_bounds']
             
             # 좌표 재생성
             self.generate_coordinates()
@@ -719,11 +759,15 @@ class MapRollerApp:
             # 설정 저장
             self.save_config()
             
+            # 이후 창 이동/크기 변경 시 좌표 자동 갱신
+            self.window_tracker.start_watch(self.on_poe_window_changed)
+            
             window_title = poe_info.get('title', '알 수 없음')
             messagebox.showinfo("자동 감지 완료", 
                 f"Path of Exile 창을 감지하여 설정을 완료했습니다.\n"
                 f"감지된 창: {window_title}\n"
                 f"창 크기: {poe_width}x{poe_height}\n"
+                f"위치 결정: {method}\n"
                 f"좌표 개수: {len(self.map_coords)}개")
             
             self.status_var.set(f"자동 감지 완료! 좌표 {len(self.map_coords)}개 생성됨")
@@ -731,6 +775,75 @@ class MapRollerApp:
         except Exception as e:
             messagebox.showerror("오류", f"자동 감지 중 오류가 발생했습니다: {str(e)}")
 
+    def calibrate_layout(self, poe_info):
+        """PoE 창의 카오스 오브 칸/그리드 위치 ((결과, 방법 설명) 반환)"""
+        estimate = estimate_layout(poe_info)
+        if not NUMPY_AVAILABLE:
+            return estimate, "창 비율 추정"
+        import poe_calibrate
+        cache = poe_calibrate.CalibrationCache()
+        cached = cache.lookup(poe_info, self.layout_name)
+        if cached:
+            return cached, "저장된 보정 결과"
+        try:
+            import poe_capture
+            bounds = {'left': poe_info['left'], 'top': poe_info['top'],
+                      'right': poe_info['left'] + poe_info['width'], 'bottom': poe_info['top'] + poe_info['height']}
+            region = poe_capture.RegionCapture(self.get_capture().provider, bounds, ring_size=1)
+            try:
+                image = region.grab().image
+                layout = self.current_layout()
+                # 보정은 창 이미지 기준 좌표로 하고 결과를 화면 좌표로 되돌림
+                x, y = poe_info['left'], poe_info['top']
+                local = {
+                    'chaos_pos': (estimate['chaos_pos'][0] - x, estimate['chaos_pos'][1] - y),
+                    'chaos_size': estimate['chaos_size'],
+                    'grid_bounds': {key: value - (x if key in ('left', 'right') else y)
+                                    for key, value in estimate['grid_bounds'].items()},
+                }
+                # 슬롯형 보관함은 격자선이 없으므로 그리드 검출 생략
+                rows, cols = (layout.rows, layout.cols) if layout.kind == 'grid' else (None, None)
+                found = poe_calibrate.calibrate(image, poe_calibrate.load_template(), local, rows, cols, order='BGRA')
+            finally:
+                region.close()
+        except Exception:
+            return estimate, "창 비율 추정 (화면 캡처 실패)"
+        result = {
+            'chaos_pos': (found['chaos_pos'][0] + x, found['chaos_pos'][1] + y),
+            'chaos_size': found['chaos_size'],
+            'grid_bounds': {key: value + (x if key in ('left', 'right') else y)
+                            for key, value in found['grid_bounds'].items()},
+            'score': found['score'],
+        }
+        if found['score'] is None:
+            if found['grid_found']:
+                return result, "그리드 격자선 검출 (카오스 오브는 창 비율 추정)"
+            return result, "창 비율 추정"
+        cache.store(poe_info, self.layout_name, result)
+        if rows and not found['grid_found']:
+            return result, f"템플릿 매칭 (일치도 {found['score']:.2f}, 그리드는 창 비율 추정)"
+        return result, f"템플릿 매칭 (일치도 {found['score']:.2f})"
+
+    def save_calibration(self):
+        """수동 설정한 위치를 현재 창 크기의 보정 결과로 저장하고 카오스 오브 칸을 템플릿으로 저장"""
+        if not (NUMPY_AVAILABLE and WIN32_AVAILABLE):
+            return
+        try:
+            poe_info = self.get_poe_window_info()
+            if not poe_info:
+                return
+            import poe_calibrate
+            frame = self.get_capture().grab('currency')
+            poe_calibrate.save_template(frame.image, order='BGRA')
+            poe_calibrate.CalibrationCache().store(poe_info, self.layout_name, {
+                'chaos_pos': self.chaos_pos_center,
+                'chaos_size': self.chaos_cell_size,
+                'grid_bounds': self.grid_bounds,
+                'score': None,
+            })
+        except Exception:
+            pass
+
     def toggle_setup_mode(self):
         """설정 모드 토글"""
         if self.setup_mode:
@@ -761,8 +874,12 @@ class MapRollerApp:
         # 좌표 재생성
         self.generate_coordinates()
         
-        # 오버레이 제거
+        # 오버레이 제거 (템플릿 캡처에 오버레이가 찍히지 않도록 먼저 제거)
         self.destroy_visual_overlays()
+        self.root.update_idletasks()
+        
+        # 다음 자동 감지에서 쓸 카오스 오브 템플릿과 보정 결과 저장
+        self.save_calibration()
         
         self.status_var.set(f"설정 완료! 좌표 {len(self.map_coords)}개 생성됨")
 
@@ -780,6 +897,20 @@ class MapRollerApp:
             'chaos'
         )
         
+        # 선택한 커런시 순서에 쓰이는 다른 커런시 칸 오버레이
+        for name in poe_craft.CRAFT_PIPELINES[self.craft_pipeline]:
+            if name == 'chaos':
+                continue
+            x, y = self.currency_slot(name)
+            self.create_draggable_overlay(
+                x - self.chaos_cell_size // 2,
+                y - self.chaos_cell_size // 2,
+                self.chaos_cell_size,
+                self.chaos_cell_size,
+                poe_craft.SLOT_COLORS.get(name, 'white'),
+                f'slot:{name}'
+            )
+        
         # 맵 인벤토리 오버레이
         self.grid_overlay = self.create_draggable_overlay(
             self.grid_bounds['left'],
@@ -805,7 +936,10 @@ class MapRollerApp:
         resize_handle.place(relx=1.0, rely=1.0, anchor='se')
         
         # 라벨 추가 (어떤 영역인지 표시)
-        label_text = "카오스 오브" if overlay_type == 'chaos' else "맵 인벤토리"
+        if overlay_type.startswith('slot:'):
+            label_text = poe_craft.CURRENCIES[overlay_type[5:]].short
+        else:
+            label_text = "카오스 오브" if overlay_type == 'chaos' else "맵 인벤토리"
         label = tk.Label(overlay, text=label_text, bg=color, fg='black', font=('Arial', 10, 'bold'))
         label.pack(pady=5)
         
@@ -876,6 +1010,11 @@ class MapRollerApp:
                 overlay.winfo_y() + overlay.winfo_height() // 2
             )
             self.chaos_cell_size = min(overlay.winfo_width(), overlay.winfo_height())
+        elif overlay.overlay_type.startswith('slot:'):
+            self.currency_slots[overlay.overlay_type[5:]] = (
+                overlay.winfo_x() + overlay.winfo_width() // 2,
+                overlay.winfo_y() + overlay.winfo_height() // 2
+            )
         else:  # grid
             self.grid_bounds = {
                 'left': overlay.winfo_x(),
@@ -887,23 +1026,87 @@ class MapRollerApp:
         self.dragging = None
         self.drag_mode = None
 
+    def current_layout(self):
+        """선택한 보관함 레이아웃 (없으면 일반 보관함)"""
+        return self.layouts.get(self.layout_name) or poe_layout.LAYOUTS[poe_layout.DEFAULT_LAYOUT]
+
+    def change_layout(self, label):
+        """보관함 레이아웃 변경 후 좌표 재생성"""
+        for name, layout in self.layouts.items():
+            if layout.label == label:
+                self.layout_name = name
+                break
+        self.generate_coordinates()
+        self.save_config()
+        self.status_var.set(f"보관함: {label}, 좌표 {len(self.map_coords)}개 생성됨")
+
+    def change_craft_pipeline(self, label):
+        """적용할 커런시 순서 변경"""
+        for name in poe_craft.CRAFT_PIPELINES:
+            if poe_craft.pipeline_label(name) == label:
+                self.craft_pipeline = name
+                break
+        self.save_config()
+        missing = [poe_craft.CURRENCIES[name].label for name in poe_craft.CRAFT_PIPELINES[self.craft_pipeline]
+                   if name != 'chaos' and name not in self.currency_slots]
+        if missing:
+            self.status_var.set(f"'위치 설정'에서 {', '.join(missing)} 칸 위치를 맞춰주세요")
+        else:
+            self.status_var.set(f"커런시 순서: {label}")
+
+    def currency_slot(self, name):
+        """커런시 칸 중심 좌표 (설정하지 않은 칸은 카오스 오브 칸 기준 기본 위치)"""
+        return poe_craft.slot_position(name, self.chaos_pos_center, self.chaos_cell_size, self.currency_slots)
+
     def generate_coordinates(self):
-        """좌표 생성"""
-        self.map_coords = []
-        
+        """좌표 생성 (레이아웃과 grid_bounds별로 캐시된 좌표표 사용)"""
         if not self.chaos_pos_center:
+            self.map_coords = []
+            self.map_cells = []
             return
-            
-        cell_width = (self.grid_bounds['right'] - self.grid_bounds['left']) / GRID_COLS
-        cell_height = (self.grid_bounds['bottom'] - self.grid_bounds['top']) / GRID_ROWS
-        start_x = self.grid_bounds['left'] + (cell_width / 2)
-        start_y = self.grid_bounds['top'] + (cell_height / 2)
         
-        for col in range(GRID_COLS):
-            for row in range(GRID_ROWS):
-                x = round(start_x + (col * cell_width))
-                y = round(start_y + (row * cell_height))
-                self.map_coords.append((x, y))
+        table = poe_layout.coordinate_table(self.current_layout(), self.grid_bounds)
+        self.map_coords = table
+        self.map_cells = table.cells
+        self.validate_checkpoint()
+
+    def geometry_hash(self):
+        """현재 레이아웃/칸 배치의 해시 (체크포인트 유효성 확인용)"""
+        origin = (self.grid_bounds['left'], self.grid_bounds['top'])
+        return poe_checkpoint.geometry_hash(self.layout_name, self.map_coords, origin)
+
+    def validate_checkpoint(self):
+        """그리드 형상이 바뀌었으면 체크포인트 폐기"""
+        if self.checkpoint and (not self.map_coords or self.checkpoint.geometry != self.geometry_hash()):
+            self.checkpoint = None
+            poe_checkpoint.clear_checkpoint()
+        self.update_resume_option()
+
+    def update_resume_option(self):
+        """이어하기 체크박스에 남은 칸 수 표시"""
+        if self.checkpoint:
+            self.resume_check.config(state=tk.NORMAL, text=f"이어하기 ({len(self.checkpoint)}/{len(self.map_coords)}칸 완료)")
+        else:
+            self.resume_var.set(False)
+            self.resume_check.config(state=tk.DISABLED, text="이어하기")
+
+    def roll_context(self):
+        """현재 좌표로 작업 문맥 생성 (빈 칸 확인/칸 판정 캐시는 numpy가 있을 때만)"""
+        return poe_job.RollContext(
+            self.current_layout(), self.map_coords, self.map_cells, self.grid_bounds,
+            self.chaos_pos_center, self.chaos_cell_size, self.currency_slots, self.path_method,
+            get_capture=self.get_capture if NUMPY_AVAILABLE else None, cell_cache=self.cell_cache)
+
+    def get_capture(self):
+        """화면 캡처 엔진 (첫 사용 시 생성, 그리드/커런시 칸 영역은 현재 좌표로 갱신)"""
+        import poe_capture
+        if self.capture is None:
+            self.capture = poe_capture.CaptureEngine(poe_capture.create_capture_provider())
+        self.capture.set_region('grid', self.grid_bounds)
+        half = self.chaos_cell_size // 2
+        x, y = self.chaos_pos_center
+        self.capture.set_region('currency', {'left': x - half, 'top': y - half, 'right': x + half, 'bottom': y + half})
+        return self.capture
 
     def destroy_visual_overlays(self):
         """오버레이 제거"""
@@ -915,6 +1118,7 @@ class MapRollerApp:
         self.overlay_windows.clear()
 
     def setup_hotkeys(self):
+        import keyboard
         keyboard.add_hotkey(STOP_KEY_1, self.stop_automation)
         keyboard.add_hotkey(STOP_KEY_2, self.stop_automation)
 
@@ -923,138 +1127,152 @@ class MapRollerApp:
             if not self.map_coords:
                 messagebox.showwarning("경고", "먼저 위치 설정을 해주세요!")
                 return
+            
+            if self.match_stop_var.get() and not self.get_active_matcher():
+                messagebox.showwarning("경고", "'정규식 관리'에서 롤링에 사용할 정규식을 선택해주세요!")
+                return
                 
             self.is_running = True
-            self.need_initial_shift = True
+            self.resume = self.resume_var.get()
+            self.verify_clicks = self.verify_var.get()
+            self.get_engine().need_initial_shift = True
             self.start_button.config(state=tk.DISABLED)
             self.destroy_visual_overlays()
             
             if self.automation_thread and self.automation_thread.is_alive():
                 self.automation_thread.join(timeout=0.5)
                 
+            self.status_channel.reset()
+            self.engine.reset_stop()
             self.automation_thread = threading.Thread(target=self.run_automation, daemon=True)
             self.automation_thread.start()
+            self.poll_status()
+
+    def poll_status(self):
+        """작업 스레드의 상태를 일정 주기로 읽어 화면에 표시 (작업 스레드는 Tk를 호출하지 않음)"""
+        channel = self.status_channel
+        if channel.finished is not None:
+            self.status_var.set(channel.finished)
+            self.start_button.config(state=tk.NORMAL)
+            self.update_resume_option()
+            if self.pending_window:
+                old_info, new_info = self.pending_window
+                self.pending_window = None
+                self.apply_window_change(old_info, new_info)
+            return
+        self.status_var.set(channel.render())
+        self.root.after(STATUS_POLL_MS, self.poll_status)
 
     def stop_automation(self):
         if self.is_running:
             self.is_running = False
+            # 작업 스레드의 모든 대기를 즉시 깨움
+            self.engine.stop()
             # 즉시 Shift 키 해제
-            self.force_release_shift()
-            self.root.after(0, self.status_var.set, "중지 신호 감지! 작업을 멈춥니다...")
-            self.root.after(0, lambda: self.start_button.config(state=tk.NORMAL))
+            self.release_inputs()
+            self.status_channel.set_message("중지 신호 감지! 작업을 멈춥니다...")
 
-    def force_release_shift(self):
-        """강제로 Shift 키 해제"""
-        if self.shift_pressed:
-            try:
-                # 여러 번 시도하여 확실히 해제
-                for _ in range(3):
-                    pyautogui.keyUp('shift')
-                    time.sleep(0.01)
-            except:
-                pass
-            finally:
-                self.shift_pressed = False
+    def export_trace(self):
+        """마지막 작업의 트레이스를 파일로 저장하고 칸당 시간 히스토그램 요약 반환"""
+        try:
+            self.tracer.export(poe_trace.TRACE_FILE)
+        except Exception:
+            pass
+        line = poe_trace.format_histogram(self.tracer)
+        return f"{line}. " if line else ""
 
-    def release_shift_key(self):
-        """일반적인 Shift 키 해제"""
-        if self.shift_pressed:
-            try:
-                pyautogui.keyUp('shift')
-            except:
-                pass
-            self.shift_pressed = False
+    def release_inputs(self):
+        """눌린 키/버튼(Shift 등) 모두 해제 (눌린 것이 없으면 아무 입력도 보내지 않음)"""
+        if self.engine is None:
+            return
+        self.engine.release_inputs()
 
     def run_automation(self):
-        speed = self.speed_var.get()
-        
-        # 속도 설정
-        if speed == "slow":
-            move_duration = 0.15
-            click_delay = 0.15
-        elif speed == "normal":
-            move_duration = 0.08
-            click_delay = 0.08
-        elif speed == "fast":
-            move_duration = 0.03
-            click_delay = 0.03
-        elif speed == "max":
-            move_duration = 0.0
-            click_delay = 0.0
+        summary = ""
+        matcher = self.get_active_matcher() if self.match_stop_var.get() else None
+        
+        # 이어하기: 지난 작업에서 끝난 칸은 건너뜀 (끝난 칸은 작업 중 계속 추가됨)
+        cell_of = dict(zip(self.map_coords, self.map_cells))
+        done = set()
+        step_done = {}
+        if self.resume and self.checkpoint:
+            done = {pos for pos, cell in cell_of.items() if cell in self.checkpoint.done}
+            step_done = {name: {pos for pos, cell in cell_of.items() if cell in cells}
+                         for name, cells in self.checkpoint.steps.items()}
+        geometry = self.geometry_hash()
+        completed = False
             
         try:
-            # 초기 카오스 오브 선택
-            if self.need_initial_shift:
-                self.root.after(0, self.status_var.set, "카오스 오브 선택 중...")
-                self.release_shift_key()
-                
-                pyautogui.keyDown('shift')
-                self.shift_pressed = True
-                time.sleep(0.05)
-                pyautogui.moveTo(self.chaos_pos_center, duration=move_duration)
-                pyautogui.rightClick()
-                time.sleep(0.1)
-                self.need_initial_shift = False
-
-            # 맵 롤링
-            self.root.after(0, self.status_var.set, "연속 롤링 시작! (중지: ESC 또는 F10)")
-            
-            for i, map_pos in enumerate(self.map_coords):
-                if not self.is_running:
-                    break
-                
-                if keyboard.is_pressed(STOP_KEY_1) or keyboard.is_pressed(STOP_KEY_2):
-                    self.root.after(0, self.status_var.set, "중지 키 감지! 작업을 멈춥니다...")
-                    break
-                
-                self.root.after(0, self.status_var.set, f"롤링 중... [{i+1}/{len(self.map_coords)}]")
-
-                # 안정적인 클릭을 위해 mouseDown, sleep, mouseUp으로 변경**
-                click_press_delay = 0.02 # 마우스를 누르고 떼는 사이의 미세한 딜레이**
-
-                if speed == "max":
-                    pyautogui.moveTo(map_pos, _pause=False)
-                    pyautogui.mouseDown(_pause=False)
-                    time.sleep(click_press_delay)
-                    pyautogui.mouseUp(_pause=False)
-                else:
-                    pyautogui.moveTo(map_pos, duration=move_duration)
-                    pyautogui.mouseDown()
-                    time.sleep(click_press_delay)
-                    pyautogui.mouseUp()
-                    if click_delay > 0:
-                        time.sleep(click_delay)
+            job = poe_job.RollJob(
+                self.speed_var.get(), matcher,
+                skip_empty=self.skip_empty_var.get(),
+                verify=self.verify_clicks,
+                pipeline=self.craft_pipeline,
+                done=done,
+                max_passes=self.match_max_passes,
+                max_seconds=self.match_time_limit,
+                step_done=step_done
+            )
+            context = self.roll_context()
+            report = poe_job.run_job(self.engine, context, job, self.pacer, self.get_history())
+            self.cell_cache = context.cell_cache
+            completed = report['completed']
+            summary = poe_job.format_report(report, done, len(self.map_coords))
+            if self.tracer.enabled and report['rolled']:
+                summary += self.export_trace()
+            if report['delays']:
+                self.save_config()
             
-        except pyautogui.FailSafeException:
-            self.root.after(0, self.status_var.set, "비상 정지! (마우스가 화면 모서리로 이동됨)")
-            # FailSafe 발생 시에도 Shift 키 해제
-            self.force_release_shift()
+        except InputFailSafe:
+            summary = "비상 정지! (마우스가 화면 모서리로 이동됨) "
         except Exception as e:
-            self.root.after(0, self.status_var.set, f"오류 발생: {str(e)}")
-            self.force_release_shift()
+            summary = f"오류 발생: {str(e)} "
         finally:
-            # 작업 종료 시 확실하게 Shift 키 해제
-            self.force_release_shift()
+            # 작업이 어떻게 끝나든 눌린 키/버튼 해제 (비상 정지 중에도 보냄)
+            self.release_inputs()
+            self.save_checkpoint(geometry, done, completed, step_done)
             self.is_running = False
-            self.root.after(0, lambda: self.start_button.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.status_var.set("준비 완료. 시작 버튼을 눌러 새 작업을 시작하세요."))
+            self.status_channel.finish(f"{summary}준비 완료. 시작 버튼을 눌러 새 작업을 시작하세요.")
+
+    def get_history(self):
+        """작업 기록 스레드 (첫 사용 시 생성, 기록을 끈 경우 None)"""
+        if self.history is None and self.history_enabled:
+            import poe_history
+            self.history = poe_history.HistoryWriter()
+        return self.history
+
+    def save_checkpoint(self, geometry, done, completed, step_done=None):
+        """중단된 작업의 끝난 칸(단계별 끝난 칸 포함)을 저장 (끝까지 마쳤으면 체크포인트 삭제)"""
+        step_done = step_done or {}
+        if completed or not (done or any(step_done.values())):
+            self.checkpoint = None
+            poe_checkpoint.clear_checkpoint()
+            return
+        cell_of = dict(zip(self.map_coords, self.map_cells))
+        self.checkpoint = poe_checkpoint.Checkpoint(
+            geometry, [cell_of[pos] for pos in done if pos in cell_of],
+            {name: [cell_of[pos] for pos in cells if pos in cell_of] for name, cells in step_done.items()})
+        self.checkpoint.save()
 
     def quit_app(self):
         """프로그램 종료"""
-        # 종료 전 Shift 키 확실히 해제
+        # 작업 스레드가 끝나기를 기다린 뒤 (중지 요청 즉시 깨어남) 남은 키/버튼 해제
         self.stop_automation()
-        self.force_release_shift()
-        time.sleep(0.2)
-        
-        # 한 번 더 확실히 해제
+        if self.automation_thread and self.automation_thread.is_alive():
+            self.automation_thread.join(timeout=QUIT_JOIN_TIMEOUT)
+        self.release_inputs()
+
         try:
-            for _ in range(3):
-                pyautogui.keyUp('shift')
-                time.sleep(0.01)
+            import keyboard
+            keyboard.unhook_all()
         except:
             pass
-            
-        keyboard.unhook_all()
+        if self.window_tracker:
+            self.window_tracker.stop_watch()
+        if self.capture:
+            self.capture.close()
+        if self.history:
+            self.history.close()
         self.destroy_visual_overlays()
         self.root.destroy()
         os._exit(0)
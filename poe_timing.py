@@ -0,0 +1,185 @@
+import sys
+import time
+import ctypes
+from collections import deque
+
+# --- 정밀 대기 설정 ---
+SPIN_THRESHOLD = 0.002  # 마감 이만큼 전부터는 잠들지 않고 시계를 확인하며 대기 (OS 타이머 반올림 오차 흡수)
+CHAIN_SLACK = 0.002  # 직전 대기가 끝나고 이 시간 안에 다시 대기하면 직전 마감 시각부터 이어서 계산
+TIMER_RESOLUTION_MS = 1  # 작업 중에만 올리는 Windows 타이머 해상도 (기본 15.6ms)
+TIMING_SAMPLES = 4096  # 간격 종류별로 기억할 오차 수
+TIMING_REPORT_MS = 1.0  # 작업 요약에는 오차(p99)가 이보다 큰 간격만 표시
+TIMING_LABELS = {
+    'press': "누름", 'click': "클릭 간격", 'move': "이동", 'settle': "읽기 전 대기",
+    'shift': "Shift", 'select': "커런시 선택", 'verify': "확인 대기", 'poll': "복사 확인", 'backoff': "재시도 대기",
+}
+# -------------
+
+
+class TimerResolution:
+    """작업 중에만 Windows 타이머 해상도를 올림 (timeBeginPeriod, 다른 OS에서는 아무것도 하지 않음)"""
+
+    def __init__(self, ms=TIMER_RESOLUTION_MS):
+        self.ms = ms
+        self.active = False
+
+    def start(self):
+        if sys.platform == 'win32' and not self.active:
+            try:
+                self.active = ctypes.windll.winmm.timeBeginPeriod(self.ms) == 0
+            except:
+                self.active = False
+        return self
+
+    def stop(self):
+        if self.active:
+            try:
+                ctypes.windll.winmm.timeEndPeriod(self.ms)
+            except:
+                pass
+            self.active = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class SystemClock:
+    """실제 시계 (대기는 잠든 뒤 마감 직전 spin초 동안 시계를 확인하며 기다림)"""
+    virtual = False
+
+    def __init__(self, spin=SPIN_THRESHOLD):
+        self.spin = spin
+
+    def now(self):
+        return time.perf_counter()
+
+    def now_ns(self):
+        return time.perf_counter_ns()
+
+    def sleep(self, seconds, cancel=None):
+        """seconds 동안 대기 (cancel(threading.Event)이 설정되면 즉시 깨어나고 True)"""
+        return self.sleep_until(self.now() + seconds, cancel)
+
+    def sleep_until(self, deadline, cancel=None):
+        remaining = deadline - self.now()
+        if remaining > self.spin:
+            if cancel is None:
+                time.sleep(remaining - self.spin)
+            elif cancel.wait(remaining - self.spin):
+                return True
+        while self.now() < deadline:
+            if cancel is not None and cancel.is_set():
+                return True
+            time.sleep(0)  # 다른 스레드(분석 작업자 등)에 GIL 양보
+        return cancel is not None and cancel.is_set()
+
+
+class VirtualClock:
+    """대기하면 시각만 앞으로 옮기는 가상 시계 (테스트/벤치마크용)
+
+    실제로는 기다리지 않으므로 같은 입력이면 항상 같은 시각이 나온다. 대기 중에 다른 스레드가
+    일하는 것은 흉내 내지 않으므로 분석 작업자 없이 한 스레드로 도는 작업에만 쓴다.
+    """
+    virtual = True
+
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return self.time
+
+    def now_ns(self):
+        return int(self.time * 1e9)
+
+    def advance(self, seconds):
+        if seconds > 0:
+            self.time += seconds
+
+    def sleep(self, seconds, cancel=None):
+        return self.sleep_until(self.time + seconds, cancel)
+
+    def sleep_until(self, deadline, cancel=None):
+        if cancel is not None and cancel.is_set():
+            return True
+        self.time = max(self.time, deadline)
+        return False
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))]
+
+
+class DeadlineTimer:
+    """마감 시각 기준 대기 (실제 대기는 clock(SystemClock/VirtualClock)이 처리)
+
+    대기는 호출 시각이 아니라 직전 대기의 마감 시각부터 계산하므로 (CHAIN_SLACK 이내로
+    이어지는 경우) 입력 호출에 걸린 시간과 잠깐의 늦잠이 다음 간격에서 상쇄된다.
+    간격 종류(label)별로 마감 대비 실제로 깨어난 시각의 오차를 기록한다.
+    """
+
+    def __init__(self, cancel=None, clock=SYSTEM_CLOCK, slack=CHAIN_SLACK, samples=TIMING_SAMPLES):
+        self.cancel = cancel
+        self.clock = clock
+        self.slack = slack
+        self.samples = samples
+        self.deadline = None  # 직전 대기의 마감 시각
+        self.errors = {}  # label -> deque[오차 초]
+
+    def reset(self):
+        self.deadline = None
+        self.errors = {}
+
+    def wait(self, seconds, label='wait'):
+        """직전 마감 시각(이어지지 않으면 지금)부터 seconds 뒤까지 대기 (중지되면 True)"""
+        if seconds <= 0:
+            return self.cancel is not None and self.cancel.is_set()
+        now = self.clock.now()
+        base = now
+        if self.deadline is not None and 0 <= now - self.deadline <= self.slack:
+            base = self.deadline
+        return self.wait_until(base + seconds, label)
+
+    def wait_until(self, deadline, label='wait'):
+        """deadline(clock 기준)까지 대기 (중지되면 즉시 True)"""
+        if self.clock.sleep_until(deadline, self.cancel):
+            self.deadline = None
+            return True
+        self.record(label, self.clock.now() - deadline)
+        self.deadline = deadline
+        return False
+
+    def record(self, label, error):
+        errors = self.errors.get(label)
+        if errors is None:
+            errors = self.errors[label] = deque(maxlen=self.samples)
+        errors.append(error)
+
+    def report(self):
+        """간격 종류별 오차 {label: {'count', 'mean_ms', 'p50_ms', 'p99_ms', 'max_ms'}}"""
+        report = {}
+        for label, errors in self.errors.items():
+            values = list(errors)
+            report[label] = {
+                'count': len(values),
+                'mean_ms': sum(values) / len(values) * 1000,
+                'p50_ms': percentile(values, 0.50) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000,
+                'max_ms': max(values) * 1000,
+            }
+        return report
+
+
+def format_timing(report, labels=('press', 'click', 'move', 'settle'), threshold=TIMING_REPORT_MS):
+    """'대기 오차(p99): 누름 2.1ms, 클릭 간격 3.4ms' 형식 (오차가 threshold(ms) 이하인 간격은 생략)"""
+    parts = [f"{TIMING_LABELS.get(label, label)} {report[label]['p99_ms']:.1f}ms" for label in labels
+             if label in report and report[label]['p99_ms'] > threshold]
+    return f"대기 오차(p99): {', '.join(parts)}" if parts else ""
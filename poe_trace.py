@@ -0,0 +1,146 @@
+import json
+import time
+import threading
+
+# --- 트레이스 설정 ---
+TRACE_FILE = 'poe_roller_trace.json'
+HISTOGRAM_BINS = 12
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+# -------------
+
+
+class Tracer:
+    """작업 단계별 시간 구간을 기록 (Chrome trace / Perfetto JSON으로 내보내기 가능)
+
+    기록은 (이름, 시작ns, 끝ns, 스레드, 칸 번호) 튜플을 리스트에 추가하는 것뿐이라
+    켜 둔 채로 사용해도 부담이 적다.
+    """
+    enabled = True
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.spans = []
+        self.origin = clock()
+
+    def now(self):
+        return self.clock()
+
+    def add(self, name, start, cell=None):
+        """start(now()로 얻은 값)부터 지금까지를 name 구간으로 기록"""
+        self.spans.append((name, start, self.clock(), threading.get_ident(), cell))
+
+    def reset(self):
+        self.spans = []
+        self.origin = self.clock()
+
+    def durations(self, name):
+        """이름별 구간 길이 목록 (초)"""
+        return [(end - start) / 1e9 for span_name, start, end, _, _ in self.spans if span_name == name]
+
+    def cell_totals(self):
+        """칸별 전체 소요 시간 (초)"""
+        totals = {}
+        for _, start, end, _, cell in self.spans:
+            if cell is not None:
+                totals[cell] = totals.get(cell, 0) + (end - start)
+        return [total / 1e9 for total in totals.values()]
+
+    def summary(self):
+        """단계별 {횟수, 합계, 평균, p50, p99} (초)"""
+        phases = {}
+        for name, start, end, _, _ in self.spans:
+            phases.setdefault(name, []).append((end - start) / 1e9)
+        result = {}
+        for name, values in phases.items():
+            values.sort()
+            result[name] = {
+                'count': len(values),
+                'total': sum(values),
+                'mean': sum(values) / len(values),
+                'p50': values[len(values) // 2],
+                'p99': values[min(len(values) - 1, int(len(values) * 0.99))],
+            }
+        return result
+
+    def to_chrome_trace(self):
+        """Chrome trace / Perfetto에서 열 수 있는 이벤트 목록"""
+        threads = {}
+        events = []
+        for name, start, end, thread, cell in self.spans:
+            tid = threads.setdefault(thread, len(threads) + 1)
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self.origin) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': 1,
+                'tid': tid,
+            }
+            if cell is not None:
+                event['args'] = {'cell': cell}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path=TRACE_FILE):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+class NullTracer(Tracer):
+    """기록을 끈 트레이서 (호출 비용만 남음)"""
+    enabled = False
+
+    def __init__(self):
+        self.spans = []
+        self.origin = 0
+
+    def now(self):
+        return 0
+
+    def add(self, name, start, cell=None):
+        pass
+
+    def reset(self):
+        pass
+
+
+def histogram(values, bins=HISTOGRAM_BINS):
+    """값 목록의 히스토그램 (경계 목록, 개수 목록)"""
+    if not values:
+        return [], []
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(bins - 1, int((value - low) / width))] += 1
+    edges = [low + width * i for i in range(bins + 1)]
+    return edges, counts
+
+
+def sparkline(counts):
+    """히스토그램을 한 줄 막대 문자열로 표시"""
+    if not counts:
+        return ''
+    peak = max(counts) or 1
+    return ''.join(SPARK_CHARS[min(len(SPARK_CHARS) - 1, count * len(SPARK_CHARS) // (peak + 1))]
+                   if count else ' ' for count in counts)
+
+
+def format_summary(tracer):
+    """단계별 통계와 칸당 시간 히스토그램을 텍스트로 정리"""
+    lines = [f"{'단계':<12}{'횟수':>6}{'합계 ms':>10}{'평균 ms':>9}{'p50 ms':>9}{'p99 ms':>9}"]
+    for name, stats in sorted(tracer.summary().items(), key=lambda item: -item[1]['total']):
+        lines.append(f"{name:<12}{stats['count']:>6}{stats['total'] * 1000:>10.1f}"
+                     f"{stats['mean'] * 1000:>9.2f}{stats['p50'] * 1000:>9.2f}{stats['p99'] * 1000:>9.2f}")
+    line = format_histogram(tracer)
+    if line:
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def format_histogram(tracer):
+    """칸당 소요 시간 히스토그램 한 줄 요약 (기록이 없으면 빈 문자열)"""
+    edges, counts = histogram(tracer.cell_totals())
+    if not counts:
+        return ''
+    return f"칸당 시간 {edges[0] * 1000:.1f}ms |{sparkline(counts)}| {edges[-1] * 1000:.1f}ms"
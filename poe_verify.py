@@ -0,0 +1,62 @@
+import poe_craft
+from poe_pipeline import Analyzer
+from poe_engine import CELL_SATISFIED, CELL_FAILED, CELL_EMPTY
+
+# --- 클릭 확인 설정 ---
+VERIFY_SETTLE_DELAY = 0.05  # 클릭 후 아이템이 바뀐 결과를 읽기 전 대기
+VERIFY_BACKOFF = 0.1  # 재시도 패스 전 대기 (패스마다 두 배)
+# -------------
+
+
+class ClickVerifier(Analyzer):
+    """칸마다 클릭 전후의 아이템 텍스트를 비교하여 클릭이 반영됐는지 확인
+
+    맵 아이콘은 롤링해도 바뀌지 않으므로 화면 픽셀 대신 게임의 복사 기능으로 읽은
+    텍스트를 칸의 스냅샷으로 쓴다. 전 텍스트는 처음 방문할 때 한 번만 읽고 이후에는
+    직전 클릭 후 텍스트를 재사용한다. 바뀌지 않은 칸은 실패로 표시되어 패스 끝에
+    retry_backoff만큼 쉰 뒤 다시 롤링된다.
+    여러 커런시 작업에서는 단계마다 currency(poe_craft.Currency)를 설정한다. 희귀도가 맞지 않아
+    게임이 커런시를 거부한 칸은 텍스트가 그대로지만 그 단계는 할 일이 없으므로 끝난 것으로 본다.
+    """
+    retry_backoff = VERIFY_BACKOFF
+    workers = 0  # 비교는 가벼우므로 입력 스레드에서 바로 (텍스트 읽기는 어차피 입력 스레드에서 해야 함)
+
+    def __init__(self, input_backend, reader, settle=VERIFY_SETTLE_DELAY):
+        self.input = input_backend
+        self.reader = reader
+        self.settle = settle
+        self.currency = None  # 이번 단계 커런시 (None이면 거부 여부를 따지지 않음)
+        self.baseline = {}
+
+    def before(self, pos, move_duration=0.0):
+        """클릭 전 텍스트 확보 (처음 보는 칸만 읽음, 아이템이 없으면 False)"""
+        if pos not in self.baseline:
+            self.input.move(pos, move_duration)
+            if self.input.cancelled():
+                return True
+            self.baseline[pos] = self.reader.read()
+        return self.baseline[pos] is not None
+
+    def capture(self, pos):
+        if self.input.wait(self.settle, 'verify'):
+            return None  # 중지되어 결과를 읽지 못함 (analyze에서 실패로 처리)
+        before = self.baseline.get(pos)
+        after = self.reader.read()
+        if after is not None:
+            self.baseline[pos] = after
+        return before, after
+
+    def analyze(self, payload):
+        if payload is None:
+            return CELL_FAILED  # 확인하지 못한 클릭은 끝난 것으로 치지 않음 (이어하기에서 다시 롤링)
+        before, after = payload
+        if before is None:
+            return CELL_EMPTY
+        if after is None:
+            return CELL_FAILED
+        if after == before:
+            rarity = poe_craft.item_rarity(before)
+            if self.currency is not None and rarity is not None and rarity not in self.currency.accepts:
+                return CELL_SATISFIED
+            return CELL_FAILED
+        return CELL_SATISFIED
@@ -0,0 +1,113 @@
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    # numpy가 없으면 빈 칸 감지 없이 모든 칸을 클릭
+
+# --- 빈 칸 감지 설정 ---
+OCCUPANCY_METHOD = 'edge'  # 'edge' (엣지 에너지) 또는 'variance' (밝기 분산)
+OCCUPANCY_THRESHOLD = {'edge': 6.0, 'variance': 10.0}
+CELL_INSET = 0.15  # 칸 테두리(격자선)를 제외할 비율
+CELL_SAMPLES = 16  # 칸마다 샘플링할 한 변의 픽셀 수
+HASH_SAMPLES = 32  # 지각 해시(pHash)용 칸 샘플 크기
+HASH_FREQUENCIES = 8  # DCT 저주파 계수 8x8 = 64비트
+HASH_FLAT_LEVEL = 16.0  # 저주파 계수가 모두 이보다 작으면 단색 칸 (해시 0)
+# -------------
+
+
+def grab_region(bounds):
+    """화면의 지정 영역을 RGB 배열로 캡처 (left/top/right/bottom 딕셔너리)"""
+    from PIL import ImageGrab
+    bbox = (bounds['left'], bounds['top'], bounds['right'], bounds['bottom'])
+    image = ImageGrab.grab(bbox=bbox, all_screens=True)
+    return np.asarray(image.convert('RGB'))
+
+
+def to_gray(image, order='RGB'):
+    """RGB(A)/BGRA(poe_capture 버퍼)/그레이 이미지를 float32 그레이스케일로 변환"""
+    image = np.asarray(image)
+    if image.ndim == 3:
+        weights = [0.114, 0.587, 0.299] if order == 'BGRA' else [0.299, 0.587, 0.114]
+        rgb = image[..., :3].astype(np.float32)
+        return rgb @ np.array(weights, dtype=np.float32)
+    return image.astype(np.float32)
+
+
+def cell_patches(gray, rows, cols, inset=CELL_INSET, samples=CELL_SAMPLES):
+    """이미지를 rows x cols 칸으로 나누어 (rows, cols, samples, samples) 패치 배열 생성
+
+    칸 크기가 정수로 나누어떨어지지 않아도 누적 오차가 없도록 칸마다 좌표를 계산해 샘플링한다.
+    """
+    height, width = gray.shape
+    cell_h = height / rows
+    cell_w = width / cols
+    offsets = np.linspace(inset, 1.0 - inset, samples)
+    ys = ((np.arange(rows)[:, None] + offsets[None, :]) * cell_h).astype(np.intp)
+    xs = ((np.arange(cols)[:, None] + offsets[None, :]) * cell_w).astype(np.intp)
+    ys = np.clip(ys, 0, height - 1)
+    xs = np.clip(xs, 0, width - 1)
+    return gray[ys[:, None, :, None], xs[None, :, None, :]]
+
+
+def cell_scores(image, rows, cols, method=OCCUPANCY_METHOD, order='RGB'):
+    """칸마다 내용물 점수 계산 (빈 칸은 낮고 아이템이 있으면 높음)"""
+    patches = cell_patches(to_gray(image, order), rows, cols)
+    if method == 'variance':
+        return patches.std(axis=(2, 3))
+    if method == 'edge':
+        dx = np.abs(np.diff(patches, axis=3)).mean(axis=(2, 3))
+        dy = np.abs(np.diff(patches, axis=2)).mean(axis=(2, 3))
+        return dx + dy
+    raise ValueError(f"알 수 없는 감지 방식: {method}")
+
+
+def occupancy_mask(image, rows, cols, method=OCCUPANCY_METHOD, threshold=None, order='RGB'):
+    """칸마다 아이템 존재 여부 (rows, cols) bool 배열 반환"""
+    if threshold is None:
+        threshold = OCCUPANCY_THRESHOLD[method]
+    return cell_scores(image, rows, cols, method, order) > threshold
+
+
+def _dct_matrix(size):
+    """DCT-II 변환 행렬 (size x size)"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+def cell_hashes(image, rows, cols, order='RGB'):
+    """칸마다 64비트 지각 해시 (rows, cols) uint64 배열 반환
+
+    칸을 HASH_SAMPLES 크기로 샘플링해 DCT한 뒤 저주파 계수가 중앙값보다 큰지를 비트로 쓴다.
+    밝기/잡음이 조금 달라도 같은 값이 나오고, 거의 단색인 칸은 0이 된다.
+    """
+    patches = cell_patches(to_gray(image, order), rows, cols, samples=HASH_SAMPLES)
+    dct = _dct_matrix(HASH_SAMPLES)[:HASH_FREQUENCIES]
+    low = np.einsum('ij,rcjk,lk->rcil', dct, patches, dct).reshape(rows, cols, -1)
+    ac = low[..., 1:]  # DC(평균 밝기) 제외
+    bits = low > np.median(ac, axis=-1)[..., None]
+    bits[..., 0] = False
+    hashes = np.packbits(bits, axis=-1).view('>u8')[..., 0].astype(np.uint64)
+    hashes[np.abs(ac).max(axis=-1) < HASH_FLAT_LEVEL] = 0
+    return hashes
+
+
+def load_image(path):
+    """저장된 스크린샷을 RGB 배열로 로드 (오프라인 확인용)"""
+    from PIL import Image
+    with Image.open(path) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+if __name__ == "__main__":
+    import sys
+    # 사용법: python poe_vision.py <그리드 스크린샷> [rows] [cols]
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    cols = int(sys.argv[3]) if len(sys.argv) > 3 else rows
+    mask = occupancy_mask(load_image(sys.argv[1]), rows, cols)
+    for row in mask:
+        print(''.join('#' if filled else '.' for filled in row))
+    print(f"아이템 있는 칸: {int(mask.sum())}/{mask.size}")
@@ -0,0 +1,298 @@
+import time
+import threading
+
+# --- 게임 창 찾기 설정 ---
+POE_PROCESSES = (
+    "PathOfExile_KG.exe",
+    "PathOfExile.exe",
+    "PathOfExile_x64.exe",
+    "PathOfExile_x64Steam.exe",
+    "PathOfExile64.exe",
+    "PoE.exe",
+)
+POE_TITLES = ("Path of Exile", "Path of Exile 2", "PoE", "PathOfExile")
+POE_TITLE_KEYWORDS = ("path of exile", "poe", "pathofexile")
+MIN_WINDOW_SIZE = (300, 200)  # 메인 창으로 인정할 최소 크기
+WATCH_INTERVAL = 0.5  # 창 이동/크기 변경 확인 주기 (초)
+WATCH_RESCAN_MAX = 8.0  # 창이 없을 때 전체 검색 최대 간격 (찾지 못할 때마다 두 배로 늘림)
+# -------------
+
+
+class WindowProvider:
+    """창/프로세스 정보를 제공하는 플랫폼 인터페이스"""
+
+    def process_ids(self, names):
+        """이름이 names에 있는 프로세스의 pid 집합"""
+        raise NotImplementedError
+
+    def visible_windows(self):
+        """보이는 최상위 창 hwnd 목록"""
+        raise NotImplementedError
+
+    def find_window(self, title):
+        """제목이 정확히 일치하는 창 (없으면 None)"""
+        for hwnd in self.visible_windows():
+            if self.title(hwnd) == title:
+                return hwnd
+        return None
+
+    def is_window(self, hwnd):
+        raise NotImplementedError
+
+    def window_pid(self, hwnd):
+        raise NotImplementedError
+
+    def rect(self, hwnd):
+        """(left, top, right, bottom)"""
+        raise NotImplementedError
+
+    def title(self, hwnd):
+        raise NotImplementedError
+
+    def is_iconic(self, hwnd):
+        """최소화된 창인지"""
+        return False
+
+
+class Win32WindowProvider(WindowProvider):
+    """pywin32/psutil 기반 구현"""
+
+    def __init__(self):
+        import win32gui
+        import win32process
+        self._win32gui = win32gui
+        self._win32process = win32process
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+
+    def process_ids(self, names):
+        if self._psutil is None:
+            return set()
+        pids = set()
+        for proc in self._psutil.process_iter(['pid', 'name']):
+            try:
+                if proc.info['name'] in names:
+                    pids.add(proc.info['pid'])
+            except (self._psutil.NoSuchProcess, self._psutil.AccessDenied):
+                continue
+        return pids
+
+    def visible_windows(self):
+        windows = []
+
+        def enum_windows_callback(hwnd, _):
+            if self._win32gui.IsWindowVisible(hwnd):
+                windows.append(hwnd)
+            return True
+
+        self._win32gui.EnumWindows(enum_windows_callback, None)
+        return windows
+
+    def find_window(self, title):
+        return self._win32gui.FindWindow(None, title) or None
+
+    def is_window(self, hwnd):
+        return bool(self._win32gui.IsWindow(hwnd)) and bool(self._win32gui.IsWindowVisible(hwnd))
+
+    def window_pid(self, hwnd):
+        return self._win32process.GetWindowThreadProcessId(hwnd)[1]
+
+    def rect(self, hwnd):
+        return tuple(self._win32gui.GetWindowRect(hwnd))
+
+    def title(self, hwnd):
+        return self._win32gui.GetWindowText(hwnd)
+
+    def is_iconic(self, hwnd):
+        return bool(self._win32gui.IsIconic(hwnd))
+
+
+class StaticWindowProvider(WindowProvider):
+    """메모리에 있는 창 목록으로 동작하는 구현 (오프라인 확인용)
+
+    windows: {hwnd: {'pid', 'title', 'rect', 'iconic'(선택)}}, processes: {pid: name}
+    """
+
+    def __init__(self, windows=None, processes=None):
+        self.windows = windows or {}
+        self.processes = processes or {}
+        self.calls = {'process_ids': 0, 'visible_windows': 0}
+
+    def process_ids(self, names):
+        self.calls['process_ids'] += 1
+        return {pid for pid, name in self.processes.items() if name in names}
+
+    def visible_windows(self):
+        self.calls['visible_windows'] += 1
+        return list(self.windows)
+
+    def is_window(self, hwnd):
+        return hwnd in self.windows
+
+    def window_pid(self, hwnd):
+        return self.windows[hwnd]['pid']
+
+    def rect(self, hwnd):
+        return tuple(self.windows[hwnd]['rect'])
+
+    def title(self, hwnd):
+        return self.windows[hwnd]['title']
+
+    def is_iconic(self, hwnd):
+        return bool(self.windows[hwnd].get('iconic'))
+
+
+def window_info(provider, hwnd):
+    """창 정보 딕셔너리 (get_poe_window_info와 같은 형식)"""
+    left, top, right, bottom = provider.rect(hwnd)
+    return {
+        'hwnd': hwnd,
+        'pid': provider.window_pid(hwnd),
+        'title': provider.title(hwnd),
+        'left': left,
+        'top': top,
+        'right': right,
+        'bottom': bottom,
+        'width': right - left,
+        'height': bottom - top,
+        'iconic': provider.is_iconic(hwnd)
+    }
+
+
+def usable_window(info):
+    """좌표 계산에 쓸 수 있는 창인지 (최소화된 창은 (-32000, -32000)에 160x28 정도로 보고됨)"""
+    return not info.get('iconic') and info['width'] > MIN_WINDOW_SIZE[0] and info['height'] > MIN_WINDOW_SIZE[1]
+
+
+class WindowTracker:
+    """PoE 창을 한 번 찾으면 hwnd/pid를 기억해 두고, 다시 찾을 때는 간단히 확인만 함
+
+    기억한 창이 사라졌을 때만 전체 검색을 다시 한다. start_watch()로 창 이동/크기
+    변경을 감시할 수 있다. hwnd/pid는 감시 스레드와 UI 스레드가 함께 쓰므로 lock 안에서만 바꾼다.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.hwnd = None
+        self.pid = None
+        self.full_scans = 0
+        self.lock = threading.Lock()
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+
+    def _is_main_window(self, hwnd):
+        left, top, right, bottom = self.provider.rect(hwnd)
+        return right - left > MIN_WINDOW_SIZE[0] and bottom - top > MIN_WINDOW_SIZE[1]
+
+    def _cached_valid(self):
+        try:
+            return (self.hwnd is not None and self.provider.is_window(self.hwnd)
+                    and self.provider.window_pid(self.hwnd) == self.pid)
+        except Exception:
+            return False
+
+    def full_scan(self):
+        """프로세스 → 정확한 제목 → 부분 제목 순서로 PoE 창 검색"""
+        self.full_scans += 1
+        provider = self.provider
+
+        # 1. PoE 프로세스 pid를 한 번에 모은 뒤 창 목록도 한 번만 훑음
+        pids = provider.process_ids(POE_PROCESSES)
+        windows = None
+        if pids:
+            windows = provider.visible_windows()
+            for hwnd in windows:
+                if provider.window_pid(hwnd) in pids and self._is_main_window(hwnd):
+                    return hwnd
+
+        # 2. 창 제목으로 찾기
+        for title in POE_TITLES:
+            hwnd = provider.find_window(title)
+            if hwnd:
+                return hwnd
+
+        # 3. 부분 제목 매칭으로 찾기
+        if windows is None:
+            windows = provider.visible_windows()
+        for hwnd in windows:
+            title = provider.title(hwnd).lower()
+            if any(keyword in title for keyword in POE_TITLE_KEYWORDS) and self._is_main_window(hwnd):
+                return hwnd
+        return None
+
+    def find(self):
+        """PoE 창 정보 반환 (기억한 창이 유효하면 검색 없이 재사용)"""
+        with self.lock:
+            if not self._cached_valid():
+                hwnd = self.full_scan()
+                if not hwnd:
+                    self.hwnd = self.pid = None
+                    return None
+                self.hwnd = hwnd
+                self.pid = self.provider.window_pid(hwnd)
+            hwnd = self.hwnd
+        return window_info(self.provider, hwnd)
+
+    def cached(self):
+        """기억한 창이 아직 유효하면 그 창 정보, 아니면 None (전체 검색은 하지 않음)"""
+        with self.lock:
+            if not self._cached_valid():
+                return None
+            hwnd = self.hwnd
+        return window_info(self.provider, hwnd)
+
+    def start_watch(self, on_change, interval=WATCH_INTERVAL):
+        """창 이동/크기 변경 감시 시작 (변경 시 on_change(이전 정보, 새 정보) 호출, 감시 스레드에서 실행)
+
+        최소화되었거나 너무 작은 창은 무시하므로 최소화했다가 되돌리면 변경으로 보지 않는다.
+        주기마다 기억한 창만 확인하고, 창이 사라지면 전체 검색 간격을 WATCH_RESCAN_MAX까지 늘려 가며 다시 찾는다.
+        """
+        self.stop_watch()
+        self._watch_stop = threading.Event()
+        stop = self._watch_stop
+
+        def watch():
+            last = self.find()
+            if last is not None and not usable_window(last):
+                last = None
+            backoff = interval
+            next_scan = 0.0
+            while not stop.wait(interval):
+                try:
+                    current = self.cached()
+                    if current is None:
+                        if time.monotonic() < next_scan:
+                            continue
+                        current = self.find()
+                        if current is None:
+                            backoff = min(backoff * 2, WATCH_RESCAN_MAX)
+                            next_scan = time.monotonic() + backoff
+                            continue
+                    backoff = interval
+                except Exception:
+                    continue
+                if not usable_window(current):
+                    continue
+                if last is None or current['hwnd'] != last['hwnd'] or \
+                        (current['left'], current['top'], current['right'], current['bottom']) != \
+                        (last['left'], last['top'], last['right'], last['bottom']):
+                    if last is not None:
+                        on_change(last, current)
+                    last = current
+
+        self._watch_thread = threading.Thread(target=watch, daemon=True)
+        self._watch_thread.start()
+
+    def stop_watch(self):
+        self._watch_stop.set()
+
+
+def translate_point(point, old, new):
+    """이전 창 기준 좌표를 새 창 기준으로 변환 (이동은 평행 이동, 크기 변경은 비율 유지)"""
+    scale_x = new['width'] / old['width'] if old['width'] else 1.0
+    scale_y = new['height'] / old['height'] if old['height'] else 1.0
+    return (round(new['left'] + (point[0] - old['left']) * scale_x),
+            round(new['top'] + (point[1] - old['top']) * scale_y))